@@ -16,9 +16,17 @@ export const API_ENDPOINTS = {
   ADMIN_POSTS: `${API_BASE_URL}/api/admin/posts`,
   ADMIN_GOALS: `${API_BASE_URL}/api/admin/goals`,
   ADMIN_SOCIAL: `${API_BASE_URL}/api/admin/social-networks`,
+  // Пакетные изменения: { create, update, delete, reorder } одним запросом
+  ADMIN_POSTS_BATCH: `${API_BASE_URL}/api/admin/posts/batch`,
+  ADMIN_GOALS_BATCH: `${API_BASE_URL}/api/admin/goals/batch`,
+  ADMIN_CATEGORIES_BATCH: `${API_BASE_URL}/api/admin/categories/batch`,
+  ADMIN_SOCIAL_BATCH: `${API_BASE_URL}/api/admin/social-networks/batch`,
   ADMIN_UPLOAD_IMAGE: `${API_BASE_URL}/api/admin/upload-profile-image`,
   ADMIN_CHANGE_PASSWORD: `${API_BASE_URL}/api/admin/change-password`,
   ADMIN_SEED_DATA: `${API_BASE_URL}/api/admin/seed-data`,
 }
 
+// Лимит элементов в одном списке пакета (MAX_BATCH_ITEMS в backend/app/schemas.py)
+export const MAX_BATCH_ITEMS = 1000
+
 export default API_BASE_URL
\ No newline at end of file
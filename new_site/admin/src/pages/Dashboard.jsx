@@ -4,35 +4,46 @@ import axios from 'axios'
 import { Card, CardContent, CardHeader, CardTitle } from '@/components/ui/card'
 import { Button } from '@/components/ui/button'
 
+// Самая поздняя из дат последней активности
+const latestActivity = (activity) => {
+  const dates = Object.values(activity || {}).filter(Boolean).map(value => new Date(value))
+  return dates.length > 0 ? new Date(Math.max(...dates)) : null
+}
+
+// "сегодня", "1 дн." и т.д. для карточки последнего обновления
+const formatDaysAgo = (date) => {
+  if (!date) return '—'
+  const days = Math.floor((Date.now() - date.getTime()) / (24 * 60 * 60 * 1000))
+  return days <= 0 ? 'Сегодня' : `${days} дн.`
+}
+
 const Dashboard = () => {
   const [stats, setStats] = useState({
     posts: 0,
     goals: 0,
     completedGoals: 0,
     totalViews: 1247,
-    monthlyGrowth: 12.5
+    monthlyGrowth: 12.5,
+    lastUpdate: null
   })
   const [loading, setLoading] = useState(true)
 
   useEffect(() => {
     const fetchStats = async () => {
       try {
-        // Получаем статистику из API
-        const [postsRes, goalsRes] = await Promise.all([
-          axios.get('http://localhost:8000/api/posts'),
-          axios.get('http://localhost:8000/api/goals')
-        ])
-
-        const totalGoals = goalsRes.data.reduce((acc, category) => acc + category.goals.length, 0)
-        const completedGoals = goalsRes.data.reduce((acc, category) => 
-          acc + category.goals.filter(goal => goal.is_completed).length, 0
-        )
+        // Счетчики считаются на сервере: ответ в несколько сотен байт
+        // вместо всех постов и дерева целей
+        const token = localStorage.getItem('admin_token')
+        const { data } = await axios.get('http://localhost:8000/api/admin/stats', {
+          headers: { Authorization: `Bearer ${token}` }
+        })
 
         setStats(prev => ({
           ...prev,
-          posts: postsRes.data.length,
-          goals: totalGoals,
-          completedGoals
+          posts: data.posts.published,
+          goals: data.goals.total,
+          completedGoals: data.goals.completed,
+          lastUpdate: latestActivity(data.activity)
         }))
       } catch (error) {
         console.error('Error fetching stats:', error)
@@ -130,7 +141,7 @@ const Dashboard = () => {
               <div className="metric-change positive">Сегодня</div>
             </div>
           </div>
-          <div className="metric-value">2 дня</div>
+          <div className="metric-value">{formatDaysAgo(stats.lastUpdate)}</div>
           <div className="metric-label">Последнее обновление</div>
         </div>
       </div>
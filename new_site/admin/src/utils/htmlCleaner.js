@@ -1,3 +1,5 @@
+import { API_ENDPOINTS, MAX_BATCH_ITEMS } from '@/config/api'
+
 // Функция для определения и исправления обратного текста
 export const fixReversedText = (text) => {
   if (!text || typeof text !== 'string') return text
@@ -75,62 +77,105 @@ export const cleanHTML = (html) => {
   return cleaned
 }
 
+// Отправляет обновления пакетами по MAX_BATCH_ITEMS.
+// Возвращает число примененных изменений и список неудачных элементов;
+// ошибка HTTP прерывает отправку оставшихся пакетов
+const sendBatchUpdates = async (url, token, updates) => {
+  let applied = 0
+  const failed = []
+  
+  for (let start = 0; start < updates.length; start += MAX_BATCH_ITEMS) {
+    const chunk = updates.slice(start, start + MAX_BATCH_ITEMS)
+    const response = await fetch(url, {
+      method: 'POST',
+      headers: {
+        'Content-Type': 'application/json',
+        Authorization: `Bearer ${token}`
+      },
+      body: JSON.stringify({ update: chunk })
+    })
+    
+    if (!response.ok) {
+      throw new Error(`Пакет не применен: HTTP ${response.status}`)
+    }
+    
+    const result = await response.json()
+    applied += result.applied
+    for (const item of result.results) {
+      if (item.status !== 'ok') {
+        failed.push(item)
+      }
+    }
+  }
+  
+  return { applied, failed }
+}
+
+const reportFailed = (failed) => {
+  for (const item of failed) {
+    console.error(`Не обновлен элемент ${item.id}: ${item.status}${item.detail ? ` (${item.detail})` : ''}`)
+  }
+}
+
 // Функция для миграции всех записей блога
 export const migratePostsHTML = async () => {
   try {
     const token = localStorage.getItem('admin_token')
     if (!token) return
     
-    const response = await fetch('http://localhost:8000/api/admin/posts', {
+    const response = await fetch(API_ENDPOINTS.ADMIN_POSTS, {
       headers: { Authorization: `Bearer ${token}` }
     })
     
-    if (!response.ok) return
+    if (!response.ok) {
+      throw new Error(`Ошибка загрузки записей: HTTP ${response.status}`)
+    }
     
     const posts = await response.json()
+    const updates = []
     
     for (const post of posts) {
+      const update = { id: post.id }
       let needsUpdate = false
-      const updatedPost = { ...post }
       
       // Очищаем заголовок
       const cleanTitle = cleanHTML(post.title)
       if (cleanTitle !== post.title) {
-        updatedPost.title = cleanTitle
+        update.title = cleanTitle
         needsUpdate = true
       }
       
       // Очищаем описание
       const cleanExcerpt = cleanHTML(post.excerpt)
       if (cleanExcerpt !== post.excerpt) {
-        updatedPost.excerpt = cleanExcerpt
+        update.excerpt = cleanExcerpt
         needsUpdate = true
       }
       
       // Очищаем содержание
       const cleanContent = cleanHTML(post.content)
       if (cleanContent !== post.content) {
-        updatedPost.content = cleanContent
+        update.content = cleanContent
         needsUpdate = true
       }
       
-      // Обновляем запись если нужно
       if (needsUpdate) {
-        await fetch(`http://localhost:8000/api/admin/posts/${post.id}`, {
-          method: 'PUT',
-          headers: {
-            'Content-Type': 'application/json',
-            Authorization: `Bearer ${token}`
-          },
-          body: JSON.stringify(updatedPost)
-        })
-        console.log(`Обновлена запись: ${post.title}`)
+        updates.push(update)
+        console.log(`Будет обновлена запись: ${post.title}`)
       }
     }
     
+    // Изменения пакетами: один запрос и одна транзакция на пакет
+    const { failed } = await sendBatchUpdates(API_ENDPOINTS.ADMIN_POSTS_BATCH, token, updates)
+    if (failed.length > 0) {
+      reportFailed(failed)
+      throw new Error(`Не обновлено записей: ${failed.length} из ${updates.length}`)
+    }
+    
     console.log('Миграция HTML завершена')
   } catch (error) {
     console.error('Ошибка миграции HTML:', error)
+    throw error
   }
 }
 
@@ -143,7 +188,7 @@ export const fixReversedGoals = async () => {
       return
     }
     
-    const response = await fetch('http://localhost:8000/api/admin/goals', {
+    const response = await fetch(API_ENDPOINTS.ADMIN_GOALS, {
       headers: { Authorization: `Bearer ${token}` }
     })
     
@@ -153,7 +198,7 @@ export const fixReversedGoals = async () => {
     }
     
     const categories = await response.json()
-    let fixedCount = 0
+    const updates = []
     
     for (const category of categories) {
       for (const goal of category.goals) {
@@ -162,23 +207,17 @@ export const fixReversedGoals = async () => {
         
         if (fixedText !== originalText) {
           console.log(`Исправляем цель: "${originalText}" -> "${fixedText}"`)
-          
-          const updatedGoal = { ...goal, text: fixedText }
-          
-          await fetch(`http://localhost:8000/api/admin/goals/${goal.id}`, {
-            method: 'PUT',
-            headers: {
-              'Content-Type': 'application/json',
-              Authorization: `Bearer ${token}`
-            },
-            body: JSON.stringify(updatedGoal)
-          })
-          
-          fixedCount++
+          updates.push({ id: goal.id, text: fixedText })
         }
       }
     }
     
+    const { applied, failed } = await sendBatchUpdates(API_ENDPOINTS.ADMIN_GOALS_BATCH, token, updates)
+    if (failed.length > 0) {
+      reportFailed(failed)
+    }
+    const fixedCount = applied
+    
     console.log(`Исправлено целей: ${fixedCount}`)
     return fixedCount
   } catch (error) {
@@ -1,44 +1,86 @@
+import asyncio
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime, timedelta
+from functools import lru_cache
 from typing import Optional
-from jose import JWTError, jwt
-from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
-from .database import get_db
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from .database import get_async_db
 from .models import User
 import os
 from dotenv import load_dotenv
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-here-fixed-for-development")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 1440  # 24 часа
 
-pwd_context = CryptContext(schemes=["pbkdf2_sha256"], deprecated="auto")
+# jose (через cryptography) и passlib заметно замедляют импорт приложения,
+# а нужны только для входа и проверки токена: загружаются при первом вызове
+@lru_cache(maxsize=None)
+def _pwd_context():
+    from passlib.context import CryptContext
+    return CryptContext(schemes=["pbkdf2_sha256"], deprecated="auto")
+
 security = HTTPBearer()
 
+# Отдельный ограниченный пул для PBKDF2: шторм логинов не занимает
+# event loop и общий пул потоков Starlette, а лишние запросы получают 429
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", max(1, (os.cpu_count() or 2) // 2)))
+PASSWORD_HASH_QUEUE_SIZE = int(os.getenv("PASSWORD_HASH_QUEUE_SIZE", 16))
+
+_hash_executor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash")
+_hash_slots = threading.BoundedSemaphore(PASSWORD_HASH_WORKERS + PASSWORD_HASH_QUEUE_SIZE)
+
 def verify_password(plain_password, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
+    return _pwd_context().verify(plain_password, hashed_password)
 
 def get_password_hash(password):
-    return pwd_context.hash(password)
+    return _pwd_context().hash(password)
+
+async def _run_password_job(func, *args):
+    """Выполняет func в пуле хэширования; 429, если очередь заполнена"""
+    if not _hash_slots.acquire(blocking=False):
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Слишком много одновременных запросов авторизации, повторите позже",
+            headers={"Retry-After": "1"},
+        )
+    future = _hash_executor.submit(func, *args)
+    # Слот освобождается, когда поток закончил работу, даже если клиент отключился
+    future.add_done_callback(lambda _: _hash_slots.release())
+    return await asyncio.wrap_future(future)
+
+async def verify_password_async(plain_password, hashed_password):
+    return await _run_password_job(verify_password, plain_password, hashed_password)
 
-def authenticate_user(db: Session, username: str, password: str):
-    print(f"Authenticating user: {username}")
-    user = db.query(User).filter(User.username == username).first()
+async def get_password_hash_async(password):
+    return await _run_password_job(get_password_hash, password)
+
+async def authenticate_user(db: AsyncSession, username: str, password: str):
+    user = await db.scalar(select(User).where(User.username == username))
     if not user:
-        print(f"User {username} not found")
+        logger.info("Login failed: user %s not found", username)
         return False
-    print(f"User found: {user.username}")
-    password_valid = verify_password(password, user.hashed_password)
-    print(f"Password valid: {password_valid}")
+    password_valid = await verify_password_async(password, user.hashed_password)
     if not password_valid:
+        logger.info("Login failed: wrong password for %s", username)
         return False
     return user
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
+    from jose import jwt
+
     to_encode = data.copy()
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
@@ -48,39 +90,103 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
+@dataclass(frozen=True)
+class AuthenticatedUser:
+    """Идентичность пользователя из проверенного токена (без привязки к сессии БД)"""
+    id: int
+    username: str
+
+class TokenCache:
+    """Ограниченный LRU-кэш проверенных токенов с TTL.
+
+    Запись живет не дольше TOKEN_CACHE_TTL секунд и не дольше срока
+    действия самого токена. Кэш локален для процесса, поэтому TTL
+    ограничивает и время, в течение которого другой воркер может
+    принимать токен после смены имени пользователя.
+    """
+
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+
+    def get(self, token: str) -> Optional[AuthenticatedUser]:
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                return None
+            identity, expires_at = entry
+            if time.time() >= expires_at:
+                del self._entries[token]
+                return None
+            self._entries.move_to_end(token)
+            return identity
+
+    def set(self, token: str, identity: AuthenticatedUser, token_exp: Optional[float]):
+        expires_at = time.time() + self.ttl
+        if token_exp:
+            expires_at = min(expires_at, token_exp)
+        with self._lock:
+            self._entries[token] = (identity, expires_at)
+            self._entries.move_to_end(token)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate_user(self, user_id: int):
+        with self._lock:
+            stale = [token for token, (identity, _) in self._entries.items() if identity.id == user_id]
+            for token in stale:
+                del self._entries[token]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+token_cache = TokenCache(
+    max_size=int(os.getenv("TOKEN_CACHE_SIZE", 1024)),
+    ttl=float(os.getenv("TOKEN_CACHE_TTL", 60)),
+)
+
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
-):
+    db: AsyncSession = Depends(get_async_db)
+) -> AuthenticatedUser:
+    token = credentials.credentials
+    identity = token_cache.get(token)
+    if identity is not None:
+        return identity
+
+    from jose import JWTError, jwt
+
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
     try:
-        print(f"Validating token: {credentials.credentials[:20]}...")
-        payload = jwt.decode(credentials.credentials, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         username: str = payload.get("sub")
         exp = payload.get("exp")
-        current_time = datetime.utcnow().timestamp()
-        print(f"Token username: {username}, expires: {exp}, current: {current_time}")
         
         if username is None:
-            print("Username is None in token")
+            logger.debug("Token has no subject")
             raise credentials_exception
             
-        if exp and current_time > exp:
-            print("Token has expired")
+        if exp and time.time() > exp:
+            logger.debug("Token for %s has expired", username)
             raise credentials_exception
             
     except JWTError as e:
-        print(f"JWT decode error: {e}")
+        logger.debug("JWT decode error: %s", e)
         raise credentials_exception
     
-    user = db.query(User).filter(User.username == username).first()
+    user = await db.scalar(select(User).where(User.username == username))
     if user is None:
-        print(f"User {username} not found in database")
+        logger.info("User %s from token not found in database", username)
         raise credentials_exception
-        
-    print(f"User {username} authenticated successfully")
-    return user
\ No newline at end of file
+    
+    identity = AuthenticatedUser(id=user.id, username=user.username)
+    token_cache.set(token, identity, exp)
+    logger.debug("User %s authenticated", username)
+    return identity
@@ -0,0 +1,138 @@
+from collections import defaultdict
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.orm import Session
+
+from .events import ChangeEvent, CREATE, UPDATE, DELETE, record
+from .models import BlogPost, Goal, GoalCategory, SocialNetwork
+from .search import reindex_posts
+
+OK = "ok"
+NOT_FOUND = "not_found"
+CONFLICT = "conflict"
+
+
+def _result(operation: str, index: int, item_id: Optional[int], status: str = OK, detail: str = None):
+    return {"operation": operation, "index": index, "id": item_id, "status": status, "detail": detail}
+
+
+def apply_batch(
+    db: Session,
+    model,
+    batch,
+    prepare: Callable[[Session, List[dict], Dict[int, dict]], None] = None,
+    delete_conflicts: Callable[[Session, List[int]], Dict[int, str]] = None,
+    after_write: Callable[[Session, List[int]], None] = None,
+):
+    """Применяет пакет create/update/delete/reorder одной транзакцией.
+
+    Вместо запроса на строку выполняется по одному оператору на вид
+    изменения: DELETE ... WHERE id IN (...), UPDATE по первичному ключу
+    и INSERT ... RETURNING через executemany. Элементы с несуществующим
+    id получают статус not_found и пропускаются, остальные применяются.
+    Ошибки целостности (повтор slug) откатывают весь пакет: IntegrityError
+    обрабатывает вызывающий код.
+
+    prepare дополняет данные перед записью, delete_conflicts возвращает
+    {id: причина} строк, которые нельзя удалить, after_write получает id
+    всех затронутых строк.
+    """
+    results = []
+    reorder = getattr(batch, "reorder", [])
+    referenced = set(batch.delete) | {item.id for item in batch.update} | {item.id for item in reorder}
+    existing = set(db.scalars(select(model.id).where(model.id.in_(referenced)))) if referenced else set()
+
+    conflicts = delete_conflicts(db, [i for i in batch.delete if i in existing]) if delete_conflicts else {}
+    deleted = []
+    for index, item_id in enumerate(batch.delete):
+        if item_id not in existing or item_id in deleted:
+            results.append(_result("delete", index, item_id, NOT_FOUND))
+        elif item_id in conflicts:
+            results.append(_result("delete", index, item_id, CONFLICT, conflicts[item_id]))
+        else:
+            deleted.append(item_id)
+            results.append(_result("delete", index, item_id))
+
+    # Несколько изменений одной строки сливаются, позднее перекрывает раннее
+    updates: Dict[int, dict] = {}
+    changes = [("update", item.id, item.dict(exclude_unset=True, exclude={"id"})) for item in batch.update]
+    changes += [("reorder", item.id, {"order": item.order}) for item in reorder]
+    indexes = defaultdict(int)
+    for operation, item_id, fields in changes:
+        index = indexes[operation]
+        indexes[operation] += 1
+        if item_id not in existing or item_id in deleted:
+            results.append(_result(operation, index, item_id, NOT_FOUND))
+            continue
+        updates.setdefault(item_id, {}).update(fields)
+        results.append(_result(operation, index, item_id))
+
+    creates = [item.dict() for item in batch.create]
+    if prepare:
+        prepare(db, creates, updates)
+
+    if deleted:
+        db.execute(delete(model).where(model.id.in_(deleted)), execution_options={"synchronize_session": False})
+    # executemany требует одинакового набора колонок в строках
+    groups = defaultdict(list)
+    for item_id, fields in updates.items():
+        if fields:
+            groups[tuple(sorted(fields))].append({"id": item_id, **fields})
+    for rows in groups.values():
+        db.execute(update(model), rows)
+    created = []
+    if creates:
+        created = list(db.scalars(insert(model).returning(model.id, sort_by_parameter_order=True), creates))
+        results = [_result("create", index, item_id) for index, item_id in enumerate(created)] + results
+
+    if after_write:
+        after_write(db, created + list(updates) + deleted)
+    table = model.__tablename__
+    record(db, [ChangeEvent(table, item_id, CREATE) for item_id in created])
+    record(db, [ChangeEvent(table, item_id, UPDATE) for item_id, fields in updates.items() if fields])
+    record(db, [ChangeEvent(table, item_id, DELETE) for item_id in deleted])
+    db.commit()
+    return {"applied": sum(result["status"] == OK for result in results), "results": results}
+
+
+def _prepare_posts(db: Session, creates: List[dict], updates: Dict[int, dict]):
+    """Дата публикации, как в create_post/update_post: при первой публикации без даты - сейчас"""
+    now = datetime.now()
+    for data in creates:
+        if data.get("published") and not data.get("published_at"):
+            data["published_at"] = now
+    publishing = [item_id for item_id, fields in updates.items() if fields.get("published") and not fields.get("published_at")]
+    if publishing:
+        already = set(db.scalars(select(BlogPost.id).where(BlogPost.id.in_(publishing), BlogPost.published == True)))
+        for item_id in publishing:
+            if item_id not in already:
+                updates[item_id]["published_at"] = now
+
+
+def _categories_with_goals(db: Session, category_ids: List[int]) -> Dict[int, str]:
+    rows = (
+        db.query(Goal.category_id, func.count(Goal.id))
+        .filter(Goal.category_id.in_(category_ids))
+        .group_by(Goal.category_id)
+    )
+    return {category_id: f"В категории есть цели: {count}" for category_id, count in rows}
+
+
+def apply_post_batch(db: Session, batch):
+    # Массовые операторы не вызывают событий маппера, индекс поиска
+    # обновляется явно в той же транзакции
+    return apply_batch(db, BlogPost, batch, prepare=_prepare_posts, after_write=reindex_posts)
+
+
+def apply_goal_batch(db: Session, batch):
+    return apply_batch(db, Goal, batch)
+
+
+def apply_category_batch(db: Session, batch):
+    return apply_batch(db, GoalCategory, batch, delete_conflicts=_categories_with_goals)
+
+
+def apply_social_network_batch(db: Session, batch):
+    return apply_batch(db, SocialNetwork, batch)
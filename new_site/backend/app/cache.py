@@ -0,0 +1,282 @@
+import hashlib
+import math
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Dict, Hashable, List, Optional, Set, Tuple
+
+from .compression import compress, MIN_COMPRESS_SIZE
+from .events import ChangeEvent, change_events
+
+# Пространства имен кэша. Ключ записи - кортеж, первый элемент которого
+# совпадает с одним из пространств; инвалидация выполняется по пространству.
+SITE = "site"
+POSTS = "posts"
+GOALS = "goals"
+SOCIAL_NETWORKS = "social-networks"
+# Счетчики панели администратора (/api/admin/stats)
+STATS = "stats"
+
+ALL_NAMESPACES = (SITE, POSTS, GOALS, SOCIAL_NETWORKS, STATS)
+
+# Какие пространства устаревают при изменении строк таблицы. Копии
+# изображений входят в ответы и настроек сайта (фото профиля), и постов.
+NAMESPACES_BY_TABLE = {
+    "site_settings": (SITE, STATS),
+    "image_variants": (SITE, POSTS),
+    "blog_posts": (POSTS, STATS),
+    "goals": (GOALS, STATS),
+    "goal_categories": (GOALS, STATS),
+    "social_networks": (SOCIAL_NETWORKS,),
+}
+
+
+@dataclass
+class CachedResponse:
+    """Готовый ответ вместе с валидаторами для условных запросов.
+
+    Сжатые варианты тела строятся при первом запросе с нужной кодировкой
+    и живут вместе с записью, то есть сжимаются один раз на версию данных.
+    """
+    body: bytes
+    # Целые секунды: ровно то, что уходит в заголовке Last-Modified
+    last_modified: int
+    etag: str = field(init=False)
+    _encoded: Dict[str, bytes] = field(init=False, default_factory=dict, repr=False)
+
+    def __post_init__(self):
+        # Сильный ETag: хэш точных байтов ответа, одинаковый во всех воркерах
+        self.etag = '"%s"' % hashlib.blake2b(self.body, digest_size=16).hexdigest()
+
+    def content_encoding(self, encoding: Optional[str]) -> Optional[str]:
+        """Кодировка, в которой будет отдан ответ; маленькие ответы не сжимаются"""
+        if encoding is None or len(self.body) < MIN_COMPRESS_SIZE:
+            return None
+        return encoding
+
+    def is_encoded(self, encoding: Optional[str]) -> bool:
+        return encoding is None or encoding in self._encoded
+
+    def encoded_body(self, encoding: Optional[str]) -> bytes:
+        if encoding is None:
+            return self.body
+        body = self._encoded.get(encoding)
+        if body is None:
+            # Гонка двух запросов безопасна: оба получат одинаковые байты
+            body = self._encoded[encoding] = compress(self.body, encoding)
+        return body
+
+    def etag_for(self, encoding: Optional[str]) -> str:
+        # Сжатое представление - другие байты, значит и другой сильный ETag
+        return self.etag if encoding is None else '%s-%s"' % (self.etag[:-1], encoding)
+
+    def headers(self, encoding: Optional[str] = None):
+        headers = {
+            "ETag": self.etag_for(encoding),
+            "Last-Modified": formatdate(self.last_modified, usegmt=True),
+            "Cache-Control": "no-cache",
+            "Vary": "Accept-Encoding",
+        }
+        if encoding is not None:
+            headers["Content-Encoding"] = encoding
+        return headers
+
+    def is_not_modified(self, if_none_match: Optional[str], if_modified_since: Optional[str]) -> bool:
+        """Проверка If-None-Match / If-Modified-Since по RFC 9110"""
+        if if_none_match is not None:
+            # If-None-Match приоритетнее If-Modified-Since; сравнение слабое,
+            # ETag любого из представлений подтверждает ту же версию данных
+            if if_none_match.strip() == "*":
+                return True
+            tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+            return any(tag == self.etag or tag.startswith(self.etag[:-1] + "-") for tag in tags)
+        if if_modified_since:
+            try:
+                since = parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError):
+                return False
+            return self.last_modified <= since
+        return False
+
+    @property
+    def size(self) -> int:
+        """Байты тела вместе со сжатыми вариантами"""
+        return len(self.body) + sum(len(body) for body in self._encoded.values())
+
+
+class ResponseCache:
+    """Потокобезопасный in-process кэш готовых JSON ответов публичного API.
+
+    Данные меняются только через /api/admin/*, поэтому записи живут до
+    инвалидации, которую после каждого коммита выполняет шина событий
+    (app/events.py). Счетчик поколений защищает от гонки, когда запрос начал
+    строить ответ до записи в админке, а сохранить его пытается после.
+    Кэш локален для процесса: при запуске нескольких воркеров каждый
+    держит свою копию, а коммиты других воркеров замечает DataVersionWatcher
+    (включается при WEB_CONCURRENCY > 1 и WAL) и сбрасывает кэш целиком.
+
+    Last-Modified берется из момента последней инвалидации пространства,
+    а не из max(updated_at): удаление строки не оставляет следа в колонках,
+    и ответ мог бы ошибочно считаться неизмененным. HTTP-дата точна до
+    секунды, поэтому момент округляется вверх и у каждой инвалидации
+    пространства строго больше предыдущего: две правки в одну секунду
+    иначе получили бы одинаковый Last-Modified, и клиент со старой версией
+    получил бы 304 по If-Modified-Since.
+    """
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        # LRU: страниц пагинации может быть много, размер кэша ограничен
+        self._entries: "OrderedDict[Tuple[Hashable, ...], CachedResponse]" = OrderedDict()
+        self._generations: Dict[str, int] = {}
+        self._started_at = math.ceil(time.time())
+        self._changed_at: Dict[str, int] = {}
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.external_changes = 0
+        self.watcher: Optional["DataVersionWatcher"] = None
+
+    def get(self, key: Tuple[Hashable, ...]) -> Optional[CachedResponse]:
+        # Проверка до поиска записи: запись, построенная по данным до чужого
+        # коммита, будет сброшена не позже следующего запроса
+        if self.watcher is not None and self.watcher.changed():
+            self.external_changes += 1
+            self.clear()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self._entries.move_to_end(key)
+            return entry
+
+    def generation(self, key: Tuple[Hashable, ...]) -> int:
+        with self._lock:
+            return self._generations.get(key[0], 0)
+
+    def set(self, key: Tuple[Hashable, ...], body: bytes, generation: int) -> CachedResponse:
+        with self._lock:
+            entry = CachedResponse(body, self._changed_at.get(key[0], self._started_at))
+            # Пространство успели инвалидировать, пока строился ответ
+            if self._generations.get(key[0], 0) == generation:
+                self._entries[key] = entry
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+            return entry
+
+    def invalidate(self, *namespaces: str):
+        with self._lock:
+            now = math.ceil(time.time())
+            for namespace in namespaces:
+                self._generations[namespace] = self._generations.get(namespace, 0) + 1
+                previous = self._changed_at.get(namespace, self._started_at)
+                self._changed_at[namespace] = max(now, previous + 1)
+            stale = [key for key in self._entries if key[0] in namespaces]
+            for key in stale:
+                del self._entries[key]
+            self.invalidations += len(stale)
+
+    def clear(self):
+        self.invalidate(*ALL_NAMESPACES)
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": sum(entry.size for entry in self._entries.values()),
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+                "external_changes": self.external_changes,
+                "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+            }
+
+
+class DataVersionWatcher:
+    """Замечает коммиты других процессов в базу SQLite через отдельное соединение.
+
+    PRAGMA data_version меняется, когда данные закоммитило любое другое
+    соединение. Какие таблицы изменились, неизвестно, поэтому кэш
+    сбрасывается целиком. Собственные коммиты процесса инвалидируются
+    точечно шиной событий, а после них версия перечитывается
+    (acknowledge) и сброса не вызывает; чужой коммит, попавший ровно
+    между своим коммитом и перечитыванием, будет пропущен до следующего.
+
+    Нужен только нескольким воркерам в режиме WAL: там проверка читает
+    общую память WAL и не ждет блокировок. Соединение открыто с timeout=0,
+    поэтому занятая база не блокирует event loop, а считается измененной.
+    """
+
+    def __init__(self, database_path: str):
+        self._connection = sqlite3.connect(
+            database_path, timeout=0, check_same_thread=False, isolation_level=None,
+        )
+        self._lock = threading.Lock()
+        self._version = self._read()
+
+    def _read(self) -> int:
+        return self._connection.execute("PRAGMA data_version").fetchone()[0]
+
+    def journal_mode(self) -> str:
+        with self._lock:
+            return self._connection.execute("PRAGMA journal_mode").fetchone()[0]
+
+    def changed(self) -> bool:
+        with self._lock:
+            try:
+                version = self._read()
+            except sqlite3.OperationalError:
+                return True
+            if version == self._version:
+                return False
+            self._version = version
+            return True
+
+    def acknowledge(self):
+        """Принимает текущую версию после собственного коммита процесса"""
+        with self._lock:
+            try:
+                self._version = self._read()
+            except sqlite3.OperationalError:
+                pass
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+
+def watch_database(database_path: str) -> bool:
+    """Включает сброс кэша по чужим коммитам, если база в режиме WAL"""
+    watcher = DataVersionWatcher(database_path)
+    if watcher.journal_mode() != "wal":
+        watcher.close()
+        return False
+    response_cache.watcher = watcher
+    return True
+
+
+response_cache = ResponseCache()
+
+
+def namespaces_for(events: List[ChangeEvent]) -> Set[str]:
+    return {namespace for change in events for namespace in NAMESPACES_BY_TABLE.get(change.entity, ())}
+
+
+@change_events.subscribe
+def _invalidate_changed(events: List[ChangeEvent]):
+    """Инвалидация сразу после коммита, до ответа админке: следующий
+    публичный запрос уже не получит старых данных"""
+    # Свой коммит не считается чужим изменением базы
+    if response_cache.watcher is not None:
+        response_cache.watcher.acknowledge()
+    namespaces = namespaces_for(events)
+    if namespaces:
+        response_cache.invalidate(*namespaces)
@@ -1,16 +1,100 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
 import os
+from typing import Optional
 from dotenv import load_dotenv
 
 load_dotenv()
 
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./site.db")
+# development - настройки SQLite по умолчанию, production - WAL и пул соединений
+DATABASE_PROFILE = os.getenv("DATABASE_PROFILE", "development")
 
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+def production_pragmas():
+    """PRAGMA, выполняемые на каждом новом соединении в профиле production"""
+    return {
+        # Читатели не блокируются записью из админки
+        "journal_mode": "WAL",
+        # В режиме WAL безопасно: fsync только на чекпойнтах
+        "synchronous": "NORMAL",
+        "mmap_size": int(os.getenv("SQLITE_MMAP_SIZE", 256 * 1024 * 1024)),
+        # Отрицательное значение - размер в КиБ (64 МБ)
+        "cache_size": int(os.getenv("SQLITE_CACHE_SIZE", -64000)),
+        "busy_timeout": int(os.getenv("SQLITE_BUSY_TIMEOUT", 5000)),
+        "temp_store": "MEMORY",
+    }
+
+def _install_pragmas(sync_engine):
+    pragmas = production_pragmas()
+
+    @event.listens_for(sync_engine, "connect")
+    def _apply_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+def create_db_engine(url: str = DATABASE_URL, profile: str = DATABASE_PROFILE, is_async: bool = False):
+    """Создает engine (синхронный или asyncio) для выбранного профиля.
+
+    Размер пула в production задается DATABASE_POOL_SIZE и по умолчанию
+    совпадает с числом потоков, которые один воркер uvicorn отдает под
+    синхронные эндпоинты (40 в Starlette), чтобы запросы не ждали соединение.
+    """
+    if profile not in ("development", "production"):
+        raise ValueError(f"Unknown DATABASE_PROFILE: {profile}")
+
+    is_sqlite = make_url(url).get_backend_name() == "sqlite"
+    kwargs = {}
+    if is_sqlite:
+        kwargs["connect_args"] = {"check_same_thread": False}
+    if profile == "production":
+        kwargs.update(
+            poolclass=AsyncAdaptedQueuePool if is_async else QueuePool,
+            pool_size=int(os.getenv("DATABASE_POOL_SIZE", 40)),
+            max_overflow=int(os.getenv("DATABASE_MAX_OVERFLOW", 10)),
+            pool_timeout=int(os.getenv("DATABASE_POOL_TIMEOUT", 30)),
+        )
+
+    if is_async:
+        db_engine = create_async_engine(url, **kwargs)
+        sync_engine = db_engine.sync_engine
+    else:
+        db_engine = sync_engine = create_engine(url, **kwargs)
+
+    if is_sqlite and profile == "production":
+        _install_pragmas(sync_engine)
+
+    return db_engine
+
+def sqlite_database_path(url: str = DATABASE_URL) -> Optional[str]:
+    """Путь к файлу базы SQLite; None для других СУБД и базы в памяти"""
+    parsed = make_url(url)
+    if parsed.get_backend_name() != "sqlite" or parsed.database in (None, "", ":memory:"):
+        return None
+    return parsed.database
+
+def async_database_url(url: str = DATABASE_URL) -> str:
+    """URL для asyncio engine: ASYNC_DATABASE_URL или DATABASE_URL с драйвером aiosqlite"""
+    explicit = os.getenv("ASYNC_DATABASE_URL")
+    if explicit:
+        return explicit
+    parsed = make_url(url)
+    if parsed.get_backend_name() == "sqlite":
+        parsed = parsed.set(drivername="sqlite+aiosqlite")
+    return parsed.render_as_string(hide_password=False)
+
+engine = create_db_engine()
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Асинхронный слой для эндпоинтов, работающих в event loop
+async_engine = create_db_engine(async_database_url(), is_async=True)
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 Base = declarative_base()
 
 def get_db():
@@ -18,4 +102,24 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+def create_tables():
+    """Создает таблицы, недостающие индексы и поисковый индекс.
+
+    create_all не добавляет новые индексы в уже существующие таблицы,
+    поэтому для старых site.db индексы создаются отдельно (checkfirst).
+    """
+    from . import models  # noqa: F401 - регистрация моделей в Base.metadata
+    from .search import ensure_search_index
+
+    Base.metadata.create_all(bind=engine)
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
+    # Полнотекстовый индекс постов (FTS5) не описывается моделями
+    ensure_search_index(engine)
@@ -0,0 +1,215 @@
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Iterable, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+CREATE = "create"
+UPDATE = "update"
+DELETE = "delete"
+
+# Ключ в Session.info, где копятся события до коммита
+_PENDING_KEY = "change_events"
+
+
+@dataclass(frozen=True)
+class ChangeEvent:
+    """Изменение данных после успешного коммита.
+
+    entity - имя таблицы (blog_posts, goals, ...), id - первичный ключ строки
+    или None для массовых UPDATE/DELETE, затронувших неизвестные строки.
+    """
+    entity: str
+    id: Optional[int]
+    operation: str
+
+
+Handler = Callable[[List[ChangeEvent]], None]
+
+
+class DebouncedWorker:
+    """Фоновый поток, объединяющий серию событий в один вызов job.
+
+    job вызывается через delay секунд тишины после последнего события,
+    но не позже max_delay секунд после первого, чтобы непрерывное
+    редактирование не откладывало работу бесконечно. job получает все
+    накопленные события без повторов, в порядке появления.
+    """
+
+    def __init__(self, job: Handler, delay: float = 2.0, max_delay: float = 30.0, name: str = None):
+        self.job = job
+        self.delay = delay
+        self.max_delay = max_delay
+        self.name = name or getattr(job, "__name__", "job")
+        self.runs = 0
+        self._condition = threading.Condition()
+        self._pending: dict = {}
+        self._first_at: Optional[float] = None
+        self._last_at: Optional[float] = None
+        self._running = False
+        self._closed = False
+        self._thread = threading.Thread(target=self._loop, name=f"debounce-{self.name}", daemon=True)
+        self._thread.start()
+
+    def __call__(self, events: List[ChangeEvent]):
+        with self._condition:
+            now = time.monotonic()
+            if self._first_at is None:
+                self._first_at = now
+            self._last_at = now
+            for change in events:
+                self._pending.setdefault(change, None)
+            self._condition.notify()
+
+    def _due_at(self) -> float:
+        return min(self._last_at + self.delay, self._first_at + self.max_delay)
+
+    def _loop(self):
+        while True:
+            with self._condition:
+                while not self._closed and (not self._pending or time.monotonic() < self._due_at()):
+                    timeout = self._due_at() - time.monotonic() if self._pending else None
+                    self._condition.wait(timeout)
+                if not self._pending:
+                    return
+                events = list(self._pending)
+                self._pending.clear()
+                self._first_at = self._last_at = None
+                self._running = True
+            try:
+                self.job(events)
+            except Exception:
+                logger.exception("Ошибка в отложенной задаче %s", self.name)
+            finally:
+                with self._condition:
+                    self._running = False
+                    self.runs += 1
+                    self._condition.notify_all()
+
+    def flush(self, timeout: float = None) -> bool:
+        """Выполняет накопленное немедленно и ждет завершения; True, если успели"""
+        with self._condition:
+            if self._pending:
+                self._first_at = self._last_at = time.monotonic() - max(self.delay, self.max_delay)
+                self._condition.notify_all()
+            return self._condition.wait_for(lambda: not self._pending and not self._running, timeout)
+
+    def close(self, timeout: float = None):
+        """Останавливает поток, предварительно выполнив накопленные события"""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        self._thread.join(timeout)
+
+    def stats(self):
+        with self._condition:
+            return {"name": self.name, "pending": len(self._pending), "runs": self.runs}
+
+
+class ChangeEventBus:
+    """Шина событий изменения данных.
+
+    Обработчики subscribe вызываются сразу после коммита в потоке запроса
+    (инвалидация кэша должна случиться до ответа админке). Для тяжелой работы
+    (пересборка экспорта, переиндексация) используется subscribe_debounced.
+    """
+
+    def __init__(self):
+        self._handlers: List[Handler] = []
+        self._workers: List[DebouncedWorker] = []
+
+    def subscribe(self, handler: Handler) -> Handler:
+        self._handlers.append(handler)
+        return handler
+
+    def subscribe_debounced(self, job: Handler, delay: float = 2.0, max_delay: float = 30.0, name: str = None):
+        worker = DebouncedWorker(job, delay, max_delay, name)
+        self._workers.append(worker)
+        self.subscribe(worker)
+        return worker
+
+    def emit(self, events: Iterable[ChangeEvent]):
+        events = list(dict.fromkeys(events))
+        if not events:
+            return
+        for handler in list(self._handlers):
+            try:
+                handler(events)
+            except Exception:
+                logger.exception("Ошибка обработчика событий изменения")
+
+    def flush(self, timeout: float = None):
+        for worker in self._workers:
+            worker.flush(timeout)
+
+    def close(self, timeout: float = None):
+        for worker in self._workers:
+            worker.close(timeout)
+        self._workers.clear()
+
+    def stats(self):
+        return [worker.stats() for worker in self._workers]
+
+
+change_events = ChangeEventBus()
+
+
+def _table_name(obj) -> Optional[str]:
+    return getattr(obj, "__tablename__", None)
+
+
+def _pending(session) -> list:
+    return session.info.setdefault(_PENDING_KEY, [])
+
+
+def record(session: Session, events: Iterable[ChangeEvent]):
+    """Добавляет события к транзакции сессии; они будут отправлены после коммита.
+
+    Нужно для массовых операций: ORM видит только сам оператор
+    UPDATE/DELETE, но не id затронутых строк.
+    """
+    _pending(session).extend(events)
+
+
+# События собираются из ORM сессий автоматически, поэтому обработчики
+# эндпоинтов не перечисляют, что они изменили. Сессии AsyncSession
+# работают через sync Session и попадают сюда же.
+@event.listens_for(Session, "after_flush")
+def _collect_flushed(session, flush_context):
+    pending = _pending(session)
+    for obj in session.new:
+        pending.append(ChangeEvent(_table_name(obj), obj.id, CREATE))
+    for obj in session.dirty:
+        if session.is_modified(obj, include_collections=False):
+            pending.append(ChangeEvent(_table_name(obj), obj.id, UPDATE))
+    for obj in session.deleted:
+        pending.append(ChangeEvent(_table_name(obj), obj.id, DELETE))
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _collect_bulk(orm_execute_state):
+    """Массовые insert()/update()/delete() через session.execute"""
+    if not (orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    mapper = orm_execute_state.bind_mapper
+    if mapper is None:
+        return
+    operation = CREATE if orm_execute_state.is_insert else UPDATE if orm_execute_state.is_update else DELETE
+    _pending(orm_execute_state.session).append(ChangeEvent(mapper.local_table.name, None, operation))
+
+
+@event.listens_for(Session, "after_commit")
+def _emit_committed(session):
+    events = session.info.pop(_PENDING_KEY, None)
+    if events:
+        change_events.emit(events)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_rolled_back(session):
+    session.info.pop(_PENDING_KEY, None)
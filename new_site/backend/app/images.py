@@ -0,0 +1,146 @@
+import asyncio
+import multiprocessing
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import List, Optional
+
+STATIC_DIR = Path("static")
+VARIANTS_DIR = STATIC_DIR / "assets" / "images" / "variants"
+
+# Ширины уменьшенных копий; больше исходной ширины изображение не растягивается
+VARIANT_WIDTHS = tuple(
+    int(width) for width in os.getenv("IMAGE_VARIANT_WIDTHS", "320,640,1280").split(",")
+)
+IMAGE_WORKERS = int(os.getenv("IMAGE_WORKERS", 2))
+# Потолок числа пикселей: файл в 5MB может распаковаться в гигабайты памяти
+MAX_IMAGE_PIXELS = int(os.getenv("IMAGE_MAX_PIXELS", 40_000_000))
+
+_executor: Optional[ProcessPoolExecutor] = None
+
+
+class ImageTooLarge(Exception):
+    """Размеры изображения больше MAX_IMAGE_PIXELS"""
+
+
+def _output_formats():
+    """(расширение, MIME тип, параметры сохранения) для поддерживаемых Pillow форматов"""
+    from PIL import features
+
+    formats = [("webp", "image/webp", {"quality": 80, "method": 4})]
+    if features.check("avif"):
+        formats.append(("avif", "image/avif", {"quality": 60}))
+    return formats
+
+
+def build_variants(source_path: str, output_dir: str, stem: str, widths=VARIANT_WIDTHS) -> List[dict]:
+    """Создает уменьшенные копии изображения во всех форматах.
+
+    Выполняется в отдельном процессе. Метаданные (EXIF, ICC, комментарии)
+    не переносятся: ориентация из EXIF применяется к пикселям, после чего
+    сохраняются только пиксели. У анимированных GIF берется первый кадр.
+    Каждый файл пишется во временный и переименовывается атомарно.
+    Изображение больше MAX_IMAGE_PIXELS отклоняется до распаковки (ImageTooLarge).
+    """
+    from PIL import Image, ImageOps
+
+    # Pillow проверяет лимит только при открытии и бросает исключение
+    # лишь при двойном превышении, поэтому размеры проверяются и здесь
+    Image.MAX_IMAGE_PIXELS = MAX_IMAGE_PIXELS
+    output = Path(output_dir)
+    output.mkdir(parents=True, exist_ok=True)
+    formats = _output_formats()
+
+    try:
+        original = Image.open(source_path)
+    except Image.DecompressionBombError as error:
+        raise ImageTooLarge(str(error)) from None
+    with original:
+        if original.width * original.height > MAX_IMAGE_PIXELS:
+            raise ImageTooLarge(f"{original.width}x{original.height} больше {MAX_IMAGE_PIXELS} пикселей")
+        image = ImageOps.exif_transpose(original)
+        has_alpha = image.mode in ("RGBA", "LA", "PA") or "transparency" in image.info
+        image = image.convert("RGBA" if has_alpha else "RGB")
+
+    variants = []
+    for width in sorted({min(width, image.width) for width in widths}):
+        height = max(1, round(image.height * width / image.width))
+        if width == image.width:
+            resized = image.copy()
+        else:
+            resized = image.resize((width, height), Image.Resampling.LANCZOS)
+        resized.info = {}
+
+        for extension, mime_type, options in formats:
+            filename = f"{stem}-{width}w.{extension}"
+            fd, tmp_name = tempfile.mkstemp(dir=output, prefix=".variant-", suffix=f".{extension}")
+            os.close(fd)
+            try:
+                resized.save(tmp_name, **options)
+                os.chmod(tmp_name, 0o644)
+                os.replace(tmp_name, output / filename)
+            except BaseException:
+                os.unlink(tmp_name)
+                raise
+            variants.append({
+                "path": str(output / filename),
+                "width": width,
+                "height": height,
+                "mime_type": mime_type,
+            })
+    return variants
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        # spawn вместо fork: в родителе уже работают потоки aiosqlite и пулов
+        _executor = ProcessPoolExecutor(
+            max_workers=IMAGE_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _executor
+
+
+def static_url(path) -> str:
+    """static/assets/... -> /static/assets/..."""
+    return "/" + Path(path).as_posix()
+
+
+def static_path(url: str) -> Optional[Path]:
+    """/static/assets/... -> static/assets/...; None для чужих и небезопасных URL"""
+    path = Path(url.lstrip("/"))
+    if path.parts[:1] != ("static",) or ".." in path.parts:
+        return None
+    return path
+
+
+async def generate_variants(source_path: Path, stem: str) -> List[dict]:
+    """Строит копии в пуле процессов и возвращает их url, размеры и MIME тип.
+
+    Если процесс пула упал (например, убит по памяти), пул пересоздается
+    при следующем вызове, а BrokenProcessPool передается вызывающему.
+    """
+    global _executor
+    loop = asyncio.get_running_loop()
+    executor = _get_executor()
+    try:
+        variants = await loop.run_in_executor(
+            executor, build_variants, str(source_path), str(VARIANTS_DIR), stem
+        )
+    except BrokenProcessPool:
+        if _executor is executor:
+            _executor = None
+        executor.shutdown(wait=False)
+        raise
+    return [
+        {
+            "url": static_url(variant["path"]),
+            "width": variant["width"],
+            "height": variant["height"],
+            "mime_type": variant["mime_type"],
+        }
+        for variant in variants
+    ]
@@ -1,34 +1,140 @@
-from fastapi import FastAPI, Depends, HTTPException, status, Form, File, UploadFile
+import hmac
+import logging
+import os
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Depends, HTTPException, status, Form, File, UploadFile, Request, Query
+from fastapi.responses import Response
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.concurrency import run_in_threadpool
 from fastapi.security import HTTPBearer
-from fastapi.staticfiles import StaticFiles
+from sqlalchemy import select, delete
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from pathlib import Path
 from datetime import timedelta
-from typing import List
+from typing import List, Optional, Union
 
-from .database import SessionLocal, engine, get_db
-from .models import Base, SiteSettings, BlogPost, GoalCategory, Goal, User, SocialNetwork
+from .database import engine, async_engine, SessionLocal, get_db, get_async_db, sqlite_database_path
+from .models import SiteSettings, BlogPost, GoalCategory, Goal, User, SocialNetwork, ImageVariant
 from .schemas import (
     SiteSettings as SiteSettingsSchema,
     SiteSettingsCreate, SiteSettingsUpdate,
     BlogPost as BlogPostSchema, BlogPostCreate, BlogPostUpdate,
+    BlogPostPage, PostSearchPage,
     GoalCategory as GoalCategorySchema, GoalCategoryCreate, GoalCategoryUpdate,
     Goal as GoalSchema, GoalCreate, GoalUpdate,
     User as UserSchema, UserCreate, Token,
-    SocialNetwork as SocialNetworkSchema, SocialNetworkCreate, SocialNetworkUpdate
+    SocialNetwork as SocialNetworkSchema, SocialNetworkCreate, SocialNetworkUpdate,
+    BlogPostBatch, GoalBatch, GoalCategoryBatch, SocialNetworkBatch, BatchResult,
+    DashboardStats, SeedDataOptions,
 )
 from .auth import (
     authenticate_user, create_access_token, get_current_user,
-    get_password_hash, ACCESS_TOKEN_EXPIRE_MINUTES
+    AuthenticatedUser, token_cache,
+    verify_password_async, get_password_hash_async,
+    ACCESS_TOKEN_EXPIRE_MINUTES
 )
+from .queries import (
+    get_site_settings_row, list_posts, get_published_post,
+    list_social_networks, list_goal_categories,
+    build_goals_tree, get_posts_page, get_dashboard_stats,
+    POSTS_PAGE_DEFAULT_LIMIT, POSTS_PAGE_MAX_LIMIT
+)
+from . import cache
+from .cache import response_cache, watch_database
+from .events import change_events
+from .seeding import seed_demo, SeedScale
+from .bulk import apply_post_batch, apply_goal_batch, apply_category_batch, apply_social_network_batch
+from .snapshot import export_on_change
+from .startup import run_startup
+from .serializers import render_json
+from .search import search_posts, SEARCH_PAGE_DEFAULT_LIMIT, SEARCH_PAGE_MAX_LIMIT, SEARCH_MAX_OFFSET
+from .images import generate_variants, static_url, static_path, ImageTooLarge
+from .compression import CompressionMiddleware, negotiate_encoding
+from .metrics import MetricsMiddleware, instrument_engine, registry, METRICS_TOKEN, METRICS_CONTENT_TYPE
+from .profiling import ProfilerMiddleware, slow_query_log
+from .static_files import PrecompressedStaticFiles, remove_static_file, is_content_hashed
+from .uploads import (
+    save_upload, UploadTooLarge, UploadSizeLimitMiddleware,
+    MAX_PROFILE_IMAGE_SIZE, TOO_LARGE_DETAIL
+)
+
+PROFILE_IMAGE_EXTENSIONS = {
+    "image/jpeg": "jpg",
+    "image/jpg": "jpg",
+    "image/png": "png",
+    "image/gif": "gif",
+    "image/webp": "webp",
+}
+
+# Уровень логов приложения (DEBUG включает диагностику авторизации)
+logging.basicConfig(
+    level=os.getenv("LOG_LEVEL", "INFO").upper(),
+    format="%(asctime)s %(levelname)s %(name)s: %(message)s",
+)
+logger = logging.getLogger(__name__)
+
+# Счетчики SQL запросов для /metrics, включая запросы подготовки базы при запуске
+instrument_engine(engine)
+instrument_engine(async_engine.sync_engine)
+# Журнал медленных запросов (SLOW_QUERY_MS)
+slow_query_log.install(engine)
+slow_query_log.install(async_engine.sync_engine)
+
+# Пересборка статического экспорта (export_static.py) после правок в админке.
+# Серия правок объединяется: экспорт запускается через STATIC_EXPORT_DEBOUNCE
+# секунд без изменений, но не реже раза в STATIC_EXPORT_MAX_DELAY секунд.
+# При нескольких воркерах включайте только в одном из них.
+if os.getenv("STATIC_EXPORT_ON_CHANGE", "").lower() in ("1", "true", "yes"):
+    change_events.subscribe_debounced(
+        export_on_change(os.getenv("STATIC_EXPORT_DIR", "static-export"), SessionLocal),
+        delay=float(os.getenv("STATIC_EXPORT_DEBOUNCE", 2)),
+        max_delay=float(os.getenv("STATIC_EXPORT_MAX_DELAY", 30)),
+        name="static-export",
+    )
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Схема, начальные данные и сжатые копии статики готовятся при запуске
+    # сервера, а не при импорте: один воркер под блокировкой, остальные
+    # и перезапуски --reload проверяют версию схемы одним запросом
+    await run_in_threadpool(run_startup, "static")
+    # При нескольких воркерах (WEB_CONCURRENCY, его выставляет start_server.py
+    # --prod) коммиты других воркеров сбрасывают кэш ответов этого процесса
+    database_path = sqlite_database_path()
+    if database_path and int(os.getenv("WEB_CONCURRENCY", 1)) > 1:
+        if not watch_database(database_path):
+            logger.warning(
+                "Несколько воркеров без WAL: кэш ответов не видит записи других воркеров, "
+                "используйте DATABASE_PROFILE=production"
+            )
+    yield
+    # Накопленные отложенные задачи выполняются до остановки процесса
+    await run_in_threadpool(change_events.close)
+    if response_cache.watcher is not None:
+        response_cache.watcher.close()
+
+
+app = FastAPI(title="Personal Site API", version="1.0.0", lifespan=lifespan)
 
-# Создание таблиц
-Base.metadata.create_all(bind=engine)
+# Статическая раздача файлов: сжатые копии .br/.gz и immutable для файлов с хэшем в имени
+app.mount("/static", PrecompressedStaticFiles(directory="static"), name="static")
 
-app = FastAPI(title="Personal Site API", version="1.0.0")
+# Отсечение слишком больших загрузок до разбора тела запроса
+app.add_middleware(
+    UploadSizeLimitMiddleware,
+    limits={
+        "/api/admin/upload-profile-image": MAX_PROFILE_IMAGE_SIZE,
+        "/api/admin/upload-cover-image": MAX_PROFILE_IMAGE_SIZE,
+    },
+)
 
-# Статическая раздача файлов
-app.mount("/static", StaticFiles(directory="static"), name="static")
+# Сжатие ответов API, которые не прошли через кэш (админка, ошибки)
+app.add_middleware(CompressionMiddleware)
 
 # CORS настройки
 app.add_middleware(
@@ -39,116 +145,16 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Инициализация данных
-def init_data():
-    import os
-    db = SessionLocal()
-    try:
-        # Получаем настройки из переменных окружения
-        admin_username = os.getenv("ADMIN_USERNAME", os.getenv("DEFAULT_ADMIN_USERNAME", "admin"))
-        admin_password = os.getenv("ADMIN_PASSWORD", os.getenv("DEFAULT_ADMIN_PASSWORD", "admin"))
-        admin_email = os.getenv("DEFAULT_ADMIN_EMAIL", "admin@example.com")
-        
-        site_title = os.getenv("DEFAULT_SITE_TITLE", "Персональный сайт")
-        user_name = os.getenv("DEFAULT_USER_NAME", "Ваше Имя")
-        user_nickname = os.getenv("DEFAULT_USER_NICKNAME", "Ваш Никнейм")
-        
-        # Создание админ пользователя
-        admin_user = db.query(User).filter(User.username == admin_username).first()
-        if not admin_user:
-            admin_user = User(
-                username=admin_username,
-                hashed_password=get_password_hash(admin_password)
-            )
-            db.add(admin_user)
-            print(f"✅ Создан пользователь: {admin_username}")
-        
-        # Создание настроек сайта
-        site_settings = db.query(SiteSettings).first()
-        if not site_settings:
-            site_settings = SiteSettings(
-                site_title=f"{user_name} | {site_title}",
-                meta_description=f"Персональный сайт-визитка {user_name}",
-                hero_title=user_name,
-                hero_subtitle=f"{user_nickname} | Разработчик",
-                display_name=user_name,  # Полное имя для админ панели
-                short_name=user_nickname,  # Короткое имя для админ панели
-                about_text=f"""<p><strong>Привет! Меня зовут {user_name}.</strong></p>
-
-<p>Добро пожаловать на мой персональный сайт! Здесь вы можете узнать обо мне больше, ознакомиться с моими проектами и достижениями.</p>
-
-<p>Этот сайт создан с использованием современных технологий: React.js для фронтенда и FastAPI для backend. Вы можете легко настроить его под себя через админ панель.</p>
-
-<p><em>Чтобы изменить этот текст, войдите в админ панель и отредактируйте настройки сайта.</em></p>""",
-                github_url="https://github.com/yourusername",
-                telegram_url="https://t.me/yourusername",
-                email=admin_email,
-                profile_image="/static/assets/images/profile.svg",
-                primary_color="#3b82f6",
-                secondary_color="#1e40af", 
-                accent_color="#06b6d4",
-                text_color="#ffffff",
-                background_color="#0f172a"
-            )
-            db.add(site_settings)
-            print(f"✅ Созданы настройки сайта для: {user_name}")
-        
-        # Создание категорий целей
-        categories = [
-            {"name": "Технологии", "order": 1},
-            {"name": "Здоровье/Спорт", "order": 2},
-            {"name": "Образование", "order": 3},
-            {"name": "Путешествия", "order": 4},
-            {"name": "Другое", "order": 5}
-        ]
-        
-        for cat_data in categories:
-            existing_cat = db.query(GoalCategory).filter(GoalCategory.name == cat_data["name"]).first()
-            if not existing_cat:
-                category = GoalCategory(**cat_data)
-                db.add(category)
-        
-        # Создание базовых социальных сетей
-        social_networks = [
-            {
-                "name": "GitHub",
-                "url": "https://github.com/yourusername",
-                "icon_name": "github",
-                "show_in_footer": True,
-                "show_in_header": False,
-                "order": 1
-            },
-            {
-                "name": "Telegram", 
-                "url": "https://t.me/yourusername",
-                "icon_name": "telegram",
-                "show_in_footer": True,
-                "show_in_header": False,
-                "order": 2
-            }
-        ]
-        
-        for social_data in social_networks:
-            existing = db.query(SocialNetwork).filter(SocialNetwork.name == social_data["name"]).first()
-            if not existing:
-                social = SocialNetwork(**social_data)
-                db.add(social)
-        
-        db.commit()
-        print("🎉 Инициализация данных завершена!")
-    except Exception as e:
-        print(f"❌ Ошибка при инициализации данных: {e}")
-        db.rollback()
-    finally:
-        db.close()
+# Профиль одного запроса по ?profile=1 (только с токеном администратора)
+app.add_middleware(ProfilerMiddleware)
 
-# Инициализация при запуске
-init_data()
+# Метрики запросов (/metrics): внешний слой, чтобы учитывать и ответы middleware
+app.add_middleware(MetricsMiddleware)
 
 # Auth endpoints
 @app.post("/api/auth/login", response_model=Token)
-async def login(username: str = Form(), password: str = Form(), db: Session = Depends(get_db)):
-    user = authenticate_user(db, username, password)
+async def login(username: str = Form(), password: str = Form(), db: AsyncSession = Depends(get_async_db)):
+    user = await authenticate_user(db, username, password)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -162,111 +168,157 @@ async def login(username: str = Form(), password: str = Form(), db: Session = De
     return {"access_token": access_token, "token_type": "bearer"}
 
 # Public API endpoints
-@app.get("/api/site", response_model=SiteSettingsSchema)
-def get_site_settings(db: Session = Depends(get_db)):
-    settings = db.query(SiteSettings).first()
+def render_with_session(build):
+    """build(Session) в отдельной синхронной сессии; вызывается в пуле потоков"""
+    db = SessionLocal()
+    try:
+        return build(db)
+    finally:
+        db.close()
+
+async def cached_json(request: Request, key, build):
+    """Отдает готовый JSON из кэша; сессия БД открывается только при промахе.
+
+    build - синхронная функция от Session. При промахе она выполняется
+    в пуле потоков: SQL, заполнение ORM объектов и render_json на больших
+    списках заняли бы event loop, и остальные запросы ждали бы их.
+    Попадания в кэш и 304 обходятся без пула потоков и без БД.
+    Если валидаторы клиента (If-None-Match / If-Modified-Since) совпадают
+    с текущей версией ответа, возвращается 304 без тела.
+    Тело сжимается по Accept-Encoding; сжатые байты хранятся в записи кэша.
+    """
+    entry = response_cache.get(key)
+    if entry is None:
+        generation = response_cache.generation(key)
+        body = await run_in_threadpool(render_with_session, build)
+        entry = response_cache.set(key, body, generation)
+    encoding = entry.content_encoding(negotiate_encoding(request.headers.get("accept-encoding", "")))
+    if entry.is_not_modified(
+        request.headers.get("if-none-match"),
+        request.headers.get("if-modified-since"),
+    ):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=entry.headers(encoding))
+    if not entry.is_encoded(encoding):
+        # Первое сжатие большого списка постов - вне event loop
+        body = await run_in_threadpool(entry.encoded_body, encoding)
+    else:
+        body = entry.encoded_body(encoding)
+    return Response(
+        content=body,
+        media_type="application/json",
+        headers=entry.headers(encoding),
+    )
+
+def render_site_settings(db: Session):
+    settings = get_site_settings_row(db)
     if not settings:
         raise HTTPException(status_code=404, detail="Site settings not found")
-    return settings
+    return render_json(settings, SiteSettingsSchema)
+
+def render_social_networks(db: Session):
+    networks = list_social_networks(db)
+    return render_json(networks, List[SocialNetworkSchema])
 
-@app.get("/api/posts", response_model=List[BlogPostSchema])
-def get_published_posts(db: Session = Depends(get_db)):
-    posts = db.query(BlogPost).filter(BlogPost.published == True).order_by(BlogPost.created_at.desc()).all()
-    return posts
+@app.get("/api/site", response_model=SiteSettingsSchema)
+async def get_site_settings(request: Request):
+    return await cached_json(request, (cache.SITE,), render_site_settings)
+
+async def cached_posts_page(request: Request, published_only: bool, limit: Optional[int], cursor: Optional[str]):
+    """Страница постов в облегченной проекции BlogPostSummary"""
+    limit = limit or POSTS_PAGE_DEFAULT_LIMIT
+
+    def render(db: Session):
+        try:
+            posts, next_cursor = get_posts_page(db, published_only, limit, cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return render_json({"items": posts, "next_cursor": next_cursor}, BlogPostPage)
+
+    key = (cache.POSTS, "page", published_only, limit, cursor)
+    return await cached_json(request, key, render)
+
+@app.get("/api/posts", response_model=Union[List[BlogPostSchema], BlogPostPage])
+async def get_published_posts(
+    request: Request,
+    limit: Optional[int] = Query(None, ge=1, le=POSTS_PAGE_MAX_LIMIT),
+    cursor: Optional[str] = None,
+):
+    # Без limit/cursor сохраняется прежний формат: полный список постов
+    if limit is not None or cursor is not None:
+        return await cached_posts_page(request, True, limit, cursor)
+
+    def render(db: Session):
+        posts = list_posts(db)
+        return render_json(posts, List[BlogPostSchema])
+
+    return await cached_json(request, (cache.POSTS, "published"), render)
+
+# Объявлен до /api/posts/{slug}, иначе "search" будет принят за slug
+@app.get("/api/posts/search", response_model=PostSearchPage)
+async def search_published_posts(
+    request: Request,
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(SEARCH_PAGE_DEFAULT_LIMIT, ge=1, le=SEARCH_PAGE_MAX_LIMIT),
+    offset: int = Query(0, ge=0, le=SEARCH_MAX_OFFSET),
+):
+    def render(db: Session):
+        try:
+            posts, next_offset, truncated = search_posts(db, q, limit, offset)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return render_json({"items": posts, "next_offset": next_offset, "truncated": truncated}, PostSearchPage)
+
+    # Результаты инвалидируются вместе с остальными ответами о постах
+    key = (cache.POSTS, "search", q.lower(), limit, offset)
+    return await cached_json(request, key, render)
 
 @app.get("/api/posts/{slug}", response_model=BlogPostSchema)
-def get_post_by_slug(slug: str, db: Session = Depends(get_db)):
-    post = db.query(BlogPost).filter(BlogPost.slug == slug, BlogPost.published == True).first()
-    if not post:
-        raise HTTPException(status_code=404, detail="Post not found")
-    return post
+async def get_post_by_slug(slug: str, request: Request):
+    def render(db: Session):
+        post = get_published_post(db, slug)
+        if not post:
+            raise HTTPException(status_code=404, detail="Post not found")
+        return render_json(post, BlogPostSchema)
+
+    return await cached_json(request, (cache.POSTS, "slug", slug), render)
 
 @app.get("/api/goals")
-def get_goals(db: Session = Depends(get_db)):
-    categories = db.query(GoalCategory).order_by(GoalCategory.order).all()
-    result = []
-    
-    for category in categories:
-        goals = db.query(Goal).filter(Goal.category_id == category.id).order_by(Goal.order).all()
-        completed_count = len([g for g in goals if g.is_completed])
-        total_count = len(goals)
-        
-        result.append({
-            "id": category.id,
-            "name": category.name,
-            "goals": [
-                {
-                    "id": goal.id,
-                    "text": goal.text,
-                    "is_completed": goal.is_completed,
-                    "completed_date": goal.completed_date,
-                    "order": goal.order
-                }
-                for goal in goals
-            ],
-            "stats": {
-                "total": total_count,
-                "completed": completed_count,
-                "percentage": round((completed_count / total_count * 100) if total_count > 0 else 0, 1)
-            }
-        })
-    
-    return result
+async def get_goals(request: Request):
+    return await cached_json(request, (cache.GOALS, "tree"), lambda db: render_json(build_goals_tree(db)))
 
 @app.get("/api/social-networks", response_model=List[SocialNetworkSchema])
-def get_social_networks(db: Session = Depends(get_db)):
-    networks = db.query(SocialNetwork).order_by(SocialNetwork.order).all()
-    return networks
+async def get_social_networks(request: Request):
+    return await cached_json(request, (cache.SOCIAL_NETWORKS,), render_social_networks)
 
 @app.get("/api/public/social-networks", response_model=List[SocialNetworkSchema])
-def get_public_social_networks(db: Session = Depends(get_db)):
-    networks = db.query(SocialNetwork).order_by(SocialNetwork.order).all()
-    return networks
+async def get_public_social_networks(request: Request):
+    return await cached_json(request, (cache.SOCIAL_NETWORKS,), render_social_networks)
+
+@app.get("/api/public/posts", response_model=Union[List[BlogPostSchema], BlogPostPage])
+async def get_public_posts(
+    request: Request,
+    limit: Optional[int] = Query(None, ge=1, le=POSTS_PAGE_MAX_LIMIT),
+    cursor: Optional[str] = None,
+):
+    if limit is not None or cursor is not None:
+        return await cached_posts_page(request, False, limit, cursor)
+
+    def render(db: Session):
+        posts = list_posts(db, published_only=False)
+        return render_json(posts, List[BlogPostSchema])
 
-@app.get("/api/public/posts", response_model=List[BlogPostSchema])
-def get_public_posts(db: Session = Depends(get_db)):
-    posts = db.query(BlogPost).order_by(BlogPost.created_at.desc()).all()
-    return posts
+    return await cached_json(request, (cache.POSTS, "all"), render)
 
 @app.get("/api/public/goals")
-def get_public_goals(db: Session = Depends(get_db)):
-    categories = db.query(GoalCategory).order_by(GoalCategory.order).all()
-    result = []
-    
-    for category in categories:
-        goals = db.query(Goal).filter(Goal.category_id == category.id).order_by(Goal.order).all()
-        completed_count = len([g for g in goals if g.is_completed])
-        total_count = len(goals)
-        
-        result.append({
-            "id": category.id,
-            "name": category.name,
-            "goals": [
-                {
-                    "id": goal.id,
-                    "text": goal.text,
-                    "is_completed": goal.is_completed,
-                    "completed_date": goal.completed_date,
-                    "order": goal.order,
-                    "created_at": goal.created_at
-                }
-                for goal in goals
-            ],
-            "stats": {
-                "total": total_count,
-                "completed": completed_count,
-                "percentage": round((completed_count / total_count) * 100) if total_count > 0 else 0
-            }
-        })
-    
-    return result
+async def get_public_goals(request: Request):
+    return await cached_json(request, (cache.GOALS, "public"), lambda db: render_json(build_goals_tree(db, public=True)))
 
 # Admin API endpoints (protected)
 @app.put("/api/admin/site", response_model=SiteSettingsSchema)
 def update_site_settings(
     settings_update: SiteSettingsUpdate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: AuthenticatedUser = Depends(get_current_user)
 ):
     settings = db.query(SiteSettings).first()
     if not settings:
@@ -283,16 +335,16 @@ def update_site_settings(
 @app.get("/api/admin/posts", response_model=List[BlogPostSchema])
 def get_all_posts(
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: AuthenticatedUser = Depends(get_current_user)
 ):
-    posts = db.query(BlogPost).order_by(BlogPost.created_at.desc()).all()
-    return posts
+    body = render_json(list_posts(db, published_only=False), List[BlogPostSchema])
+    return Response(content=body, media_type="application/json")
 
 @app.post("/api/admin/posts", response_model=BlogPostSchema)
 def create_post(
     post: BlogPostCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: AuthenticatedUser = Depends(get_current_user)
 ):
     from datetime import datetime
     
@@ -313,7 +365,7 @@ def update_post(
     post_id: int,
     post_update: BlogPostUpdate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: AuthenticatedUser = Depends(get_current_user)
 ):
     from datetime import datetime
     
@@ -338,7 +390,7 @@ def update_post(
 def delete_post(
     post_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: AuthenticatedUser = Depends(get_current_user)
 ):
     post = db.query(BlogPost).filter(BlogPost.id == post_id).first()
     if not post:
@@ -348,18 +400,37 @@ def delete_post(
     db.commit()
     return {"message": "Post deleted successfully"}
 
+# Пакетные изменения: одна транзакция и один коммит на весь пакет
+def run_batch(db: Session, apply, batch):
+    try:
+        return apply(db, batch)
+    except IntegrityError as e:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Пакет не применен, нарушена целостность данных: {e.orig}",
+        )
+
+@app.post("/api/admin/posts/batch", response_model=BatchResult)
+def batch_posts(
+    batch: BlogPostBatch,
+    db: Session = Depends(get_db),
+    current_user: AuthenticatedUser = Depends(get_current_user)
+):
+    return run_batch(db, apply_post_batch, batch)
+
 @app.get("/api/admin/goals")
 def get_all_goals(
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: AuthenticatedUser = Depends(get_current_user)
 ):
-    return get_goals(db)
+    return build_goals_tree(db)
 
 @app.post("/api/admin/goals", response_model=GoalSchema)
 def create_goal(
     goal: GoalCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: AuthenticatedUser = Depends(get_current_user)
 ):
     db_goal = Goal(**goal.dict())
     db.add(db_goal)
@@ -372,7 +443,7 @@ def update_goal(
     goal_id: int,
     goal_update: GoalUpdate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: AuthenticatedUser = Depends(get_current_user)
 ):
     goal = db.query(Goal).filter(Goal.id == goal_id).first()
     if not goal:
@@ -389,7 +460,7 @@ def update_goal(
 def delete_goal(
     goal_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: AuthenticatedUser = Depends(get_current_user)
 ):
     goal = db.query(Goal).filter(Goal.id == goal_id).first()
     if not goal:
@@ -399,19 +470,27 @@ def delete_goal(
     db.commit()
     return {"message": "Goal deleted successfully"}
 
+@app.post("/api/admin/goals/batch", response_model=BatchResult)
+def batch_goals(
+    batch: GoalBatch,
+    db: Session = Depends(get_db),
+    current_user: AuthenticatedUser = Depends(get_current_user)
+):
+    return run_batch(db, apply_goal_batch, batch)
+
 @app.get("/api/admin/categories", response_model=List[GoalCategorySchema])
 def get_categories(
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: AuthenticatedUser = Depends(get_current_user)
 ):
-    categories = db.query(GoalCategory).order_by(GoalCategory.order).all()
-    return categories
+    body = render_json(list_goal_categories(db), List[GoalCategorySchema])
+    return Response(content=body, media_type="application/json")
 
 @app.post("/api/admin/categories", response_model=GoalCategorySchema)
 def create_category(
     category: GoalCategoryCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: AuthenticatedUser = Depends(get_current_user)
 ):
     db_category = GoalCategory(**category.dict())
     db.add(db_category)
@@ -419,70 +498,135 @@ def create_category(
     db.refresh(db_category)
     return db_category
 
+@app.post("/api/admin/categories/batch", response_model=BatchResult)
+def batch_categories(
+    batch: GoalCategoryBatch,
+    db: Session = Depends(get_db),
+    current_user: AuthenticatedUser = Depends(get_current_user)
+):
+    return run_batch(db, apply_category_batch, batch)
+
 # Temporary endpoint for creating users (remove in production)
 @app.post("/api/create-user", response_model=UserSchema)
-def create_user_temp(user: UserCreate, db: Session = Depends(get_db)):
-    hashed_password = get_password_hash(user.password)
+async def create_user_temp(user: UserCreate, db: AsyncSession = Depends(get_async_db)):
+    # Хеш считается в ограниченном пуле хэширования, а не в event loop
+    hashed_password = await get_password_hash_async(user.password)
     db_user = User(username=user.username, hashed_password=hashed_password)
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
+    await db.refresh(db_user)
     return db_user
 
 # Эндпоинт для загрузки изображения профиля
+def check_image_type(file: UploadFile):
+    if file.content_type not in PROFILE_IMAGE_EXTENSIONS:
+        raise HTTPException(
+            status_code=400, 
+            detail="Неподдерживаемый тип файла. Разрешены: JPEG, PNG, GIF, WebP"
+        )
+
+async def save_image_upload(file: UploadFile, directory: Path, make_name) -> Path:
+    # Потоковое сохранение с ограничением размера (максимум 5MB);
+    # имя файла содержит хэш содержимого, поэтому его можно кэшировать навсегда
+    try:
+        return await save_upload(file, directory, make_name, MAX_PROFILE_IMAGE_SIZE)
+    except UploadTooLarge:
+        raise HTTPException(status_code=400, detail=TOO_LARGE_DETAIL)
+
+async def store_image_variants(db: AsyncSession, file_path: Path, stem: str):
+    """Строит уменьшенные копии изображения и заменяет их записи в БД.
+
+    Если копии построить не удалось, только что сохраненный оригинал
+    удаляется (кроме уже загруженного ранее файла с тем же содержимым).
+    """
+    source_url = static_url(file_path)
+    try:
+        variants = await generate_variants(file_path, stem)
+    except Exception as error:
+        in_use = await db.scalar(select(ImageVariant.id).where(ImageVariant.source == source_url).limit(1))
+        if in_use is None:
+            await run_in_threadpool(remove_static_file, file_path)
+        if isinstance(error, ImageTooLarge):
+            raise HTTPException(status_code=400, detail="Изображение слишком большое")
+        if isinstance(error, BrokenProcessPool):
+            raise HTTPException(status_code=503, detail="Обработка изображений временно недоступна")
+        if isinstance(error, (OSError, ValueError)):
+            raise HTTPException(status_code=400, detail="Не удалось обработать изображение")
+        raise
+    
+    await db.execute(delete(ImageVariant).where(ImageVariant.source == source_url))
+    db.add_all([ImageVariant(source=source_url, **variant) for variant in variants])
+    return variants
+
 @app.post("/api/admin/upload-profile-image")
 async def upload_profile_image(
     file: UploadFile = File(...),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: AuthenticatedUser = Depends(get_current_user)
 ):
-    import os
-    import shutil
-    from pathlib import Path
-    
     # Проверяем тип файла
-    allowed_types = ["image/jpeg", "image/jpg", "image/png", "image/gif", "image/webp"]
-    if file.content_type not in allowed_types:
-        raise HTTPException(
-            status_code=400, 
-            detail="Неподдерживаемый тип файла. Разрешены: JPEG, PNG, GIF, WebP"
-        )
-    
-    # Проверяем размер файла (максимум 5MB)
-    max_size = 5 * 1024 * 1024  # 5MB
-    file_content = await file.read()
-    if len(file_content) > max_size:
-        raise HTTPException(
-            status_code=400,
-            detail="Файл слишком большой. Максимальный размер: 5MB"
-        )
-    
-    # Создаем папку если не существует
-    upload_dir = Path("static/assets/images")
-    upload_dir.mkdir(parents=True, exist_ok=True)
+    check_image_type(file)
     
-    # Определяем расширение файла
-    file_extension = file.filename.split('.')[-1].lower()
-    new_filename = f"profile.{file_extension}"
-    file_path = upload_dir / new_filename
-    
-    # Сохраняем файл
-    with open(file_path, "wb") as buffer:
-        buffer.write(file_content)
+    # Расширение берется из типа файла, а не из имени, присланного клиентом
+    extension = PROFILE_IMAGE_EXTENSIONS[file.content_type]
+    file_path = await save_image_upload(
+        file, Path("static/assets/images"), lambda digest: f"profile.{digest}.{extension}"
+    )
+    digest = file_path.name.split(".")[1]
+    variants = await store_image_variants(db, file_path, f"profile-{digest}")
     
     # Обновляем путь в базе данных
-    settings = db.query(SiteSettings).first()
+    settings = await db.run_sync(get_site_settings_row)
     if not settings:
         settings = SiteSettings()
         db.add(settings)
     
-    settings.profile_image = f"/static/assets/images/{new_filename}"
-    db.commit()
-    db.refresh(settings)
+    new_url = static_url(file_path)
+    stale_files = []
+    if settings.profile_image and settings.profile_image != new_url:
+        # Прежний файл профиля и его копии больше не нужны
+        old_variants = await db.execute(
+            select(ImageVariant.url).where(ImageVariant.source == settings.profile_image)
+        )
+        stale_files = [url for (url,) in old_variants]
+        if is_content_hashed(settings.profile_image):
+            stale_files.append(settings.profile_image)
+        await db.execute(delete(ImageVariant).where(ImageVariant.source == settings.profile_image))
+    settings.profile_image = new_url
+    await db.commit()
+    
+    for url in stale_files:
+        path = static_path(url)
+        if path is not None:
+            remove_static_file(path)
     
     return {
         "message": "Изображение профиля успешно загружено",
-        "profile_image": settings.profile_image
+        "profile_image": settings.profile_image,
+        "profile_image_variants": variants
+    }
+
+# Эндпоинт для загрузки обложки поста
+@app.post("/api/admin/upload-cover-image")
+async def upload_cover_image(
+    file: UploadFile = File(...),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: AuthenticatedUser = Depends(get_current_user)
+):
+    check_image_type(file)
+    
+    # Одинаковые файлы получают одно имя и не дублируются на диске
+    extension = PROFILE_IMAGE_EXTENSIONS[file.content_type]
+    file_path = await save_image_upload(
+        file, Path("static/assets/images/covers"), lambda digest: f"{digest}.{extension}"
+    )
+    variants = await store_image_variants(db, file_path, f"cover-{file_path.stem}")
+    await db.commit()
+    
+    return {
+        "message": "Обложка успешно загружена",
+        "cover_image": static_url(file_path),
+        "cover_image_variants": variants
     }
 
 # Эндпоинт для смены пароля
@@ -490,13 +634,15 @@ async def upload_profile_image(
 async def change_password(
     current_password: str = Form(),
     new_password: str = Form(),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: AuthenticatedUser = Depends(get_current_user)
 ):
-    from .auth import verify_password
+    user = await db.get(User, current_user.id)
+    if not user:
+        raise HTTPException(status_code=401, detail="Could not validate credentials")
     
     # Проверяем текущий пароль
-    if not verify_password(current_password, current_user.hashed_password):
+    if not await verify_password_async(current_password, user.hashed_password):
         raise HTTPException(
             status_code=400,
             detail="Неверный текущий пароль"
@@ -510,8 +656,9 @@ async def change_password(
         )
     
     # Обновляем пароль
-    current_user.hashed_password = get_password_hash(new_password)
-    db.commit()
+    user.hashed_password = await get_password_hash_async(new_password)
+    await db.commit()
+    token_cache.invalidate_user(user.id)
     
     return {"message": "Пароль успешно изменен"}
 
@@ -520,13 +667,15 @@ async def change_password(
 async def change_username(
     new_username: str = Form(),
     password: str = Form(),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: AuthenticatedUser = Depends(get_current_user)
 ):
-    from .auth import verify_password
+    user = await db.get(User, current_user.id)
+    if not user:
+        raise HTTPException(status_code=401, detail="Could not validate credentials")
     
     # Проверяем пароль для подтверждения
-    if not verify_password(password, current_user.hashed_password):
+    if not await verify_password_async(password, user.hashed_password):
         raise HTTPException(
             status_code=400,
             detail="Неверный пароль"
@@ -540,7 +689,9 @@ async def change_username(
         )
     
     # Проверяем, не занято ли имя пользователя
-    existing_user = db.query(User).filter(User.username == new_username, User.id != current_user.id).first()
+    existing_user = await db.scalar(
+        select(User).where(User.username == new_username, User.id != current_user.id)
+    )
     if existing_user:
         raise HTTPException(
             status_code=400,
@@ -548,15 +699,16 @@ async def change_username(
         )
     
     # Обновляем имя пользователя
-    current_user.username = new_username
-    db.commit()
+    user.username = new_username
+    await db.commit()
+    token_cache.invalidate_user(user.id)
     
     return {"message": "Имя пользователя успешно изменено"}
 
 # Эндпоинт для получения информации о текущем пользователе
 @app.get("/api/admin/user-info")
 async def get_user_info(
-    current_user: User = Depends(get_current_user)
+    current_user: AuthenticatedUser = Depends(get_current_user)
 ):
     return {
         "username": current_user.username,
@@ -567,16 +719,16 @@ async def get_user_info(
 @app.get("/api/admin/social-networks", response_model=List[SocialNetworkSchema])
 def get_admin_social_networks(
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: AuthenticatedUser = Depends(get_current_user)
 ):
-    networks = db.query(SocialNetwork).order_by(SocialNetwork.order).all()
-    return networks
+    body = render_json(list_social_networks(db), List[SocialNetworkSchema])
+    return Response(content=body, media_type="application/json")
 
 @app.post("/api/admin/social-networks", response_model=SocialNetworkSchema)
 def create_social_network(
     network: SocialNetworkCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: AuthenticatedUser = Depends(get_current_user)
 ):
     db_network = SocialNetwork(**network.dict())
     db.add(db_network)
@@ -589,7 +741,7 @@ def update_social_network(
     network_id: int,
     network: SocialNetworkUpdate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: AuthenticatedUser = Depends(get_current_user)
 ):
     db_network = db.query(SocialNetwork).filter(SocialNetwork.id == network_id).first()
     if not db_network:
@@ -606,7 +758,7 @@ def update_social_network(
 def delete_social_network(
     network_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: AuthenticatedUser = Depends(get_current_user)
 ):
     db_network = db.query(SocialNetwork).filter(SocialNetwork.id == network_id).first()
     if not db_network:
@@ -616,54 +768,80 @@ def delete_social_network(
     db.commit()
     return {"message": "Social network deleted successfully"}
 
+@app.post("/api/admin/social-networks/batch", response_model=BatchResult)
+def batch_social_networks(
+    batch: SocialNetworkBatch,
+    db: Session = Depends(get_db),
+    current_user: AuthenticatedUser = Depends(get_current_user)
+):
+    return run_batch(db, apply_social_network_batch, batch)
+
+# Счетчики панели администратора: несколько агрегатных запросов,
+# результат кэшируется до следующего изменения постов, целей или настроек
+@app.get("/api/admin/stats", response_model=DashboardStats)
+async def get_admin_stats(
+    request: Request,
+    current_user: AuthenticatedUser = Depends(get_current_user)
+):
+    return await cached_json(request, (cache.STATS,), lambda db: render_json(get_dashboard_stats(db), DashboardStats))
+
+# Статистика кэша публичных ответов
+@app.get("/api/admin/cache-stats")
+def get_cache_stats(current_user: AuthenticatedUser = Depends(get_current_user)):
+    # Кэш и задачи у каждого воркера свои: pid показывает, какой ответил
+    return {**response_cache.stats(), "deferred_jobs": change_events.stats(), "worker_pid": os.getpid()}
+
+# Последние медленные SQL запросы (порог SLOW_QUERY_MS)
+@app.get("/api/admin/slow-queries")
+def get_slow_queries(current_user: AuthenticatedUser = Depends(get_current_user)):
+    return slow_query_log.stats()
+
+# Метрики в текстовом формате Prometheus. С METRICS_TOKEN требуется
+# заголовок Authorization: Bearer <токен>
+@app.get("/metrics", include_in_schema=False)
+async def get_metrics(request: Request):
+    if METRICS_TOKEN and not hmac.compare_digest(
+        request.headers.get("Authorization", "").encode(), f"Bearer {METRICS_TOKEN}".encode()
+    ):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Неверный токен метрик")
+    return Response(content=registry.render(), media_type=METRICS_CONTENT_TYPE)
+
 # Endpoint для заполнения демо данных
 @app.post("/api/admin/seed-data")
 def seed_demo_data(
-    options: dict = None,
-    db: Session = Depends(get_db)
+    options: Optional[SeedDataOptions] = None,
+    db: Session = Depends(get_db),
+    current_user: AuthenticatedUser = Depends(get_current_user)
 ):
-    """Заполняет базу данных демо данными"""
-    try:
-        if options is None:
-            options = {
-                "siteSettings": True,
-                "socialNetworks": True,
-                "goalCategories": True,
-                "goals": True,
-                "blogPosts": True
-            }
+    """Заполняет базу данных демо данными.
 
-        created_items = []
-
-        # Создание настроек сайта
-        if options.get("siteSettings", True):
-            site_settings = db.query(SiteSettings).first()
-            if not site_settings:
-                site_settings = SiteSettings(
-                    site_title="Иванцов Никита | Персональный сайт",
-                    meta_description="Персональный сайт-визитка Иванцова Никиты - студента и программиста",
-                    hero_title="Иванцов Никита",
-                    hero_subtitle="Студент, Программист, Разработчик",
-                    about_text="""<p><strong>Привет!</strong></p>
+    options.scale ({"posts": 10000, "categories": 1000, "goals": ...})
+    добавляет синтетические строки для нагрузочных тестов.
+    """
+    if options is None:
+        options = SeedDataOptions()
+    try:
+        site_settings = dict(
+            site_title="Иванцов Никита | Персональный сайт",
+            meta_description="Персональный сайт-визитка Иванцова Никиты - студента и программиста",
+            hero_title="Иванцов Никита",
+            hero_subtitle="Студент, Программист, Разработчик",
+            about_text="""<p><strong>Привет!</strong></p>
 <p>Я обладаю высокой организованностью и ответственностью, что позволяет мне эффективно работать в команде. Мой отличительной чертой является трудолюбие и развитые аналитические способности, особенно в области программирования.</p>
 <p>В настоящее время я учусь на третьем курсе по специальности «Информационные системы и программирование». Мой опыт включает в себя навыки работы с Python, 1С, HTML и базовые представления о Машинном обучении.</p>
 <p>Кроме того, я с большим удовольствием осваиваю Photoshop и программы для видеомонтажа.</p>""",
-                    github_url="https://github.com/atikin900",
-                    telegram_url="https://t.me/atikin90",
-                    email="example@example.com",
-                    profile_image="/static/assets/images/profile.svg",
-                    primary_color="#3b82f6",
-                    secondary_color="#1e40af", 
-                    accent_color="#06b6d4",
-                    text_color="#ffffff",
-                    background_color="#0f172a"
-                )
-                db.add(site_settings)
-                created_items.append("Настройки сайта")
-        
-        # Создание социальных сетей
-        if options.get("socialNetworks", True):
-            social_networks = [
+            github_url="https://github.com/atikin900",
+            telegram_url="https://t.me/atikin90",
+            email="example@example.com",
+            profile_image="/static/assets/images/profile.svg",
+            primary_color="#3b82f6",
+            secondary_color="#1e40af",
+            accent_color="#06b6d4",
+            text_color="#ffffff",
+            background_color="#0f172a"
+        )
+
+        social_networks = [
             {
                 "name": "GitHub",
                 "url": "https://github.com/atikin900",
@@ -673,96 +851,64 @@ def seed_demo_data(
                 "order": 1
             },
             {
-                "name": "Telegram", 
+                "name": "Telegram",
                 "url": "https://t.me/atikin90",
                 "icon_name": "telegram",
                 "show_in_footer": True,
                 "show_in_header": False,
                 "order": 2
             }
-            ]
-            
-            for social_data in social_networks:
-                existing = db.query(SocialNetwork).filter(SocialNetwork.name == social_data["name"]).first()
-                if not existing:
-                    social = SocialNetwork(**social_data)
-                    db.add(social)
-                    created_items.append(f"Соцсеть: {social_data['name']}")
-        
-        # Создание категорий целей
-        if options.get("goalCategories", True):
-            categories_data = [
+        ]
+
+        categories = [
             {"name": "Образование", "order": 1},
             {"name": "Карьера", "order": 2},
             {"name": "Личное развитие", "order": 3}
-            ]
-            
-            for cat_data in categories_data:
-                existing = db.query(GoalCategory).filter(GoalCategory.name == cat_data["name"]).first()
-                if not existing:
-                    category = GoalCategory(**cat_data)
-                    db.add(category)
-                    created_items.append(f"Категория целей: {cat_data['name']}")
-        
-        db.commit()
-        
-        # Создание целей
-        if options.get("goals", True):
-            education_cat = db.query(GoalCategory).filter(GoalCategory.name == "Образование").first()
-            career_cat = db.query(GoalCategory).filter(GoalCategory.name == "Карьера").first()
-            personal_cat = db.query(GoalCategory).filter(GoalCategory.name == "Личное развитие").first()
-            
-            goals_data = [
+        ]
+
+        # Цели ссылаются на категорию по имени
+        goals = [
             {
                 "text": "Изучить React.js и создать 3 проекта",
-                "category_id": education_cat.id if education_cat else 1,
+                "category": "Образование",
                 "is_completed": True,
                 "completed_date": "2024-10-15",
                 "order": 1
             },
             {
                 "text": "Освоить FastAPI для backend разработки",
-                "category_id": education_cat.id if education_cat else 1,
+                "category": "Образование",
                 "is_completed": True,
                 "completed_date": "2024-10-20",
                 "order": 2
             },
             {
                 "text": "Получить диплом по специальности",
-                "category_id": education_cat.id if education_cat else 1,
+                "category": "Образование",
                 "is_completed": False,
                 "order": 3
             },
             {
                 "text": "Найти работу Python разработчиком",
-                "category_id": career_cat.id if career_cat else 2,
+                "category": "Карьера",
                 "is_completed": False,
                 "order": 1
             },
             {
                 "text": "Создать портфолио из 5 проектов",
-                "category_id": career_cat.id if career_cat else 2,
+                "category": "Карьера",
                 "is_completed": False,
                 "order": 2
             },
             {
                 "text": "Изучить английский язык до уровня B2",
-                "category_id": personal_cat.id if personal_cat else 3,
+                "category": "Личное развитие",
                 "is_completed": False,
                 "order": 1
             }
-            ]
-            
-            for goal_data in goals_data:
-                existing = db.query(Goal).filter(Goal.text == goal_data["text"]).first()
-                if not existing:
-                    goal = Goal(**goal_data)
-                    db.add(goal)
-                    created_items.append(f"Цель: {goal_data['text'][:30]}...")
-        
-        # Создание демо постов блога
-        if options.get("blogPosts", True):
-            posts_data = [
+        ]
+
+        posts = [
             {
                 "title": "Мой путь в программирование",
                 "slug": "my-programming-journey",
@@ -779,7 +925,7 @@ def seed_demo_data(
             },
             {
                 "title": "Создание персонального сайта",
-                "slug": "creating-personal-website", 
+                "slug": "creating-personal-website",
                 "excerpt": "Процесс разработки этого сайта с использованием React и FastAPI",
                 "content": """<h2>Выбор технологий</h2>
 <p>Для создания этого сайта я выбрал современный стек: React.js для фронтенда и FastAPI для backend API.</p>
@@ -791,16 +937,19 @@ def seed_demo_data(
 <p>Сайт включает в себя портфолио, блог, систему целей и полноценную админ панель для управления контентом.</p>""",
                 "published": True
             }
-            ]
-            
-            for post_data in posts_data:
-                existing = db.query(BlogPost).filter(BlogPost.slug == post_data["slug"]).first()
-                if not existing:
-                    post = BlogPost(**post_data)
-                    db.add(post)
-                    created_items.append(f"Пост блога: {post_data['title']}")
-        
-        db.commit()
+        ]
+
+        # Существующие строки проверяются одним запросом на таблицу,
+        # недостающие вставляются пачками в одной транзакции
+        created_items = seed_demo(
+            db,
+            site_settings=site_settings if options.siteSettings else None,
+            social_networks=social_networks if options.socialNetworks else [],
+            categories=categories if options.goalCategories else [],
+            goals=goals if options.goals else [],
+            posts=posts if options.blogPosts else [],
+            scale=SeedScale(**options.scale.dict()),
+        )
         return {
             "message": "Демо данные успешно созданы!",
             "created_items": created_items
@@ -0,0 +1,230 @@
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import event
+
+# Границы бакетов гистограмм
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 500)
+
+# Токен для /metrics; без него эндпоинт открыт (закрывайте его на прокси)
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+
+# Метка для запросов, не совпавших ни с одним маршрутом: сырые пути
+# (сканеры, 404) раздули бы число временных рядов
+UNMATCHED_ROUTE = "unmatched"
+
+METRICS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _format_labels(labels: Labels, extra: Tuple[Tuple[str, str], ...] = ()) -> str:
+    pairs = labels + extra
+    if not pairs:
+        return ""
+    escaped = (
+        '%s="%s"' % (name, str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"'))
+        for name, value in pairs
+    )
+    return "{" + ",".join(escaped) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help_text = help_text
+        self._values: Dict[Labels, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labels: Labels = (), amount: float = 1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self):
+        yield f"# HELP {self.name} {self.help_text}"
+        yield f"# TYPE {self.name} counter"
+        with self._lock:
+            items = sorted(self._values.items())
+        for labels, value in items:
+            yield f"{self.name}{_format_labels(labels)} {_format_value(value)}"
+
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, buckets):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(buckets)
+        # labels -> [счетчики бакетов (не накопленные), сумма, количество]
+        self._values: Dict[Labels, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels: Labels, value: float):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(labels)
+            if state is None:
+                state = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    def render(self):
+        yield f"# HELP {self.name} {self.help_text}"
+        yield f"# TYPE {self.name} histogram"
+        with self._lock:
+            items = sorted((labels, ([*counts], total, count)) for labels, (counts, total, count) in self._values.items())
+        for labels, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = _format_value(bound) if isinstance(bound, float) else str(bound)
+                yield f"{self.name}_bucket{_format_labels(labels, (('le', le),))} {cumulative}"
+            yield f"{self.name}_sum{_format_labels(labels)} {_format_value(float(total))}"
+            yield f"{self.name}_count{_format_labels(labels)} {count}"
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics = []
+
+    def counter(self, name: str, help_text: str) -> Counter:
+        metric = Counter(name, help_text)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name: str, help_text: str, buckets) -> Histogram:
+        metric = Histogram(name, help_text, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> bytes:
+        """Текстовый формат Prometheus (METRICS_CONTENT_TYPE)"""
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return ("\n".join(lines) + "\n").encode()
+
+
+registry = MetricsRegistry()
+
+http_requests = registry.counter(
+    "http_requests_total", "Число HTTP запросов по маршруту и статусу")
+http_duration = registry.histogram(
+    "http_request_duration_seconds", "Время обработки запроса", LATENCY_BUCKETS)
+http_response_size = registry.histogram(
+    "http_response_size_bytes", "Размер тела ответа (после сжатия)", SIZE_BUCKETS)
+db_queries_per_request = registry.histogram(
+    "http_request_db_queries", "Число SQL запросов за один HTTP запрос", QUERY_COUNT_BUCKETS)
+db_time_per_request = registry.histogram(
+    "http_request_db_duration_seconds", "Суммарное время SQL запросов за один HTTP запрос", LATENCY_BUCKETS)
+db_queries = registry.counter(
+    "db_queries_total", "Число SQL запросов (включая фоновые задачи и запуск)")
+db_time = registry.counter(
+    "db_query_duration_seconds_total", "Суммарное время SQL запросов")
+
+
+class RequestQueries:
+    """Счетчик SQL запросов текущего HTTP запроса"""
+    __slots__ = ("scope", "count", "seconds")
+
+    def __init__(self, scope):
+        self.scope = scope
+        self.count = 0
+        self.seconds = 0.0
+
+
+# Контекст копируется в пул потоков (sync эндпоинты) и в greenlet
+# AsyncSession.run_sync, поэтому события движка видят объект своего запроса
+_current_queries: ContextVar[Optional[RequestQueries]] = ContextVar("current_queries", default=None)
+
+
+def route_label(scope) -> str:
+    return getattr(scope.get("route"), "path", None) or UNMATCHED_ROUTE
+
+
+def current_route() -> Optional[str]:
+    """"GET /api/posts/{slug}" для текущего HTTP запроса, None вне запроса"""
+    queries = _current_queries.get()
+    if queries is None:
+        return None
+    return f"{queries.scope['method']} {route_label(queries.scope)}"
+
+
+def instrument_engine(engine):
+    """Подписывает счетчики SQL на события sync движка (для async - engine.sync_engine)"""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("metrics_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info["metrics_started"].pop()
+        elapsed = time.perf_counter() - started
+        db_queries.inc()
+        db_time.inc(amount=elapsed)
+        queries = _current_queries.get()
+        if queries is not None:
+            queries.count += 1
+            queries.seconds += elapsed
+
+    # Запрос с ошибкой не вызывает after_cursor_execute
+    @event.listens_for(engine, "handle_error")
+    def _error(exception_context):
+        connection = exception_context.connection
+        if connection is not None and connection.info.get("metrics_started"):
+            connection.info["metrics_started"].pop()
+
+
+class MetricsMiddleware:
+    """Время, статус, размер ответа и число SQL запросов по маршрутам.
+
+    Маршрут берется из шаблона пути (/api/posts/{slug}), а не из URL,
+    чтобы число временных рядов не зависело от данных.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        queries = RequestQueries(scope)
+        token = _current_queries.set(queries)
+        status_code = 500
+        size = 0
+
+        async def send_wrapper(message):
+            nonlocal status_code, size
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            _current_queries.reset(token)
+            labels = (("method", scope["method"]), ("route", route_label(scope)))
+            http_requests.inc(labels + (("status", str(status_code)),))
+            http_duration.observe(labels, elapsed)
+            http_response_size.observe(labels, size)
+            db_queries_per_request.observe(labels, queries.count)
+            db_time_per_request.observe(labels, queries.seconds)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from .database import Base
@@ -27,6 +27,14 @@ class SiteSettings(Base):
     background_color = Column(String, default="#0f172a")  # Цвет фона
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    
+    # Уменьшенные копии изображения профиля для srcset
+    profile_image_variants = relationship(
+        "ImageVariant",
+        primaryjoin="foreign(ImageVariant.source) == SiteSettings.profile_image",
+        viewonly=True,
+        lazy="selectin",
+    )
 
 class BlogPost(Base):
     __tablename__ = "blog_posts"
@@ -41,15 +49,36 @@ class BlogPost(Base):
     published_at = Column(DateTime(timezone=True))  # Дата и время публикации
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    
+    # Уменьшенные копии обложки для srcset
+    cover_image_variants = relationship(
+        "ImageVariant",
+        primaryjoin="foreign(ImageVariant.source) == BlogPost.cover_image",
+        viewonly=True,
+        lazy="selectin",
+    )
+    
+    __table_args__ = (
+        # /api/posts: WHERE published ORDER BY created_at DESC
+        Index("ix_blog_posts_published_created_at", "published", "created_at"),
+        # /api/public/posts и /api/admin/posts: ORDER BY created_at DESC
+        Index("ix_blog_posts_created_at", "created_at"),
+        # Keyset-пагинация: ORDER BY published_at DESC, id DESC
+        Index("ix_blog_posts_published_published_at", "published", "published_at", "id"),
+        Index("ix_blog_posts_published_at", "published_at", "id"),
+        # /api/admin/stats: max(updated_at)
+        Index("ix_blog_posts_updated_at", "updated_at"),
+    )
 
 class GoalCategory(Base):
     __tablename__ = "goal_categories"
     
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False)
-    order = Column(Integer, default=0)
+    order = Column(Integer, default=0, index=True)
     
-    goals = relationship("Goal", back_populates="category")
+    # category_id в сортировке позволяет selectinload читать цели по индексу без сортировки
+    goals = relationship("Goal", back_populates="category", order_by="[Goal.category_id, Goal.order, Goal.id]")
 
 class Goal(Base):
     __tablename__ = "goals"
@@ -64,6 +93,14 @@ class Goal(Base):
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
     category = relationship("GoalCategory", back_populates="goals")
+    
+    __table_args__ = (
+        # Цели категории в порядке отображения и GROUP BY статистики
+        Index("ix_goals_category_order", "category_id", "order", "id"),
+        # /api/admin/stats: max(created_at), max(updated_at)
+        Index("ix_goals_created_at", "created_at"),
+        Index("ix_goals_updated_at", "updated_at"),
+    )
 
 class SocialNetwork(Base):
     __tablename__ = "social_networks"
@@ -74,7 +111,7 @@ class SocialNetwork(Base):
     icon_name = Column(String, nullable=False)  # Название иконки (например, "github")
     show_in_footer = Column(Boolean, default=True)  # Показывать в футере (с названием)
     show_in_header = Column(Boolean, default=False)  # Показывать в хедере (только иконка)
-    order = Column(Integer, default=0)  # Порядок отображения
+    order = Column(Integer, default=0, index=True)  # Порядок отображения
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
@@ -85,4 +122,19 @@ class User(Base):
     username = Column(String, unique=True, nullable=False)
     hashed_password = Column(String, nullable=False)
     is_active = Column(Boolean, default=True)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
\ No newline at end of file
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+class ImageVariant(Base):
+    __tablename__ = "image_variants"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    source = Column(String, nullable=False)  # URL исходного изображения
+    url = Column(String, nullable=False)  # URL уменьшенной копии
+    width = Column(Integer, nullable=False)
+    height = Column(Integer, nullable=False)
+    mime_type = Column(String, nullable=False)  # image/webp, image/avif
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    __table_args__ = (
+        Index("ix_image_variants_source", "source", "mime_type", "width"),
+    )
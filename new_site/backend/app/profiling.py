@@ -0,0 +1,243 @@
+import linecache
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter, deque
+from datetime import datetime
+from typing import Dict, List
+from urllib.parse import parse_qs
+
+from fastapi import HTTPException
+from fastapi.security import HTTPAuthorizationCredentials
+from sqlalchemy import event
+from starlette.datastructures import Headers
+
+from .auth import get_current_user
+from .database import AsyncSessionLocal
+from .metrics import current_route, route_label
+
+logger = logging.getLogger(__name__)
+
+# Порог медленного SQL запроса в миллисекундах; 0 отключает журнал
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", 200))
+# Сколько последних медленных запросов отдает /api/admin/slow-queries
+SLOW_QUERY_HISTORY = int(os.getenv("SLOW_QUERY_HISTORY", 100))
+SLOW_QUERY_TEXT_LIMIT = 2000
+SLOW_QUERY_PARAMS_LIMIT = 500
+
+# Период сэмплирования профайлера в миллисекундах
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", 1))
+PROFILE_QUERY_PARAM = "profile"
+
+# Верхние кадры потоков, которые ждут работу: такие сэмплы не попадают в профиль.
+# Для циклов пулов (concurrent.futures, aiosqlite) ожидание отличается
+# от работы только строкой: блокирующий get() очереди написан на C
+IDLE_FRAMES = {
+    ("threading.py", "wait"): "",
+    ("selectors.py", "select"): "",
+    ("thread.py", "_worker"): ".get(",
+    ("core.py", "_connection_worker_thread"): ".get(",
+}
+
+
+def _is_idle(frame) -> bool:
+    code = frame.f_code
+    marker = IDLE_FRAMES.get((os.path.basename(code.co_filename), code.co_name))
+    return marker is not None and marker in linecache.getline(code.co_filename, frame.f_lineno)
+
+
+def _truncate(text: str, limit: int) -> str:
+    return text if len(text) <= limit else text[:limit] + f"... ({len(text)} символов)"
+
+
+def _format_parameters(parameters, executemany: bool) -> str:
+    if executemany and parameters:
+        return _truncate(f"{len(parameters)} наборов, первый: {parameters[0]!r}", SLOW_QUERY_PARAMS_LIMIT)
+    return _truncate(repr(parameters), SLOW_QUERY_PARAMS_LIMIT)
+
+
+class SlowQueryLog:
+    """Журнал SQL запросов дольше порога: текст, параметры, время и маршрут.
+
+    Запросы пишутся в лог (WARNING) и в кольцевой буфер последних записей.
+    При пороге 0 обработчики событий движка не устанавливаются.
+    """
+
+    def __init__(self, threshold_ms: float, history: int = 100):
+        self.threshold_ms = threshold_ms
+        self.total = 0
+        self._recent = deque(maxlen=history)
+
+    @property
+    def enabled(self) -> bool:
+        return self.threshold_ms > 0
+
+    def install(self, engine):
+        if not self.enabled:
+            return
+        threshold = self.threshold_ms / 1000
+
+        @event.listens_for(engine, "before_cursor_execute")
+        def _before(conn, cursor, statement, parameters, context, executemany):
+            conn.info.setdefault("slow_query_started", []).append(time.perf_counter())
+
+        @event.listens_for(engine, "after_cursor_execute")
+        def _after(conn, cursor, statement, parameters, context, executemany):
+            elapsed = time.perf_counter() - conn.info["slow_query_started"].pop()
+            if elapsed >= threshold:
+                self.record(statement, parameters, executemany, elapsed)
+
+        @event.listens_for(engine, "handle_error")
+        def _error(exception_context):
+            connection = exception_context.connection
+            if connection is not None and connection.info.get("slow_query_started"):
+                connection.info["slow_query_started"].pop()
+
+    def record(self, statement: str, parameters, executemany: bool, elapsed: float):
+        entry = {
+            "at": datetime.now().isoformat(timespec="seconds"),
+            "duration_ms": round(elapsed * 1000, 1),
+            "route": current_route() or "вне запроса",
+            "statement": _truncate(statement, SLOW_QUERY_TEXT_LIMIT),
+            "parameters": _format_parameters(parameters, executemany),
+        }
+        self.total += 1
+        self._recent.append(entry)
+        logger.warning(
+            "Медленный запрос %.1f мс [%s]: %s; параметры: %s",
+            entry["duration_ms"], entry["route"], " ".join(entry["statement"].split()), entry["parameters"],
+        )
+
+    def stats(self) -> dict:
+        return {"threshold_ms": self.threshold_ms, "total": self.total, "recent": list(reversed(self._recent))}
+
+
+slow_query_log = SlowQueryLog(SLOW_QUERY_MS, SLOW_QUERY_HISTORY)
+
+
+class SamplingProfiler:
+    """Сэмплирующий профайлер: стеки всех потоков процесса раз в interval секунд.
+
+    Снимает и поток event loop, и потоки пула синхронных эндпоинтов,
+    и поток aiosqlite. Потоки в ожидании (IDLE_FRAMES) пропускаются;
+    параллельные запросы других клиентов попадут в профиль, поэтому
+    профилировать лучше на ненагруженном воркере.
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.samples: Counter = Counter()
+        self._labels: Dict[object, str] = {}
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self) -> Counter:
+        self._stop.set()
+        self._thread.join()
+        return self.samples
+
+    def _label(self, code) -> str:
+        label = self._labels.get(code)
+        if label is None:
+            label = self._labels[code] = f"{code.co_qualname} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+        return label
+
+    def _run(self):
+        own = threading.get_ident()
+        names = {}
+        while not self._stop.wait(self.interval):
+            for ident, frame in sys._current_frames().items():
+                if ident == own or _is_idle(frame):
+                    continue
+                if ident not in names:
+                    names = {thread.ident: thread.name for thread in threading.enumerate()}
+                stack: List[str] = []
+                while frame is not None:
+                    stack.append(self._label(frame.f_code))
+                    frame = frame.f_back
+                stack.append(names.get(ident, str(ident)))
+                self.samples[";".join(reversed(stack))] += 1
+
+    def folded(self) -> str:
+        """Свернутые стеки (формат flamegraph.pl, speedscope, inferno): "стек количество" """
+        return "".join(f"{stack} {count}\n" for stack, count in self.samples.most_common())
+
+
+def _profile_requested(scope) -> bool:
+    # Быстрая проверка без разбора строки запроса: профилирование выключено
+    # у всех запросов, кроме явно запрошенных
+    query_string = scope.get("query_string", b"")
+    if PROFILE_QUERY_PARAM.encode() + b"=" not in query_string:
+        return False
+    values = parse_qs(query_string.decode("latin-1")).get(PROFILE_QUERY_PARAM, [])
+    return any(value.lower() in ("1", "true", "yes") for value in values)
+
+
+async def _is_admin(scope) -> bool:
+    scheme, _, token = Headers(scope=scope).get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return False
+    async with AsyncSessionLocal() as db:
+        try:
+            await get_current_user(HTTPAuthorizationCredentials(scheme=scheme, credentials=token), db)
+        except HTTPException:
+            return False
+    return True
+
+
+class ProfilerMiddleware:
+    """Профиль одного запроса по ?profile=1 с токеном администратора.
+
+    Запрос выполняется как обычно, но вместо ответа обработчика
+    возвращается файл свернутых стеков (.folded) для построения flamegraph;
+    исходные статус и время обработки - в заголовках X-Profile-*.
+    Без токена администратора параметр игнорируется.
+    """
+
+    def __init__(self, app, interval_ms: float = PROFILE_INTERVAL_MS):
+        self.app = app
+        self.interval = interval_ms / 1000
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not _profile_requested(scope) or not await _is_admin(scope):
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def discard(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+
+        profiler = SamplingProfiler(self.interval)
+        profiler.start()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, discard)
+        finally:
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            profiler.stop()
+
+        route = route_label(scope).strip("/").replace("/", "_").replace("{", "").replace("}", "") or "root"
+        filename = f"profile-{scope['method'].lower()}-{route}-{datetime.now():%Y%m%d-%H%M%S}.folded"
+        body = profiler.folded().encode()
+        await send({
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [
+                (b"content-type", b"text/plain; charset=utf-8"),
+                (b"content-length", str(len(body)).encode()),
+                (b"content-disposition", f'attachment; filename="{filename}"'.encode()),
+                (b"cache-control", b"no-store"),
+                (b"x-profile-status", str(status_code).encode()),
+                (b"x-profile-duration-ms", f"{elapsed_ms:.1f}".encode()),
+                (b"x-profile-samples", str(sum(profiler.samples.values())).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,227 @@
+import base64
+import json
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import func, case, select, tuple_
+from sqlalchemy.orm import Session, selectinload, load_only
+
+from .models import SiteSettings, BlogPost, GoalCategory, Goal, SocialNetwork
+
+POSTS_PAGE_DEFAULT_LIMIT = 20
+POSTS_PAGE_MAX_LIMIT = 100
+
+# Колонки, нужные для списков постов: content не читается из БД
+POST_SUMMARY_COLUMNS = (
+    BlogPost.id, BlogPost.title, BlogPost.slug, BlogPost.excerpt,
+    BlogPost.cover_image, BlogPost.published, BlogPost.published_at,
+    BlogPost.created_at, BlogPost.updated_at,
+)
+
+
+def get_site_settings_row(db: Session):
+    return db.query(SiteSettings).first()
+
+
+def list_posts(db: Session, published_only: bool = True):
+    query = db.query(BlogPost)
+    if published_only:
+        query = query.filter(BlogPost.published == True)
+    return query.order_by(BlogPost.created_at.desc()).all()
+
+
+def get_published_post(db: Session, slug: str):
+    return db.query(BlogPost).filter(BlogPost.slug == slug, BlogPost.published == True).first()
+
+
+def list_social_networks(db: Session):
+    return db.query(SocialNetwork).order_by(SocialNetwork.order).all()
+
+
+def list_goal_categories(db: Session):
+    return db.query(GoalCategory).order_by(GoalCategory.order).all()
+
+
+def get_goal_stats(db: Session):
+    """Возвращает {category_id: (total, completed)} одним GROUP BY запросом"""
+    rows = (
+        db.query(
+            Goal.category_id,
+            func.count(Goal.id),
+            func.sum(case((Goal.is_completed == True, 1), else_=0)),
+        )
+        .group_by(Goal.category_id)
+        .all()
+    )
+    return {category_id: (total, completed or 0) for category_id, total, completed in rows}
+
+
+def _latest(column):
+    # Отдельный подзапрос на каждый max(): SQLite берет значение из индекса
+    # по колонке, не читая таблицу (в одном SELECT с несколькими max() это
+    # не работает)
+    return select(func.max(column)).scalar_subquery()
+
+
+def get_dashboard_stats(db: Session):
+    """Счетчики для панели администратора несколькими агрегатными запросами.
+
+    Посты считаются по покрывающему индексу (published, created_at),
+    последние изменения - по индексам дат, статистика целей - одним
+    GROUP BY. Тексты постов и целей не читаются.
+    """
+    posts_by_status = dict(
+        db.query(BlogPost.published, func.count(BlogPost.id)).group_by(BlogPost.published).all()
+    )
+    published = posts_by_status.get(True, 0)
+    total_posts = sum(posts_by_status.values())
+
+    goal_stats = get_goal_stats(db)
+    categories = []
+    for category_id, name in db.query(GoalCategory.id, GoalCategory.name).order_by(GoalCategory.order):
+        total, completed = goal_stats.get(category_id, (0, 0))
+        categories.append({"id": category_id, "name": name, **_completion(total, completed)})
+    total_goals = sum(total for total, _ in goal_stats.values())
+    completed_goals = sum(completed for _, completed in goal_stats.values())
+
+    activity = db.query(
+        _latest(BlogPost.created_at),
+        _latest(BlogPost.published_at),
+        _latest(BlogPost.updated_at),
+        _latest(Goal.created_at),
+        _latest(Goal.updated_at),
+        _latest(SiteSettings.updated_at),
+    ).one()
+
+    return {
+        "posts": {"total": total_posts, "published": published, "drafts": total_posts - published},
+        "goals": _completion(total_goals, completed_goals),
+        "categories": categories,
+        "activity": dict(zip(
+            ("last_post_created_at", "last_post_published_at", "last_post_updated_at",
+             "last_goal_created_at", "last_goal_updated_at", "site_updated_at"),
+            activity,
+        )),
+    }
+
+
+def _completion(total: int, completed: int):
+    percentage = round(completed / total * 100, 1) if total > 0 else 0.0
+    return {"total": total, "completed": completed, "percentage": percentage}
+
+
+def build_goals_tree(db: Session, public: bool = False):
+    """Собирает дерево категорий с целями и статистикой.
+
+    Количество запросов не зависит от числа категорий: категории и цели
+    загружаются через selectinload (2 запроса), статистика - одним GROUP BY.
+    Параметр public сохраняет формат ответа /api/public/goals
+    (поле created_at у целей и целочисленный процент).
+    """
+    categories = (
+        db.query(GoalCategory)
+        .options(selectinload(GoalCategory.goals))
+        .order_by(GoalCategory.order)
+        .all()
+    )
+    stats = get_goal_stats(db)
+
+    result = []
+    for category in categories:
+        total_count, completed_count = stats.get(category.id, (0, 0))
+
+        goals = []
+        for goal in category.goals:
+            item = {
+                "id": goal.id,
+                "text": goal.text,
+                "is_completed": goal.is_completed,
+                "completed_date": goal.completed_date,
+                "order": goal.order
+            }
+            if public:
+                item["created_at"] = goal.created_at
+            goals.append(item)
+
+        if public:
+            percentage = round((completed_count / total_count) * 100) if total_count > 0 else 0
+        else:
+            percentage = round((completed_count / total_count * 100) if total_count > 0 else 0, 1)
+
+        result.append({
+            "id": category.id,
+            "name": category.name,
+            "goals": goals,
+            "stats": {
+                "total": total_count,
+                "completed": completed_count,
+                "percentage": percentage
+            }
+        })
+
+    return result
+
+
+def encode_posts_cursor(post: BlogPost) -> str:
+    published_at = post.published_at.isoformat() if post.published_at else None
+    raw = json.dumps([published_at, post.id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_posts_cursor(cursor: str):
+    """Разбирает курсор вида (published_at, id); ValueError при неверном формате"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        published_at, post_id = json.loads(raw)
+        if published_at is not None:
+            published_at = datetime.fromisoformat(published_at)
+        if not isinstance(post_id, int):
+            raise ValueError("post id must be an integer")
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+    return published_at, post_id
+
+
+def get_posts_page(
+    db: Session,
+    published_only: bool = True,
+    limit: int = POSTS_PAGE_DEFAULT_LIMIT,
+    cursor: Optional[str] = None,
+):
+    """Keyset-пагинация постов по (published_at DESC, id DESC).
+
+    Посты без published_at (черновики и старые записи) идут в конце списка,
+    как их сортирует SQLite при DESC. Продолжение после курсора - сравнение
+    строк (published_at, id) < (x, y), которое SQLite выполняет диапазоном
+    по индексу; хвост без даты читается отдельным запросом, когда
+    датированные посты закончились. Поэтому стоимость страницы не зависит
+    от ее номера и общего числа постов: нет OFFSET и не читается content.
+    Возвращает (посты, курсор следующей страницы или None).
+    """
+    query = db.query(BlogPost).options(load_only(*POST_SUMMARY_COLUMNS))
+    if published_only:
+        query = query.filter(BlogPost.published == True)
+    newest_first = (BlogPost.published_at.desc(), BlogPost.id.desc())
+
+    if not cursor:
+        posts = query.order_by(*newest_first).limit(limit + 1).all()
+    else:
+        published_at, post_id = decode_posts_cursor(cursor)
+        posts = []
+        if published_at is not None:
+            # NULL в published_at дает NULL в сравнении строк: хвост сюда не попадает
+            posts = (
+                query.filter(tuple_(BlogPost.published_at, BlogPost.id) < (published_at, post_id))
+                .order_by(*newest_first)
+                .limit(limit + 1)
+                .all()
+            )
+            post_id = None
+        if len(posts) <= limit:
+            undated = query.filter(BlogPost.published_at.is_(None))
+            if post_id is not None:
+                undated = undated.filter(BlogPost.id < post_id)
+            posts += undated.order_by(BlogPost.id.desc()).limit(limit + 1 - len(posts)).all()
+
+    next_cursor = encode_posts_cursor(posts[limit - 1]) if len(posts) > limit else None
+    return posts[:limit], next_cursor
@@ -1,7 +1,24 @@
-from pydantic import BaseModel
-from typing import List, Optional
+from pydantic import BaseModel, AfterValidator, Field
+from typing import Annotated, List, Optional
 from datetime import datetime
 
+# Image Variant Schemas
+class ImageVariant(BaseModel):
+    url: str
+    width: int
+    height: int
+    mime_type: str
+    
+    class Config:
+        from_attributes = True
+
+# Порядок копий задается здесь, а не ORDER BY: сортировка в SQL по join
+# из нескольких постов потребовала бы временного B-дерева
+ImageVariantList = Annotated[
+    List[ImageVariant],
+    AfterValidator(lambda variants: sorted(variants, key=lambda v: (v.mime_type, v.width))),
+]
+
 # Site Settings Schemas
 class SiteSettingsBase(BaseModel):
     site_title: Optional[str] = None
@@ -33,6 +50,7 @@ class SiteSettings(SiteSettingsBase):
     id: int
     created_at: datetime
     updated_at: Optional[datetime] = None
+    profile_image_variants: ImageVariantList = []
     
     class Config:
         from_attributes = True
@@ -63,10 +81,42 @@ class BlogPost(BlogPostBase):
     id: int
     created_at: datetime
     updated_at: Optional[datetime] = None
+    cover_image_variants: ImageVariantList = []
     
     class Config:
         from_attributes = True
 
+# Облегченная проекция поста для списков (без content)
+class BlogPostSummary(BaseModel):
+    id: int
+    title: str
+    slug: str
+    excerpt: Optional[str] = None
+    cover_image: Optional[str] = None
+    published: bool = False
+    published_at: Optional[datetime] = None
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+    cover_image_variants: ImageVariantList = []
+    
+    class Config:
+        from_attributes = True
+
+class BlogPostPage(BaseModel):
+    items: List[BlogPostSummary]
+    next_cursor: Optional[str] = None
+
+# Результат поиска: HTML с экранированным текстом и найденными словами в <mark>
+class PostSearchResult(BlogPostSummary):
+    title_highlight: str
+    snippet: str
+
+class PostSearchPage(BaseModel):
+    items: List[PostSearchResult]
+    next_offset: Optional[int] = None
+    # Совпадения есть и дальше, но листание ограничено SEARCH_MAX_OFFSET
+    truncated: bool = False
+
 # Goal Category Schemas
 class GoalCategoryBase(BaseModel):
     name: str
@@ -155,6 +205,111 @@ class SocialNetwork(SocialNetworkBase):
     class Config:
         from_attributes = True
 
+# Dashboard Schemas
+class PostCounts(BaseModel):
+    total: int
+    published: int
+    drafts: int
+
+class GoalCompletion(BaseModel):
+    total: int
+    completed: int
+    percentage: float
+
+class CategoryCompletion(BaseModel):
+    id: int
+    name: str
+    total: int
+    completed: int
+    percentage: float
+
+class RecentActivity(BaseModel):
+    last_post_created_at: Optional[datetime] = None
+    last_post_published_at: Optional[datetime] = None
+    last_post_updated_at: Optional[datetime] = None
+    last_goal_created_at: Optional[datetime] = None
+    last_goal_updated_at: Optional[datetime] = None
+    site_updated_at: Optional[datetime] = None
+
+class DashboardStats(BaseModel):
+    posts: PostCounts
+    goals: GoalCompletion
+    categories: List[CategoryCompletion]
+    activity: RecentActivity
+
+# Batch Schemas
+# Пакетные изменения админки: одна транзакция на весь пакет.
+# Индексы в результатах - позиции элементов в своих списках.
+MAX_BATCH_ITEMS = 1000
+
+class ReorderItem(BaseModel):
+    id: int
+    order: int
+
+class BlogPostBatchUpdate(BlogPostUpdate):
+    id: int
+
+class BlogPostBatch(BaseModel):
+    create: List[BlogPostCreate] = Field(default_factory=list, max_length=MAX_BATCH_ITEMS)
+    update: List[BlogPostBatchUpdate] = Field(default_factory=list, max_length=MAX_BATCH_ITEMS)
+    delete: List[int] = Field(default_factory=list, max_length=MAX_BATCH_ITEMS)
+
+class GoalBatchUpdate(GoalUpdate):
+    id: int
+
+class GoalBatch(BaseModel):
+    create: List[GoalCreate] = Field(default_factory=list, max_length=MAX_BATCH_ITEMS)
+    update: List[GoalBatchUpdate] = Field(default_factory=list, max_length=MAX_BATCH_ITEMS)
+    delete: List[int] = Field(default_factory=list, max_length=MAX_BATCH_ITEMS)
+    reorder: List[ReorderItem] = Field(default_factory=list, max_length=MAX_BATCH_ITEMS)
+
+class GoalCategoryBatchUpdate(GoalCategoryUpdate):
+    id: int
+
+class GoalCategoryBatch(BaseModel):
+    create: List[GoalCategoryCreate] = Field(default_factory=list, max_length=MAX_BATCH_ITEMS)
+    update: List[GoalCategoryBatchUpdate] = Field(default_factory=list, max_length=MAX_BATCH_ITEMS)
+    delete: List[int] = Field(default_factory=list, max_length=MAX_BATCH_ITEMS)
+    reorder: List[ReorderItem] = Field(default_factory=list, max_length=MAX_BATCH_ITEMS)
+
+class SocialNetworkBatchUpdate(SocialNetworkUpdate):
+    id: int
+
+class SocialNetworkBatch(BaseModel):
+    create: List[SocialNetworkCreate] = Field(default_factory=list, max_length=MAX_BATCH_ITEMS)
+    update: List[SocialNetworkBatchUpdate] = Field(default_factory=list, max_length=MAX_BATCH_ITEMS)
+    delete: List[int] = Field(default_factory=list, max_length=MAX_BATCH_ITEMS)
+    reorder: List[ReorderItem] = Field(default_factory=list, max_length=MAX_BATCH_ITEMS)
+
+class BatchItemResult(BaseModel):
+    operation: str  # create, update, delete, reorder
+    index: int
+    id: Optional[int] = None
+    status: str  # ok, not_found, conflict
+    detail: Optional[str] = None
+
+class BatchResult(BaseModel):
+    applied: int
+    results: List[BatchItemResult]
+
+# Seed Schemas
+# Потолок генерации через /api/admin/seed-data
+MAX_SEED_SCALE = 100_000
+
+class SeedScaleOptions(BaseModel):
+    posts: int = Field(0, ge=0, le=MAX_SEED_SCALE)
+    categories: int = Field(0, ge=0, le=MAX_SEED_SCALE)
+    goals: int = Field(0, ge=0, le=MAX_SEED_SCALE)
+    social_networks: int = Field(0, ge=0, le=MAX_SEED_SCALE)
+
+class SeedDataOptions(BaseModel):
+    siteSettings: bool = True
+    socialNetworks: bool = True
+    goalCategories: bool = True
+    goals: bool = True
+    blogPosts: bool = True
+    scale: SeedScaleOptions = Field(default_factory=SeedScaleOptions)
+
 # Auth Schemas
 class Token(BaseModel):
     access_token: str
@@ -0,0 +1,240 @@
+import html
+import logging
+import re
+
+from sqlalchemy import event, func, literal_column, text
+from sqlalchemy.orm import Session, load_only
+from sqlalchemy.sql import column, table
+
+from .models import BlogPost
+from .queries import POST_SUMMARY_COLUMNS
+
+logger = logging.getLogger(__name__)
+
+SEARCH_TABLE = "blog_posts_fts"
+SEARCH_PAGE_DEFAULT_LIMIT = 10
+SEARCH_PAGE_MAX_LIMIT = 50
+# Самый дальний offset страницы: ранжируются все совпадения, ограничена
+# только глубина листания (за ней ответ помечается truncated)
+SEARCH_MAX_OFFSET = 10000
+# Сколько слов запроса учитывается; остальные отбрасываются
+SEARCH_MAX_TERMS = 8
+
+# В индексе только опубликованные посты, поэтому поиску не нужен фильтр
+# по published. Текст хранится без HTML разметки. unicode61 с
+# remove_diacritics приводит регистр и для кириллицы, prefix ускоряет
+# поиск по началу слова ("прог*").
+CREATE_SEARCH_TABLE = f"""
+CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5(
+    title, excerpt, content,
+    tokenize = 'unicode61 remove_diacritics 2',
+    prefix = '2 3'
+)
+"""
+
+# Вес колонок в bm25: заголовок важнее описания, описание - текста.
+# Задается как ранжирование таблицы по умолчанию, тогда ORDER BY rank
+# сортирует сам FTS5, без временного B-дерева в SQLite.
+RANK_FUNCTION = "bm25(10.0, 4.0, 1.0)"
+
+_fts = table(SEARCH_TABLE, column("rowid"), column("rank"))
+_fts_match = literal_column(SEARCH_TABLE)
+
+# Маркеры подсветки, которые не встречаются в тексте; после экранирования
+# HTML они заменяются на <mark>
+_MARK_START, _MARK_END = "\x02", "\x03"
+
+_SCRIPT_OR_STYLE = re.compile(r"<(script|style)\b.*?</\1\s*>", re.IGNORECASE | re.DOTALL)
+_TAG = re.compile(r"<[^>]*>")
+_SPACES = re.compile(r"\s+")
+_TERM = re.compile(r"\w+")
+
+
+def strip_html(value) -> str:
+    """Текст HTML без тегов, скриптов и сущностей"""
+    if not value:
+        return ""
+    value = _TAG.sub(" ", _SCRIPT_OR_STYLE.sub(" ", value))
+    return _SPACES.sub(" ", html.unescape(value)).strip()
+
+
+def build_match_query(query: str) -> str:
+    """Запрос пользователя -> выражение FTS5.
+
+    Синтаксис FTS5 пользователю не доступен: каждое слово берется в кавычки.
+    Последнее слово ищется по префиксу, чтобы поиск работал во время набора,
+    если за ним нет пробела (префиксный поиск заметно дороже точного).
+    ValueError, если в запросе нет слов.
+    """
+    terms = _TERM.findall(query.lower())[:SEARCH_MAX_TERMS]
+    if not terms:
+        raise ValueError("Поисковый запрос не содержит слов")
+    quoted = [f'"{term}"' for term in terms]
+    if not query[-1:].isspace():
+        quoted[-1] += "*"
+    return " ".join(quoted)
+
+
+def _highlight(value) -> str:
+    """Экранирует HTML и превращает маркеры FTS5 в <mark>"""
+    escaped = html.escape(value or "", quote=False)
+    return escaped.replace(_MARK_START, "<mark>").replace(_MARK_END, "</mark>")
+
+
+def _index_row(post: BlogPost):
+    return {
+        "rowid": post.id,
+        "title": strip_html(post.title),
+        "excerpt": strip_html(post.excerpt),
+        "content": strip_html(post.content),
+    }
+
+
+def _delete_from_index(connection, post_id: int):
+    connection.execute(text(f"DELETE FROM {SEARCH_TABLE} WHERE rowid = :rowid"), {"rowid": post_id})
+
+
+def _insert_into_index(connection, rows):
+    connection.execute(
+        text(f"INSERT INTO {SEARCH_TABLE} (rowid, title, excerpt, content) VALUES (:rowid, :title, :excerpt, :content)"),
+        rows,
+    )
+
+
+# Индекс обновляется в той же транзакции, что и пост, при любом изменении
+# через ORM (create_post, update_post, delete_post, сидирование).
+# Массовые insert()/update()/delete() событий маппера не вызывают: после них
+# нужен reindex_posts (пакетные эндпоинты), иначе индекс досоздается
+# при следующем запуске (ensure_search_index).
+@event.listens_for(BlogPost, "after_insert")
+def _post_inserted(mapper, connection, post):
+    if post.published:
+        _insert_into_index(connection, [_index_row(post)])
+
+
+@event.listens_for(BlogPost, "after_update")
+def _post_updated(mapper, connection, post):
+    _delete_from_index(connection, post.id)
+    if post.published:
+        _insert_into_index(connection, [_index_row(post)])
+
+
+@event.listens_for(BlogPost, "after_delete")
+def _post_deleted(mapper, connection, post):
+    _delete_from_index(connection, post.id)
+
+
+def reindex_posts(db: Session, post_ids):
+    """Обновляет индекс для постов после массовых изменений в той же транзакции.
+
+    Удаленные посты просто исчезают из индекса.
+    """
+    post_ids = list(post_ids)
+    if not post_ids:
+        return
+    connection = db.connection()
+    connection.execute(
+        text(f"DELETE FROM {SEARCH_TABLE} WHERE rowid = :rowid"),
+        [{"rowid": post_id} for post_id in post_ids],
+    )
+    rows = [
+        _index_row(post)
+        for post in db.query(BlogPost.id, BlogPost.title, BlogPost.excerpt, BlogPost.content)
+        .filter(BlogPost.id.in_(post_ids), BlogPost.published == True)
+    ]
+    if rows:
+        _insert_into_index(connection, rows)
+
+
+def rebuild_search_index(db: Session, batch_size: int = 1000) -> int:
+    """Полностью перестраивает индекс по опубликованным постам"""
+    connection = db.connection()
+    connection.execute(text(f"DELETE FROM {SEARCH_TABLE}"))
+    count = 0
+    query = (
+        db.query(BlogPost.id, BlogPost.title, BlogPost.excerpt, BlogPost.content)
+        .filter(BlogPost.published == True)
+        .execution_options(yield_per=batch_size)
+    )
+    batch = []
+    for post in query:
+        batch.append(_index_row(post))
+        if len(batch) >= batch_size:
+            _insert_into_index(connection, batch)
+            count += len(batch)
+            batch = []
+    if batch:
+        _insert_into_index(connection, batch)
+        count += len(batch)
+    db.commit()
+    return count
+
+
+def ensure_search_index(engine):
+    """Создает таблицу FTS5 и перестраивает индекс, если он разошелся с постами"""
+    if engine.dialect.name != "sqlite":
+        return
+    with engine.begin() as connection:
+        connection.execute(text(CREATE_SEARCH_TABLE))
+        connection.execute(
+            text(f"INSERT INTO {SEARCH_TABLE} ({SEARCH_TABLE}, rank) VALUES ('rank', :rank)"),
+            {"rank": RANK_FUNCTION},
+        )
+        indexed = connection.execute(text(f"SELECT count(*) FROM {SEARCH_TABLE}")).scalar()
+        published = connection.execute(
+            text("SELECT count(*) FROM blog_posts WHERE published = 1")
+        ).scalar()
+    if indexed != published:
+        db = Session(bind=engine)
+        try:
+            count = rebuild_search_index(db)
+        finally:
+            db.close()
+        logger.info("Поисковый индекс перестроен: %d постов", count)
+
+
+def search_posts(db: Session, query: str, limit: int = SEARCH_PAGE_DEFAULT_LIMIT, offset: int = 0):
+    """Опубликованные посты по релевантности (bm25) с подсвеченными фрагментами.
+
+    Ранжируются все совпадения: FTS5 сортирует их по rank и отдает
+    страницу по LIMIT/OFFSET, highlight и snippet считаются только для нее.
+    Возвращает (посты, следующий offset или None, truncated): truncated -
+    совпадения есть и дальше, но следующая страница глубже SEARCH_MAX_OFFSET.
+    У каждого поста заполняются title_highlight и snippet: HTML
+    с экранированным текстом и <mark>.
+    """
+    match = build_match_query(query)
+    hits = (
+        db.query(
+            _fts.c.rowid,
+            func.highlight(_fts_match, 0, _MARK_START, _MARK_END),
+            func.snippet(_fts_match, -1, _MARK_START, _MARK_END, "…", 24),
+        )
+        .select_from(_fts)
+        .filter(_fts_match.op("MATCH")(match))
+        .order_by(_fts.c.rank)
+        .limit(limit + 1)
+        .offset(offset)
+        .all()
+    )
+
+    page = hits[:limit]
+    if not page:
+        return [], None, False
+    found = {
+        post.id: post
+        for post in db.query(BlogPost)
+        .options(load_only(*POST_SUMMARY_COLUMNS))
+        .filter(BlogPost.id.in_([post_id for post_id, _, _ in page]))
+    }
+    posts = []
+    for post_id, title_highlight, snippet in page:
+        post = found.get(post_id)
+        if post is None:
+            continue
+        post.title_highlight = _highlight(title_highlight)
+        post.snippet = _highlight(snippet)
+        posts.append(post)
+    next_offset = offset + limit if len(hits) > limit else None
+    truncated = next_offset is not None and next_offset > SEARCH_MAX_OFFSET
+    return posts, None if truncated else next_offset, truncated
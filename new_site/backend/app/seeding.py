@@ -0,0 +1,175 @@
+import random
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+from .models import SiteSettings, BlogPost, GoalCategory, Goal, SocialNetwork
+from .search import reindex_posts
+
+# Сколько строк вставляется одним executemany и сколько ключей
+# проверяется одним запросом IN (лимит параметров SQLite - 32766)
+INSERT_BATCH_SIZE = 5000
+KEY_BATCH_SIZE = 5000
+
+_WORDS = (
+    "сайт пост цель код данные запрос ответ кэш индекс база сервер клиент "
+    "страница список время работа проект задача идея пример текст заметка "
+    "python sqlite fastapi react поиск шаблон модуль функция класс тест"
+).split()
+
+
+@dataclass
+class SeedScale:
+    """Сколько синтетических строк добавить к демо данным.
+
+    Строки детерминированы (generated-post-<n>, "Категория <n>", ...), поэтому
+    повторный запуск с тем же или меньшим масштабом ничего не добавляет,
+    а с большим - досоздает недостающие. Используется как генератор
+    данных для нагрузочных тестов.
+    """
+    posts: int = 0
+    categories: int = 0
+    goals: int = 0
+    social_networks: int = 0
+
+
+def _ids_by_key(db: Session, model, key: str, keys: Iterable) -> Dict:
+    """{ключ: id} для уже существующих строк: один запрос на пачку ключей"""
+    column = getattr(model, key)
+    keys = list(dict.fromkeys(keys))
+    found = {}
+    for start in range(0, len(keys), KEY_BATCH_SIZE):
+        found.update(db.execute(select(column, model.id).where(column.in_(keys[start:start + KEY_BATCH_SIZE]))).all())
+    return found
+
+
+def _insert_missing(db: Session, model, key: str, rows: List[dict]) -> list:
+    """Вставляет строки, ключа которых еще нет в таблице, пачками executemany.
+
+    Возвращает вставленные строки.
+    """
+    missing, seen = [], set(_ids_by_key(db, model, key, (row[key] for row in rows)))
+    for row in rows:
+        if row[key] not in seen:
+            seen.add(row[key])
+            missing.append(row)
+    # executemany требует одинакового набора колонок; недостающие колонки
+    # не заполняются None, чтобы сработали значения по умолчанию.
+    # render_nulls: иначе ORM делит пачку на части по колонкам со значением None
+    groups: Dict[tuple, List[dict]] = {}
+    for row in missing:
+        groups.setdefault(tuple(sorted(row)), []).append(row)
+    statement = insert(model).execution_options(render_nulls=True)
+    for group in groups.values():
+        for start in range(0, len(group), INSERT_BATCH_SIZE):
+            db.execute(statement, group[start:start + INSERT_BATCH_SIZE])
+    return missing
+
+
+def _generated_posts(count: int) -> List[dict]:
+    rng = random.Random(1)
+    started_at = datetime(2020, 1, 1)
+    posts = []
+    for i in range(count):
+        words = rng.choices(_WORDS, k=120)
+        moment = started_at + timedelta(minutes=i)
+        posts.append({
+            "title": f"Пост {i + 1}: {' '.join(words[:3])}",
+            "slug": f"generated-post-{i + 1}",
+            "excerpt": " ".join(words[3:20]),
+            "content": "<p>" + " ".join(words[:60]) + "</p>\n<p>" + " ".join(words[60:]) + "</p>",
+            "published": i % 10 != 0,
+            "published_at": moment,
+            "created_at": moment,
+        })
+    return posts
+
+
+def _generated_goals(count: int, category_names: List[str]) -> List[dict]:
+    return [
+        {
+            "text": f"Сгенерированная цель {i + 1}",
+            "category": category_names[i % len(category_names)],
+            "is_completed": i % 3 == 0,
+            "completed_date": "2024-01-01" if i % 3 == 0 else None,
+            "order": i // len(category_names),
+        }
+        for i in range(count)
+    ]
+
+
+def seed_demo(
+    db: Session,
+    site_settings: Optional[dict] = None,
+    social_networks: List[dict] = (),
+    categories: List[dict] = (),
+    goals: List[dict] = (),
+    posts: List[dict] = (),
+    scale: SeedScale = None,
+) -> List[str]:
+    """Добавляет недостающие демо данные; возвращает описания созданного.
+
+    Существующие строки определяются по ключу (имя соцсети и категории,
+    текст цели, slug поста) одним запросом на таблицу, недостающие
+    вставляются пачками. Цели ссылаются на категорию по имени: {"category": ...}.
+    Все изменения - одна транзакция.
+    """
+    scale = scale or SeedScale()
+    created: List[str] = []
+
+    if site_settings is not None and db.query(SiteSettings.id).first() is None:
+        db.add(SiteSettings(**site_settings))
+        created.append("Настройки сайта")
+
+    social_networks = list(social_networks) + [
+        {"name": f"Сеть {i + 1}", "url": f"https://example.com/{i + 1}", "icon_name": "link",
+         "show_in_footer": True, "show_in_header": False, "order": 100 + i}
+        for i in range(scale.social_networks)
+    ]
+    inserted = _insert_missing(db, SocialNetwork, "name", social_networks)
+    created += _describe("Соцсеть", [row["name"] for row in inserted], scale.social_networks)
+
+    categories = list(categories) + [
+        {"name": f"Категория {i + 1}", "order": 100 + i} for i in range(scale.categories)
+    ]
+    inserted = _insert_missing(db, GoalCategory, "name", categories)
+    created += _describe("Категория целей", [row["name"] for row in inserted], scale.categories)
+
+    if scale.goals:
+        names = [category["name"] for category in categories] or [
+            name for name, in db.query(GoalCategory.name).order_by(GoalCategory.order, GoalCategory.id)
+        ]
+        if not names:
+            raise ValueError("Для генерации целей нужна хотя бы одна категория")
+        goals = list(goals) + _generated_goals(scale.goals, names)
+    if goals:
+        category_ids = _ids_by_key(db, GoalCategory, "name", (goal["category"] for goal in goals))
+        rows = []
+        for goal in goals:
+            goal = dict(goal)
+            category_id = category_ids.get(goal.pop("category"))
+            if category_id is not None:
+                rows.append({**goal, "category_id": category_id})
+        inserted = _insert_missing(db, Goal, "text", rows)
+        created += _describe("Цель", [row["text"][:30] + "..." for row in inserted], scale.goals)
+
+    posts = list(posts) + _generated_posts(scale.posts)
+    inserted = _insert_missing(db, BlogPost, "slug", posts)
+    # Массовая вставка не вызывает событий маппера: индекс поиска обновляется явно.
+    # id берутся по slug: INSERT ... RETURNING с сохранением порядка SQLite
+    # выполняет построчно
+    reindex_posts(db, _ids_by_key(db, BlogPost, "slug", (row["slug"] for row in inserted)).values())
+    created += _describe("Пост блога", [row["title"] for row in inserted], scale.posts)
+
+    db.commit()
+    return created
+
+
+def _describe(label: str, names: List[str], generated: int) -> List[str]:
+    """Описания созданных строк; при генерации - одной строкой вместо тысяч"""
+    if generated:
+        return [f"{label}: создано {len(names)}"] if names else []
+    return [f"{label}: {name}" for name in names]
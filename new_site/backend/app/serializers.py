@@ -0,0 +1,124 @@
+import os
+import typing
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import AfterValidator, BaseModel, TypeAdapter
+
+try:
+    import orjson
+except ImportError:  # orjson необязателен: без него используется путь через pydantic
+    orjson = None
+
+# orjson - байты напрямую из ORM объектов по проекциям схем;
+# pydantic - прежний путь с валидацией каждой строки (для сравнения и отладки)
+JSON_SERIALIZER = os.getenv("JSON_SERIALIZER", "orjson" if orjson is not None else "pydantic")
+
+_adapters: Dict[Any, TypeAdapter] = {}
+_projections: Dict[Any, Callable[[Any], Any]] = {}
+
+
+def render_json_validated(content: Any, model: Any = None) -> bytes:
+    """Сериализует данные в те же байты, что отдал бы FastAPI через response_model"""
+    if model is not None:
+        adapter = _adapters.get(model)
+        if adapter is None:
+            adapter = _adapters[model] = TypeAdapter(model)
+        content = adapter.dump_python(adapter.validate_python(content, from_attributes=True), mode="json")
+    return JSONResponse(content=jsonable_encoder(content)).body
+
+
+def _is_model(annotation) -> bool:
+    return isinstance(annotation, type) and issubclass(annotation, BaseModel)
+
+
+def _build_projection(annotation) -> Callable[[Any], Any]:
+    """Функция ORM объект -> данные для orjson по аннотации поля схемы.
+
+    Поддерживает то, что встречается в app/schemas.py: скаляры, вложенные
+    схемы, Optional, List и Annotated с AfterValidator (валидатор применяется
+    к ORM объектам до проекции, так как читает те же атрибуты).
+    """
+    origin = typing.get_origin(annotation)
+
+    if origin is typing.Annotated:
+        inner, *metadata = typing.get_args(annotation)
+        project = _build_projection(inner)
+        validators = [item.func for item in metadata if isinstance(item, AfterValidator)]
+        if not validators:
+            return project
+
+        def project_annotated(value):
+            for validator in validators:
+                value = validator(value)
+            return project(value)
+
+        return project_annotated
+
+    if origin is typing.Union:
+        args = [arg for arg in typing.get_args(annotation) if arg is not type(None)]
+        if len(args) != 1:
+            raise TypeError(f"Неподдерживаемая аннотация: {annotation}")
+        project = _build_projection(args[0])
+        if project is _identity:
+            return project
+        return lambda value: None if value is None else project(value)
+
+    if origin in (list, List):
+        (item,) = typing.get_args(annotation)
+        project = _build_projection(item)
+        if project is _identity:
+            return list
+        return lambda values: [project(value) for value in values]
+
+    if _is_model(annotation):
+        return projection_for(annotation)
+
+    return _identity
+
+
+def _identity(value):
+    return value
+
+
+def projection_for(model) -> Callable[[Any], Any]:
+    """Проекция схемы: поля в порядке объявления, как в выводе pydantic"""
+    projection = _projections.get(model)
+    if projection is not None:
+        return projection
+
+    if not _is_model(model):
+        projection = _build_projection(model)
+    else:
+        fields: Tuple[Tuple[str, Optional[Callable[[Any], Any]]], ...] = tuple(
+            (name, None if project is _identity else project)
+            for name, field in model.model_fields.items()
+            for project in [_build_projection(field.rebuild_annotation())]
+        )
+
+        def projection(obj):
+            get = obj.get if isinstance(obj, dict) else obj.__getattribute__
+            return {
+                name: get(name) if project is None else project(get(name))
+                for name, project in fields
+            }
+
+    _projections[model] = projection
+    return projection
+
+
+def render_json(content: Any, model: Any = None) -> bytes:
+    """JSON ответа в документированной форме схемы model.
+
+    В режиме orjson строки не проходят валидацию pydantic: значения берутся
+    из атрибутов ORM объектов по заранее построенной проекции схемы, а байты
+    формирует orjson. Вывод совпадает с render_json_validated
+    (проверяется benchmarks/bench_serialization.py).
+    """
+    if JSON_SERIALIZER != "orjson":
+        return render_json_validated(content, model)
+    if model is not None:
+        content = projection_for(model)(content)
+    return orjson.dumps(content)
+
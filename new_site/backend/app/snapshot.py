@@ -0,0 +1,229 @@
+import hashlib
+import json
+import logging
+import re
+import shutil
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, List
+
+from sqlalchemy.orm import Session
+
+from .events import ChangeEvent
+from .models import BlogPost, ImageVariant
+from .queries import (
+    get_site_settings_row, list_posts, list_social_networks, build_goals_tree,
+)
+from .schemas import (
+    BlogPost as BlogPostSchema,
+    SiteSettings as SiteSettingsSchema,
+    SocialNetwork as SocialNetworkSchema,
+)
+from .serializers import render_json
+from .static_files import write_atomic, write_precompressed, remove_static_file
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = "manifest.json"
+MANIFEST_VERSION = 1
+POST_BATCH_SIZE = 500
+
+# Колонки поста, от которых зависит его JSON; их хэш - версия файла поста
+POST_SOURCE_COLUMNS = (
+    BlogPost.id, BlogPost.slug, BlogPost.title, BlogPost.excerpt, BlogPost.content,
+    BlogPost.cover_image, BlogPost.published_at, BlogPost.created_at, BlogPost.updated_at,
+)
+# Таблицы, изменения которых меняют файлы экспорта
+SNAPSHOT_TABLES = {"site_settings", "blog_posts", "image_variants", "goals", "goal_categories", "social_networks"}
+# Slug становится именем файла
+_SAFE_SLUG = re.compile(r"^[\w][\w.-]*$")
+
+
+@dataclass
+class ExportResult:
+    written: List[str] = field(default_factory=list)
+    unchanged: int = 0
+    deleted: List[str] = field(default_factory=list)
+
+
+def _fingerprint(*parts) -> str:
+    raw = json.dumps(parts, default=str, ensure_ascii=False).encode()
+    return hashlib.blake2b(raw, digest_size=16).hexdigest()
+
+
+def _write_file(path: Path, body: bytes):
+    """Атомарная запись вместе со сжатыми копиями .br/.gz"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    write_atomic(path, body)
+    write_precompressed(path)
+
+
+def _load_manifest(output_dir: Path) -> Dict[str, str]:
+    try:
+        manifest = json.loads((output_dir / MANIFEST_NAME).read_bytes())
+    except (FileNotFoundError, ValueError):
+        return {}
+    if manifest.get("version") != MANIFEST_VERSION:
+        return {}
+    return manifest.get("files", {})
+
+
+def _post_sources(db: Session):
+    """{slug: (id, версия)} опубликованных постов в порядке /api/posts.
+
+    Читает только строки постов и копий обложек, без построения объектов;
+    версия меняется при изменении любой колонки поста или его копий.
+    """
+    rows = (
+        db.query(*POST_SOURCE_COLUMNS)
+        .filter(BlogPost.published == True)
+        .order_by(BlogPost.created_at.desc())
+        .all()
+    )
+    covers = {row.cover_image for row in rows if row.cover_image}
+    variants: Dict[str, list] = {}
+    if covers:
+        for variant in (
+            db.query(ImageVariant.source, ImageVariant.url, ImageVariant.width,
+                     ImageVariant.height, ImageVariant.mime_type)
+            .filter(ImageVariant.source.in_(covers))
+        ):
+            variants.setdefault(variant.source, []).append(tuple(variant))
+    return {
+        row.slug: (row.id, _fingerprint(tuple(row), sorted(variants.get(row.cover_image, []))))
+        for row in rows
+    }
+
+
+def _documents(db: Session, posts: Dict[str, tuple]):
+    """Список (путь файла, версия или None, функция рендера, id поста или None).
+
+    Для небольших ответов версия - хэш самого JSON (None: сравнить после
+    рендера), для постов - хэш исходных строк, поэтому неизмененные посты
+    не загружаются и не сериализуются.
+    """
+    documents = [
+        ("api/site.json", None, lambda: _render_site(db), None),
+        (
+            "api/social-networks.json", None,
+            lambda: render_json(list_social_networks(db), List[SocialNetworkSchema]), None,
+        ),
+        ("api/goals.json", None, lambda: render_json(build_goals_tree(db)), None),
+        (
+            "api/posts.json",
+            _fingerprint([version for _, version in posts.values()], list(posts)),
+            lambda: render_json(list_posts(db), List[BlogPostSchema]),
+            None,
+        ),
+    ]
+    for slug, (post_id, version) in posts.items():
+        if not _SAFE_SLUG.match(slug):
+            logger.warning("Пост %s пропущен: slug %r нельзя использовать как имя файла", post_id, slug)
+            continue
+        documents.append((
+            f"api/posts/{slug}.json", version,
+            lambda post_id=post_id: render_json(db.get(BlogPost, post_id), BlogPostSchema),
+            post_id,
+        ))
+    return documents
+
+
+def _render_site(db: Session):
+    settings = get_site_settings_row(db)
+    return render_json(settings, SiteSettingsSchema) if settings else None
+
+
+def export_snapshot(db: Session, output_dir, full: bool = False) -> ExportResult:
+    """Выгружает публичные ответы API в output_dir в виде JSON файлов.
+
+    Структура повторяет пути API: api/site.json, api/posts.json,
+    api/posts/<slug>.json, api/goals.json, api/social-networks.json.
+    Тела совпадают с ответами эндпоинтов (те же запросы и схемы).
+    Повторный запуск перезаписывает только файлы, исходные строки которых
+    изменились; файлы снятых с публикации и удаленных постов удаляются.
+    full=True перестраивает все файлы.
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    previous = {} if full else _load_manifest(output_dir)
+    result = ExportResult()
+    current: Dict[str, str] = {}
+
+    pending = []
+    for path, version, render, post_id in _documents(db, _post_sources(db)):
+        if version is not None and previous.get(path) == version and (output_dir / path).exists():
+            current[path] = version
+            result.unchanged += 1
+        else:
+            pending.append((path, version, render, post_id))
+
+    # Измененные посты загружаются пачками, а не по одному запросу на пост;
+    # список держит объекты в identity map сессии, откуда их берет db.get
+    changed_ids = [post_id for *_, post_id in pending if post_id is not None]
+    loaded = []
+    for start in range(0, len(changed_ids), POST_BATCH_SIZE):
+        batch = changed_ids[start:start + POST_BATCH_SIZE]
+        loaded += db.query(BlogPost).filter(BlogPost.id.in_(batch)).all()
+
+    for path, version, render, _ in pending:
+        target = output_dir / path
+        body = render()
+        if body is None:
+            continue
+        if version is None:
+            version = hashlib.blake2b(body, digest_size=16).hexdigest()
+            if previous.get(path) == version and target.exists():
+                current[path] = version
+                result.unchanged += 1
+                continue
+        _write_file(target, body)
+        current[path] = version
+        result.written.append(path)
+
+    for path in previous.keys() - current.keys():
+        remove_static_file(output_dir / path)
+        result.deleted.append(path)
+
+    manifest = {"version": MANIFEST_VERSION, "files": current}
+    _write_file(output_dir / MANIFEST_NAME, json.dumps(manifest, indent=2, sort_keys=True).encode())
+    return result
+
+
+def export_on_change(output_dir, session_factory: Callable[[], Session]):
+    """Задача для change_events.subscribe_debounced: инкрементальный экспорт
+    после серии правок в админке. Изменения пользователей и прочих таблиц,
+    не попадающих в экспорт, пропускаются."""
+    def export_changes(events: List[ChangeEvent]):
+        if not any(change.entity in SNAPSHOT_TABLES for change in events):
+            return
+        db = session_factory()
+        try:
+            result = export_snapshot(db, output_dir)
+        finally:
+            db.close()
+        logger.info(
+            "Экспорт в %s после %d изменений: записано %d, удалено %d",
+            output_dir, len(events), len(result.written), len(result.deleted),
+        )
+    return export_changes
+
+
+def copy_static_assets(static_dir, output_dir) -> int:
+    """Копирует static/ в output_dir/static, пропуская файлы того же размера и mtime"""
+    copied = 0
+    static_dir, target_root = Path(static_dir), Path(output_dir) / "static"
+    for source in static_dir.rglob("*"):
+        if not source.is_file() or source.name.startswith("."):
+            continue
+        target = target_root / source.relative_to(static_dir)
+        stat = source.stat()
+        try:
+            target_stat = target.stat()
+            if target_stat.st_size == stat.st_size and target_stat.st_mtime == stat.st_mtime:
+                continue
+        except FileNotFoundError:
+            pass
+        target.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copy2(source, target)
+        copied += 1
+    return copied
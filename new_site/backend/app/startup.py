@@ -0,0 +1,235 @@
+import hashlib
+import logging
+import os
+import tempfile
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: один процесс разработки, блокировка не нужна
+    fcntl = None
+
+from sqlalchemy.schema import CreateIndex, CreateTable
+
+from .auth import get_password_hash
+from .database import engine, SessionLocal, create_tables, sqlite_database_path
+from .models import Base, SiteSettings, GoalCategory, User, SocialNetwork
+from .static_files import precompress_directory
+
+logger = logging.getLogger(__name__)
+
+# Меняйте при изменении init_data, чтобы начальные данные досоздались
+# и в уже подготовленных базах
+INIT_DATA_VERSION = 1
+
+
+def schema_version() -> int:
+    """Отпечаток схемы (DDL всех таблиц и индексов) и версии начальных данных.
+
+    Хранится в PRAGMA user_version базы SQLite: пока он совпадает,
+    подготовка базы при запуске пропускается.
+    """
+    ddl = [f"init_data {INIT_DATA_VERSION}"]
+    for table in Base.metadata.sorted_tables:
+        ddl.append(str(CreateTable(table).compile(engine)))
+        ddl += sorted(str(CreateIndex(index).compile(engine)) for index in table.indexes)
+    digest = hashlib.sha256("\n".join(ddl).encode()).digest()
+    # user_version - знаковое 32-битное целое
+    return int.from_bytes(digest[:4], "big") & 0x7FFFFFFF
+
+
+def _is_sqlite() -> bool:
+    return engine.url.get_backend_name() == "sqlite"
+
+
+def _stored_version() -> int:
+    with engine.connect() as connection:
+        return connection.exec_driver_sql("PRAGMA user_version").scalar()
+
+
+def _lock_path() -> str:
+    """Файл блокировки рядом с базой SQLite или во временном каталоге"""
+    database = sqlite_database_path(engine.url.render_as_string(hide_password=False))
+    if database:
+        return database + ".startup.lock"
+    name = hashlib.sha1(engine.url.render_as_string().encode()).hexdigest()[:12]
+    return os.path.join(tempfile.gettempdir(), f"site-startup-{name}.lock")
+
+
+@contextmanager
+def startup_lock():
+    """Межпроцессная блокировка: подготовку выполняет один воркер, остальные ждут"""
+    if fcntl is None:
+        yield
+        return
+    with open(_lock_path(), "a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def prepare_database() -> bool:
+    """Создает схему и начальные данные, если база еще не подготовлена
+    для текущей версии схемы; возвращает True, если работа выполнялась.
+
+    Для SQLite версия хранится в самой базе, поэтому перезапуски
+    и новые воркеры обходятся одним запросом, а удаленная или новая
+    база готовится заново. Для других СУБД подготовка выполняется
+    при каждом запуске (create_all и init_data идемпотентны).
+    """
+    version = schema_version()
+    if _is_sqlite() and _stored_version() == version:
+        # ADMIN_USERNAME мог смениться после подготовки базы: проверка
+        # администратора - один запрос, хеш пароля считается только для нового
+        ensure_admin()
+        return False
+    create_tables()
+    # При ошибке исключение пропускает отметку версии:
+    # следующий запуск повторит подготовку
+    init_data()
+    if _is_sqlite():
+        with engine.begin() as connection:
+            connection.exec_driver_sql(f"PRAGMA user_version = {version}")
+    return True
+
+
+def run_startup(static_dir: str = "static") -> bool:
+    """Подготовка при запуске воркера: база и сжатые копии статики.
+
+    Выполняется под межпроцессной блокировкой: первый воркер делает
+    работу, остальные дожидаются его и находят все готовым.
+    """
+    with startup_lock():
+        prepared = prepare_database()
+        precompress_directory(static_dir)
+    if prepared:
+        logger.info("База подготовлена (версия схемы %d)", schema_version())
+    return prepared
+
+
+def _add_admin(db):
+    """Добавляет в сессию администратора из ADMIN_USERNAME/ADMIN_PASSWORD, если его нет;
+    возвращает True, если пользователь добавлен"""
+    admin_username = os.getenv("ADMIN_USERNAME", os.getenv("DEFAULT_ADMIN_USERNAME", "admin"))
+    admin_password = os.getenv("ADMIN_PASSWORD", os.getenv("DEFAULT_ADMIN_PASSWORD", "admin"))
+    if db.query(User.id).filter(User.username == admin_username).first():
+        return False
+    db.add(User(
+        username=admin_username,
+        hashed_password=get_password_hash(admin_password)
+    ))
+    print(f"✅ Создан пользователь: {admin_username}")
+    return True
+
+
+def ensure_admin():
+    """Создает администратора, если его нет (проверяется при каждом запуске)"""
+    db = SessionLocal()
+    try:
+        if _add_admin(db):
+            db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def init_data():
+    """Создает администратора, настройки сайта, категории и соцсети, если их нет.
+
+    При ошибке откатывает транзакцию и пробрасывает исключение.
+    """
+    db = SessionLocal()
+    try:
+        # Получаем настройки из переменных окружения
+        admin_email = os.getenv("DEFAULT_ADMIN_EMAIL", "admin@example.com")
+        
+        site_title = os.getenv("DEFAULT_SITE_TITLE", "Персональный сайт")
+        user_name = os.getenv("DEFAULT_USER_NAME", "Ваше Имя")
+        user_nickname = os.getenv("DEFAULT_USER_NICKNAME", "Ваш Никнейм")
+        
+        # Создание админ пользователя
+        _add_admin(db)
+        
+        # Создание настроек сайта
+        site_settings = db.query(SiteSettings).first()
+        if not site_settings:
+            site_settings = SiteSettings(
+                site_title=f"{user_name} | {site_title}",
+                meta_description=f"Персональный сайт-визитка {user_name}",
+                hero_title=user_name,
+                hero_subtitle=f"{user_nickname} | Разработчик",
+                display_name=user_name,  # Полное имя для админ панели
+                short_name=user_nickname,  # Короткое имя для админ панели
+                about_text=f"""<p><strong>Привет! Меня зовут {user_name}.</strong></p>
+
+<p>Добро пожаловать на мой персональный сайт! Здесь вы можете узнать обо мне больше, ознакомиться с моими проектами и достижениями.</p>
+
+<p>Этот сайт создан с использованием современных технологий: React.js для фронтенда и FastAPI для backend. Вы можете легко настроить его под себя через админ панель.</p>
+
+<p><em>Чтобы изменить этот текст, войдите в админ панель и отредактируйте настройки сайта.</em></p>""",
+                github_url="https://github.com/yourusername",
+                telegram_url="https://t.me/yourusername",
+                email=admin_email,
+                profile_image="/static/assets/images/profile.svg",
+                primary_color="#3b82f6",
+                secondary_color="#1e40af", 
+                accent_color="#06b6d4",
+                text_color="#ffffff",
+                background_color="#0f172a"
+            )
+            db.add(site_settings)
+            print(f"✅ Созданы настройки сайта для: {user_name}")
+        
+        # Создание категорий целей
+        categories = [
+            {"name": "Технологии", "order": 1},
+            {"name": "Здоровье/Спорт", "order": 2},
+            {"name": "Образование", "order": 3},
+            {"name": "Путешествия", "order": 4},
+            {"name": "Другое", "order": 5}
+        ]
+        
+        for cat_data in categories:
+            existing_cat = db.query(GoalCategory).filter(GoalCategory.name == cat_data["name"]).first()
+            if not existing_cat:
+                category = GoalCategory(**cat_data)
+                db.add(category)
+        
+        # Создание базовых социальных сетей
+        social_networks = [
+            {
+                "name": "GitHub",
+                "url": "https://github.com/yourusername",
+                "icon_name": "github",
+                "show_in_footer": True,
+                "show_in_header": False,
+                "order": 1
+            },
+            {
+                "name": "Telegram", 
+                "url": "https://t.me/yourusername",
+                "icon_name": "telegram",
+                "show_in_footer": True,
+                "show_in_header": False,
+                "order": 2
+            }
+        ]
+        
+        for social_data in social_networks:
+            existing = db.query(SocialNetwork).filter(SocialNetwork.name == social_data["name"]).first()
+            if not existing:
+                social = SocialNetwork(**social_data)
+                db.add(social)
+        
+        db.commit()
+        print("🎉 Инициализация данных завершена!")
+    except Exception as e:
+        print(f"❌ Ошибка при инициализации данных: {e}")
+        db.rollback()
+        raise
+    finally:
+        db.close()
@@ -0,0 +1,150 @@
+import logging
+import mimetypes
+import os
+import re
+import tempfile
+from pathlib import Path
+
+from fastapi.staticfiles import StaticFiles
+from starlette.staticfiles import NotModifiedResponse
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse
+
+from .compression import compress, accepted_encodings, SUPPORTED_ENCODINGS
+
+logger = logging.getLogger(__name__)
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "no-cache"
+
+# Длина хэша содержимого в именах загруженных файлов (hex)
+CONTENT_HASH_LENGTH = 16
+# profile.<hash>.jpg, covers/<hash>.png, profile-<hash>-320w.webp
+_HASHED_NAME = re.compile(rf"(^|[.-])[0-9a-f]{{{CONTENT_HASH_LENGTH}}}([.-]|$)")
+
+# Форматы, которые сжимаются; изображения JPEG/PNG/WebP/AVIF уже сжаты
+COMPRESSIBLE_EXTENSIONS = {".svg", ".css", ".js", ".mjs", ".json", ".html", ".txt", ".xml", ".map", ".ico"}
+# Сжатая копия сохраняется, только если она заметно меньше оригинала
+MIN_COMPRESSION_RATIO = 0.9
+
+# (кодировка, расширение копии) в порядке предпочтения
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+# Копии строятся один раз при записи, поэтому используется максимальное сжатие
+BROTLI_STATIC_QUALITY = 11
+GZIP_STATIC_LEVEL = 9
+
+
+def is_content_hashed(path) -> bool:
+    """Имя файла содержит хэш содержимого, значит по этому URL файл не меняется"""
+    return bool(_HASHED_NAME.search(Path(path).name))
+
+
+def write_atomic(destination: Path, data: bytes):
+    fd, tmp_name = tempfile.mkstemp(dir=destination.parent, prefix=".compress-", suffix=".part")
+    try:
+        with os.fdopen(fd, "wb") as out:
+            out.write(data)
+        os.chmod(tmp_name, 0o644)
+        os.replace(tmp_name, destination)
+    except BaseException:
+        os.unlink(tmp_name)
+        raise
+
+
+def write_precompressed(path) -> list:
+    """Создает рядом с файлом копии .br и .gz; возвращает созданные пути.
+
+    Несжимаемые форматы пропускаются, устаревшие копии удаляются.
+    """
+    path = Path(path)
+    if path.suffix.lower() not in COMPRESSIBLE_EXTENSIONS:
+        return []
+
+    data = path.read_bytes()
+    written = []
+    for encoding, suffix in ENCODINGS:
+        if encoding not in SUPPORTED_ENCODINGS:
+            continue
+        sibling = path.with_name(path.name + suffix)
+        compressed = compress(data, encoding, BROTLI_STATIC_QUALITY, GZIP_STATIC_LEVEL)
+        if len(compressed) < len(data) * MIN_COMPRESSION_RATIO:
+            write_atomic(sibling, compressed)
+            written.append(sibling)
+        elif sibling.exists():
+            sibling.unlink()
+    return written
+
+
+def precompress_directory(directory) -> int:
+    """Досоздает недостающие или устаревшие сжатые копии во всем каталоге"""
+    count = 0
+    for path in Path(directory).rglob("*"):
+        if not path.is_file() or path.suffix.lower() not in COMPRESSIBLE_EXTENSIONS:
+            continue
+        mtime = path.stat().st_mtime
+        if all(
+            (sibling := path.with_name(path.name + suffix)).exists() and sibling.stat().st_mtime >= mtime
+            for encoding, suffix in ENCODINGS
+            if encoding in SUPPORTED_ENCODINGS
+        ):
+            continue
+        count += len(write_precompressed(path))
+    if count:
+        logger.info("Создано %d сжатых копий статических файлов в %s", count, directory)
+    return count
+
+
+def remove_static_file(path):
+    """Удаляет файл вместе с его сжатыми копиями"""
+    path = Path(path)
+    for candidate in [path] + [path.with_name(path.name + suffix) for _, suffix in ENCODINGS]:
+        try:
+            candidate.unlink()
+        except FileNotFoundError:
+            pass
+
+
+class PrecompressedStaticFiles(StaticFiles):
+    """StaticFiles, отдающий заранее сжатые копии (.br/.gz) по Accept-Encoding.
+
+    Файлы с хэшем содержимого в имени кэшируются на год с immutable,
+    остальные (например, profile.svg из начальных данных) проверяются по ETag.
+    """
+
+    def file_response(self, full_path, stat_result, scope, status_code: int = 200):
+        request_headers = Headers(scope=scope)
+        media_type = mimetypes.guess_type(str(full_path))[0] or "text/plain"
+        cache_control = IMMUTABLE_CACHE_CONTROL if is_content_hashed(full_path) else REVALIDATE_CACHE_CONTROL
+        headers = {"Cache-Control": cache_control}
+
+        response = None
+        if Path(full_path).suffix.lower() in COMPRESSIBLE_EXTENSIONS:
+            headers["Vary"] = "Accept-Encoding"
+            accepted = accepted_encodings(request_headers.get("accept-encoding", ""))
+            for encoding, suffix in ENCODINGS:
+                if encoding not in accepted:
+                    continue
+                sibling = f"{full_path}{suffix}"
+                try:
+                    sibling_stat = os.stat(sibling)
+                except FileNotFoundError:
+                    continue
+                if sibling_stat.st_mtime < stat_result.st_mtime:
+                    continue  # копия устарела
+                response = FileResponse(
+                    sibling,
+                    status_code=status_code,
+                    stat_result=sibling_stat,
+                    media_type=media_type,
+                    headers={**headers, "Content-Encoding": encoding},
+                )
+                break
+
+        if response is None:
+            response = FileResponse(
+                full_path, status_code=status_code, stat_result=stat_result,
+                media_type=media_type, headers=headers,
+            )
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response
@@ -0,0 +1,128 @@
+import hashlib
+import os
+import tempfile
+from pathlib import Path
+
+from fastapi.responses import JSONResponse
+from starlette.concurrency import run_in_threadpool
+
+from .static_files import CONTENT_HASH_LENGTH
+
+MAX_PROFILE_IMAGE_SIZE = 5 * 1024 * 1024  # 5MB
+CHUNK_SIZE = 64 * 1024
+# Запас на заголовки multipart сверх размера самого файла
+MULTIPART_OVERHEAD = 64 * 1024
+
+TOO_LARGE_DETAIL = "Файл слишком большой. Максимальный размер: 5MB"
+
+
+class UploadTooLarge(Exception):
+    pass
+
+
+def _copy_limited(source, directory: Path, make_name, max_size: int) -> Path:
+    """Копирует поток блоками во временный файл и атомарно переименовывает его.
+
+    Имя файла строится через make_name(хэш содержимого), поэтому новое
+    содержимое получает новый URL. Копирование прерывается, как только
+    превышен max_size; временный файл удаляется, а существующие файлы
+    остаются нетронутыми.
+    """
+    directory.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=directory, prefix=".upload-", suffix=".part")
+    hasher = hashlib.blake2b(digest_size=CONTENT_HASH_LENGTH // 2)
+    size = 0
+    try:
+        with os.fdopen(fd, "wb") as out:
+            while True:
+                chunk = source.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_size:
+                    raise UploadTooLarge()
+                hasher.update(chunk)
+                out.write(chunk)
+            out.flush()
+            os.fsync(out.fileno())
+        os.chmod(tmp_name, 0o644)
+        destination = directory / make_name(hasher.hexdigest())
+        os.replace(tmp_name, destination)
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except FileNotFoundError:
+            pass
+        raise
+    return destination
+
+
+async def save_upload(file, directory: Path, make_name, max_size: int) -> Path:
+    """Сохраняет UploadFile в directory, не блокируя event loop; возвращает путь"""
+    await file.seek(0)
+    return await run_in_threadpool(_copy_limited, file.file, directory, make_name, max_size)
+
+
+class UploadSizeLimitMiddleware:
+    """Отклоняет загрузку с 413, не дожидаясь разбора multipart.
+
+    Запрос с Content-Length больше лимита отклоняется сразу. Для остальных
+    (в том числе chunked без Content-Length) считаются байты тела: как только
+    сумма превышает лимит, клиенту уходит 413, а приложение получает
+    http.disconnect и прекращает чтение; его собственный ответ отбрасывается.
+    """
+
+    def __init__(self, app, limits):
+        self.app = app
+        self.limits = limits
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] not in self.limits:
+            await self.app(scope, receive, send)
+            return
+
+        limit = self.limits[scope["path"]] + MULTIPART_OVERHEAD
+        for name, value in scope["headers"]:
+            if name == b"content-length":
+                if value.isdigit() and int(value) > limit:
+                    await self._reject(scope, receive, send)
+                    return
+                break
+
+        received = 0
+        rejected = False
+        response_started = False
+
+        async def limited_receive():
+            nonlocal received, rejected
+            if rejected:
+                return {"type": "http.disconnect"}
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    rejected = True
+                    if not response_started:
+                        await self._reject(scope, receive, send)
+                    return {"type": "http.disconnect"}
+            return message
+
+        async def guarded_send(message):
+            nonlocal response_started
+            if rejected:
+                return
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, guarded_send)
+        except Exception:
+            # Ошибка чтения оборванного тела: клиент уже получил 413
+            if not rejected:
+                raise
+
+    @staticmethod
+    async def _reject(scope, receive, send):
+        response = JSONResponse(status_code=413, content={"detail": TOO_LARGE_DETAIL})
+        await response(scope, receive, send)
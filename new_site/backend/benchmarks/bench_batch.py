@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Пакетные изменения против запроса на каждую строку.
+
+Поднимает uvicorn на временной базе с N постами и обновляет content
+у всех постов двумя способами: как прежний migratePostsHTML (PUT на пост,
+коммит на пост) и одним POST /api/admin/posts/batch. То же для
+перестановки целей: PUT на цель против reorder в одном пакете.
+
+Запуск: cd new_site/backend && python benchmarks/bench_batch.py
+"""
+
+import json
+import os
+import sys
+import tempfile
+import time
+from urllib.parse import urlencode
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from server import run_server, request
+
+ROWS = 200
+LOGIN_FORM = urlencode({"username": "admin", "password": "admin"})
+LOGIN_HEADERS = {"Content-Type": "application/x-www-form-urlencoded"}
+
+
+def timed(function):
+    started = time.perf_counter()
+    function()
+    return (time.perf_counter() - started) * 1000
+
+
+def batch(port, auth, path, payload):
+    status, body, _ = request("127.0.0.1", port, "POST", path, json.dumps(payload), auth)
+    assert status == 200 and json.loads(body)["applied"] == sum(map(len, payload.values())), body
+
+
+if __name__ == "__main__":
+    tmp_dir = tempfile.mkdtemp(prefix="bench_batch_")
+    # Профиль production (WAL, synchronous=NORMAL), чтобы сравнение не сводилось к fsync
+    with run_server(f"sqlite:///{os.path.join(tmp_dir, 'bench.db')}", extra_env={"DATABASE_PROFILE": "production"}) as port:
+        _, body, _ = request("127.0.0.1", port, "POST", "/api/auth/login", LOGIN_FORM, LOGIN_HEADERS)
+        auth = {"Authorization": f"Bearer {json.loads(body)['access_token']}", "Content-Type": "application/json"}
+
+        batch(port, auth, "/api/admin/posts/batch", {"create": [
+            {"title": f"Пост {i}", "slug": f"post-{i}", "content": f"<p>Текст {i}</p>", "published": True}
+            for i in range(ROWS)
+        ]})
+        _, body, _ = request("127.0.0.1", port, "GET", "/api/admin/posts", headers=auth)
+        post_ids = [post["id"] for post in json.loads(body)]
+        _, body, _ = request("127.0.0.1", port, "GET", "/api/admin/categories", headers=auth)
+        category_id = json.loads(body)[0]["id"]
+        batch(port, auth, "/api/admin/goals/batch", {"create": [
+            {"text": f"Цель {i}", "category_id": category_id, "order": i} for i in range(ROWS)
+        ]})
+        _, body, _ = request("127.0.0.1", port, "GET", "/api/admin/goals", headers=auth)
+        goal_ids = [goal["id"] for category in json.loads(body) for goal in category["goals"]]
+
+        def put_each(path, ids, make):
+            for item_id in ids:
+                status, _, _ = request("127.0.0.1", port, "PUT", f"{path}/{item_id}", json.dumps(make(item_id)), auth)
+                assert status == 200
+
+        rows = [
+            ("посты: content", "/api/admin/posts", post_ids,
+             lambda i: {"content": f"<p>Очищено {i}</p>"}, "update",
+             lambda i: {"id": i, "content": f"<p>Очищено снова {i}</p>"}),
+            ("цели: порядок", "/api/admin/goals", goal_ids,
+             lambda i: {"order": -i}, "reorder",
+             lambda i: {"id": i, "order": i}),
+        ]
+        print(f"{'Операция':>16} | {'строк':>5} | {'PUT на строку, мс':>17} | {'пакет, мс':>9} | {'ускорение':>9}")
+        for name, path, ids, single, operation, item in rows:
+            single_ms = timed(lambda: put_each(path, ids, single))
+            batch_ms = timed(lambda: batch(port, auth, f"{path}/batch", {operation: [item(i) for i in ids]}))
+            print(f"{name:>16} | {len(ids):>5} | {single_ms:>17.0f} | {batch_ms:>9.0f} | {single_ms / batch_ms:>8.1f}x")
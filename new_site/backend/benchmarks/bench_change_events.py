@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Серия правок в админке -> одна отложенная пересборка экспорта.
+
+Поднимает uvicorn с STATIC_EXPORT_ON_CHANGE=1, выполняет 50 PUT подряд
+для одного поста и после каждого проверяет, что публичный /api/posts/<slug>
+уже отдает новый заголовок (кэш инвалидируется сразу после коммита).
+Затем ждет окончания паузы и по /api/admin/cache-stats считает, сколько
+раз запускался экспорт. Для сравнения замеряется один полный экспорт,
+который без объединения выполнялся бы после каждой правки.
+
+Запуск: cd new_site/backend && python benchmarks/bench_change_events.py
+"""
+
+import json
+import os
+import sys
+import tempfile
+import time
+from urllib.parse import urlencode
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from server import run_server, request
+
+EDITS = 50
+DEBOUNCE = 1.0
+LOGIN_FORM = urlencode({"username": "admin", "password": "admin"})
+LOGIN_HEADERS = {"Content-Type": "application/x-www-form-urlencoded"}
+
+
+def export_runs(port, headers):
+    _, body, _ = request("127.0.0.1", port, "GET", "/api/admin/cache-stats", headers=headers)
+    return sum(job["runs"] for job in json.loads(body)["deferred_jobs"])
+
+
+if __name__ == "__main__":
+    tmp_dir = tempfile.mkdtemp(prefix="bench_events_")
+    export_dir = os.path.join(tmp_dir, "export")
+    extra_env = {
+        "STATIC_EXPORT_ON_CHANGE": "1",
+        "STATIC_EXPORT_DIR": export_dir,
+        "STATIC_EXPORT_DEBOUNCE": str(DEBOUNCE),
+    }
+    with run_server(f"sqlite:///{os.path.join(tmp_dir, 'bench.db')}", extra_env=extra_env) as port:
+        _, body, _ = request("127.0.0.1", port, "POST", "/api/auth/login", LOGIN_FORM, LOGIN_HEADERS)
+        auth = {"Authorization": f"Bearer {json.loads(body)['access_token']}", "Content-Type": "application/json"}
+
+        post = {"title": "Черновик", "slug": "burst", "excerpt": "", "content": "<p>Текст</p>", "published": True}
+        _, body, _ = request("127.0.0.1", port, "POST", "/api/admin/posts", json.dumps(post), auth)
+        post_id = json.loads(body)["id"]
+        time.sleep(DEBOUNCE * 2)
+        runs_before = export_runs(port, auth)
+
+        stale = 0
+        started = time.perf_counter()
+        for i in range(EDITS):
+            title = f"Заголовок {i}"
+            request("127.0.0.1", port, "PUT", f"/api/admin/posts/{post_id}", json.dumps({"title": title}), auth)
+            _, body, _ = request("127.0.0.1", port, "GET", "/api/posts/burst")
+            stale += json.loads(body)["title"] != title
+        burst_ms = (time.perf_counter() - started) * 1000
+
+        time.sleep(DEBOUNCE * 2)
+        runs = export_runs(port, auth) - runs_before
+        with open(os.path.join(export_dir, "api", "posts", "burst.json"), "rb") as exported:
+            exported_title = json.loads(exported.read())["title"]
+
+    # Стоимость одного экспорта на той же базе: столько стоила бы каждая правка
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tmp_dir, 'bench.db')}"
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from app.database import SessionLocal
+    from app.snapshot import export_snapshot
+
+    db = SessionLocal()
+    try:
+        started = time.perf_counter()
+        export_snapshot(db, os.path.join(tmp_dir, "full"), full=True)
+        export_ms = (time.perf_counter() - started) * 1000
+    finally:
+        db.close()
+
+    print(f"Правок: {EDITS} за {burst_ms:.0f} мс, устаревших публичных ответов: {stale}")
+    print(f"Запусков экспорта после серии: {runs} (без объединения было бы {EDITS})")
+    print(f"Заголовок в экспорте: {exported_title!r}")
+    print(f"Полный экспорт: {export_ms:.1f} мс, сэкономлено ~{export_ms * (EDITS - runs):.0f} мс фоновой работы")
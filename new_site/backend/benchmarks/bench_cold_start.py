@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Холодный старт: импорт app.main и время до первого ответа сервера.
+
+Замеряет медиану по --runs запускам:
+- импорт app.main в новом процессе (так стартует каждый воркер
+  и каждый перезапуск --reload);
+- время от запуска uvicorn до первого ответа /api/site на новой базе
+  (подготовка схемы и начальных данных) и на уже подготовленной;
+- то же для --workers 2 на новой базе: воркеры готовят базу по очереди
+  под блокировкой, второй находит ее готовой.
+
+Дополнительно проверяет, что импорт не трогает базу и не загружает
+отложенные модули (DEFERRED_MODULES). Если замер превышает бюджет
+или проверка не прошла, скрипт завершается с кодом 1.
+
+Запуск: cd new_site/backend && python benchmarks/bench_cold_start.py
+        python benchmarks/bench_cold_start.py --import-budget 1.5
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from server import BACKEND_DIR, run_server
+
+# Бюджеты по умолчанию, секунды; сняты с запасом на машине с 1 CPU
+IMPORT_BUDGET = 2.5
+START_BUDGET = 3.5
+# Воркеры импортируют приложение параллельно и делят процессоры
+WORKERS_START_BUDGET = 6.0
+
+# Модули, которые не должны загружаться при импорте приложения
+DEFERRED_MODULES = ("jose", "passlib", "PIL")
+
+IMPORT_CHECK = f"""
+import sys
+import app.main
+loaded = [name for name in {DEFERRED_MODULES!r} if name in sys.modules]
+print(",".join(loaded))
+"""
+
+
+def import_once(database_url):
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-c", IMPORT_CHECK], cwd=BACKEND_DIR,
+        env=dict(os.environ, DATABASE_URL=database_url),
+        capture_output=True, text=True, check=True,
+    )
+    return time.perf_counter() - started, result.stdout.strip()
+
+
+def start_once(database_url, args=()):
+    started = time.perf_counter()
+    with run_server(database_url, args=args):
+        return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Холодный старт backend")
+    parser.add_argument("--runs", type=int, default=5, help="запусков на замер")
+    parser.add_argument("--import-budget", type=float, default=IMPORT_BUDGET, help="бюджет импорта, с")
+    parser.add_argument("--start-budget", type=float, default=START_BUDGET, help="бюджет до первого ответа, с")
+    parser.add_argument("--workers-budget", type=float, default=WORKERS_START_BUDGET, help="то же для 2 воркеров, с")
+    args = parser.parse_args()
+
+    tmp_dir = tempfile.mkdtemp(prefix="bench_cold_start_")
+    failures = []
+
+    database_path = os.path.join(tmp_dir, "import.db")
+    imports, loaded = [], ""
+    for _ in range(args.runs):
+        elapsed, loaded = import_once(f"sqlite:///{database_path}")
+        imports.append(elapsed)
+    if os.path.exists(database_path):
+        failures.append("импорт app.main создал базу данных")
+    if loaded:
+        failures.append(f"при импорте загружены отложенные модули: {loaded}")
+
+    fresh = [start_once(f"sqlite:///{os.path.join(tmp_dir, f'fresh{i}.db')}") for i in range(args.runs)]
+    prepared_url = f"sqlite:///{os.path.join(tmp_dir, 'fresh0.db')}"
+    prepared = [start_once(prepared_url) for _ in range(args.runs)]
+    workers = [
+        start_once(f"sqlite:///{os.path.join(tmp_dir, f'workers{i}.db')}", args=("--workers", "2"))
+        for i in range(args.runs)
+    ]
+
+    rows = [
+        ("импорт app.main", imports, args.import_budget),
+        ("первый ответ, новая база", fresh, args.start_budget),
+        ("первый ответ, готовая база", prepared, args.start_budget),
+        ("первый ответ, 2 воркера", workers, args.workers_budget),
+    ]
+    print(f"{'Замер':>28} | {'медиана, с':>10} | {'мин, с':>7} | {'бюджет, с':>9}")
+    for name, values, budget in rows:
+        print(f"{name:>28} | {statistics.median(values):>10.3f} | {min(values):>7.3f} | {budget:>9.2f}")
+        if statistics.median(values) > budget:
+            failures.append(f"{name}: {statistics.median(values):.3f} с > {budget:.2f} с")
+
+    if failures:
+        print("❌ Бюджет холодного старта превышен:")
+        for failure in failures:
+            print(f"   {failure}")
+        sys.exit(1)
+    print("✅ Холодный старт в пределах бюджета")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Сжатие ответов API на 1 000 постов.
+
+Поднимает uvicorn на временной базе с 1 000 постами и для списков постов
+сравнивает размер ответа и задержку без сжатия, с gzip и с brotli.
+Первый запрос каждой кодировки к /api/posts строит и сжимает ответ,
+последующие отдают сжатые байты из кэша; /api/admin/posts не кэшируется
+и сжимается middleware на каждый запрос.
+
+Запуск: cd new_site/backend && python benchmarks/bench_compression.py
+"""
+
+import json
+import os
+import random
+import sys
+import tempfile
+from datetime import datetime, timedelta
+from statistics import median
+from urllib.parse import urlencode
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from server import run_server, request, percentile
+
+POSTS = 1000
+ROUNDS = 30
+WORDS = (
+    "сайт пост цель код данные запрос ответ кэш индекс база сервер клиент "
+    "страница список время работа проект задача идея пример текст заметка"
+).split()
+ENCODINGS = ("identity", "gzip", "br")
+
+
+def make_content(rng):
+    """HTML поста из ~600 случайных слов, чтобы сжатие не было нереалистично хорошим"""
+    paragraphs = []
+    for _ in range(12):
+        words = [rng.choice(WORDS) + rng.choice(("", "", "ы", "ами", "ом")) for _ in range(50)]
+        words[rng.randrange(50)] = f"<strong>{rng.randrange(10 ** 6)}</strong>"
+        paragraphs.append("<p>" + " ".join(words) + ".</p>")
+    return "\n".join(paragraphs)
+
+
+def seed(database_url):
+    from sqlalchemy.orm import sessionmaker
+
+    from app.database import Base, create_db_engine
+    from app.models import BlogPost
+
+    engine = create_db_engine(database_url, "development")
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    started_at = datetime(2023, 1, 1)
+    rng = random.Random(42)
+    db.bulk_insert_mappings(BlogPost, [
+        {
+            "title": f"Пост {i}",
+            "slug": f"post-{i}",
+            "excerpt": f"Краткое описание поста {i}",
+            "content": make_content(rng),
+            "published": True,
+            "published_at": started_at + timedelta(hours=i),
+        }
+        for i in range(POSTS)
+    ])
+    db.commit()
+    db.close()
+    engine.dispose()
+
+
+def measure(port, path, encoding, headers=None):
+    headers = dict(headers or {}, **{"Accept-Encoding": encoding})
+    status, body, first = request("127.0.0.1", port, "GET", path, headers=headers)
+    assert status == 200, (path, status)
+    latencies = [request("127.0.0.1", port, "GET", path, headers=headers)[2] for _ in range(ROUNDS)]
+    return len(body), first, median(latencies), percentile(latencies, 99)
+
+
+if __name__ == "__main__":
+    tmp_dir = tempfile.mkdtemp(prefix="bench_compression_")
+    database_url = f"sqlite:///{os.path.join(tmp_dir, 'bench.db')}"
+    seed(database_url)
+
+    with run_server(database_url) as port:
+        form = urlencode({"username": "admin", "password": "admin"})
+        _, body, _ = request(
+            "127.0.0.1", port, "POST", "/api/auth/login", form,
+            {"Content-Type": "application/x-www-form-urlencoded"},
+        )
+        auth = {"Authorization": "Bearer " + json.loads(body)["access_token"]}
+
+        print(f"Постов: {POSTS}, повторов: {ROUNDS}")
+        print(
+            f"{'Эндпоинт':>18} | {'кодировка':>9} | {'байт':>9} | {'первый, мс':>10} | "
+            f"{'p50, мс':>8} | {'p99, мс':>8}"
+        )
+        for path, headers in (
+            ("/api/posts", None),
+            ("/api/public/posts", None),
+            ("/api/admin/posts", auth),
+        ):
+            for encoding in ENCODINGS:
+                size, first, p50, p99 = measure(port, path, encoding, headers)
+                print(
+                    f"{path:>18} | {encoding:>9} | {size:>9} | {first:>10.1f} | "
+                    f"{p50:>8.2f} | {p99:>8.2f}"
+                )
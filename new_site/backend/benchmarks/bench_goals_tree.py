@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк построения дерева целей (/api/goals, /api/public/goals).
+
+Заполняет временную SQLite базу разным числом категорий и проверяет,
+что количество SQL запросов и время ответа не растут вместе с числом категорий.
+
+Запуск: cd new_site/backend && python benchmarks/bench_goals_tree.py
+"""
+
+import os
+import sys
+import tempfile
+import time
+from statistics import median
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+TMP_DIR = tempfile.mkdtemp(prefix="bench_goals_")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(TMP_DIR, 'bench.db')}"
+
+from sqlalchemy import event
+
+from app.database import SessionLocal, engine
+from app.models import Base, GoalCategory, Goal
+from app.queries import build_goals_tree
+
+CATEGORY_COUNTS = [5, 50, 500]
+GOALS_PER_CATEGORY = 10
+ROUNDS = 20
+
+query_count = 0
+
+
+@event.listens_for(engine, "before_cursor_execute")
+def _count_queries(conn, cursor, statement, parameters, context, executemany):
+    global query_count
+    query_count += 1
+
+
+def seed(categories_count):
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        db.bulk_insert_mappings(GoalCategory, [
+            {"id": i, "name": f"Категория {i}", "order": i}
+            for i in range(1, categories_count + 1)
+        ])
+        db.bulk_insert_mappings(Goal, [
+            {
+                "text": f"Цель {i}.{j}",
+                "category_id": i,
+                "is_completed": j % 3 == 0,
+                "order": j,
+            }
+            for i in range(1, categories_count + 1)
+            for j in range(GOALS_PER_CATEGORY)
+        ])
+        db.commit()
+    finally:
+        db.close()
+
+
+def legacy_goals_tree(db):
+    """Прежняя реализация: отдельный запрос целей на каждую категорию (N+1)"""
+    result = []
+    for category in db.query(GoalCategory).order_by(GoalCategory.order).all():
+        goals = db.query(Goal).filter(Goal.category_id == category.id).order_by(Goal.order).all()
+        result.append({
+            "id": category.id,
+            "name": category.name,
+            "goals": [{"id": goal.id, "text": goal.text} for goal in goals],
+        })
+    return result
+
+
+def measure(builder):
+    global query_count
+    timings = []
+    queries = 0
+    for _ in range(ROUNDS):
+        db = SessionLocal()
+        query_count = 0
+        started = time.perf_counter()
+        builder(db)
+        timings.append((time.perf_counter() - started) * 1000)
+        queries = query_count
+        db.close()
+    return queries, median(timings)
+
+
+def run(categories_count):
+    seed(categories_count)
+    for name, builder in (
+        ("N+1", legacy_goals_tree),
+        ("дерево", lambda db: build_goals_tree(db, public=True)),
+    ):
+        queries, p50 = measure(builder)
+        print(
+            f"{categories_count:>10} | {name:>7} | {queries:>8} | "
+            f"{p50:>10.2f} | {p50 / categories_count:>14.4f}"
+        )
+
+
+if __name__ == "__main__":
+    print(f"Целей в категории: {GOALS_PER_CATEGORY}, повторов: {ROUNDS}")
+    print(f"{'Категорий':>10} | {'Способ':>7} | {'Запросов':>8} | {'p50, мс':>10} | {'мс/категорию':>14}")
+    for count in CATEGORY_COUNTS:
+        run(count)
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Задержка публичного чтения во время шторма логинов.
+
+Поднимает uvicorn на временной базе, замеряет p50/p99 запросов /api/site
+без нагрузки и при одновременных логинах (PBKDF2), а также считает,
+сколько логинов было отклонено с 429 из-за заполненной очереди хэширования.
+
+Запуск: cd new_site/backend && python benchmarks/bench_login_storm.py
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+from urllib.parse import urlencode
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from server import run_server, request, percentile
+
+READERS = 4
+LOGIN_THREADS = 32
+DURATION = 5.0
+LOGIN_FORM = urlencode({"username": "admin", "password": "admin"})
+LOGIN_HEADERS = {"Content-Type": "application/x-www-form-urlencoded"}
+
+
+def phase(port, with_storm):
+    stop = threading.Event()
+    latencies = []
+    logins = {"ok": 0, "rejected": 0, "other": 0}
+    lock = threading.Lock()
+
+    def reader():
+        while not stop.is_set():
+            _, _, elapsed = request("127.0.0.1", port, "GET", "/api/site")
+            with lock:
+                latencies.append(elapsed)
+
+    def login():
+        while not stop.is_set():
+            status, _, _ = request("127.0.0.1", port, "POST", "/api/auth/login", LOGIN_FORM, LOGIN_HEADERS)
+            key = "ok" if status == 200 else "rejected" if status == 429 else "other"
+            with lock:
+                logins[key] += 1
+
+    threads = [threading.Thread(target=reader) for _ in range(READERS)]
+    if with_storm:
+        threads += [threading.Thread(target=login) for _ in range(LOGIN_THREADS)]
+    for thread in threads:
+        thread.start()
+    time.sleep(DURATION)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    name = "шторм логинов" if with_storm else "без нагрузки"
+    print(
+        f"{name:>14} | {percentile(latencies, 50):>8.2f} | {percentile(latencies, 99):>8.2f} | "
+        f"{logins['ok']:>10} | {logins['rejected']:>8}"
+    )
+
+
+if __name__ == "__main__":
+    tmp_dir = tempfile.mkdtemp(prefix="bench_login_")
+    database_url = f"sqlite:///{os.path.join(tmp_dir, 'bench.db')}"
+    with run_server(database_url) as port:
+        print(f"Читателей /api/site: {READERS}, потоков логина: {LOGIN_THREADS}, {DURATION} с на фазу")
+        print(f"{'Фаза':>14} | {'p50, мс':>8} | {'p99, мс':>8} | {'логинов ок':>10} | {'429':>8}")
+        phase(port, with_storm=False)
+        phase(port, with_storm=True)
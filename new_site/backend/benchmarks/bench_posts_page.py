@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк списка постов: полный список (/api/posts без параметров)
+против keyset-страницы из 20 постов (/api/posts?limit=20) - первой
+и глубокой (курсор на 90% ленты).
+
+Глубокая страница должна стоить как первая: если она дороже больше чем
+в DEEP_PAGE_MAX_RATIO раз, продолжение по курсору обходит индекс
+с начала, и скрипт завершается с кодом 1.
+
+Запуск: cd new_site/backend && python benchmarks/bench_posts_page.py
+"""
+
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from statistics import median
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+TMP_DIR = tempfile.mkdtemp(prefix="bench_posts_")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(TMP_DIR, 'bench.db')}"
+
+from app.serializers import render_json
+from app.database import SessionLocal, engine
+from app.models import Base, BlogPost
+from app.queries import encode_posts_cursor, get_posts_page
+from app.schemas import BlogPost as BlogPostSchema, BlogPostPage
+
+POST_COUNTS = [50, 5000, 50000]
+PAGE_SIZE = 20
+# Полный список на 50 000 постов занимает минуты и сотни мегабайт
+FULL_LIST_MAX_POSTS = 5000
+ROUNDS = 10
+# Позиция курсора глубокой страницы в ленте и допуск к стоимости первой
+DEEP_PAGE_POSITION = 0.9
+DEEP_PAGE_MAX_RATIO = 2.0
+CONTENT = "<p>" + "Текст поста. " * 300 + "</p>"
+
+
+def seed(posts_count):
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    started_at = datetime(2020, 1, 1)
+    db = SessionLocal()
+    try:
+        db.bulk_insert_mappings(BlogPost, [
+            {
+                "title": f"Пост {i}",
+                "slug": f"post-{i}",
+                "excerpt": f"Краткое описание поста {i}",
+                "content": CONTENT,
+                "published": True,
+                "published_at": started_at + timedelta(minutes=i),
+                "created_at": started_at + timedelta(minutes=i),
+            }
+            for i in range(posts_count)
+        ])
+        db.commit()
+    finally:
+        db.close()
+
+
+def full_list(db):
+    posts = db.query(BlogPost).filter(BlogPost.published == True).order_by(BlogPost.created_at.desc()).all()
+    return render_json(posts, List[BlogPostSchema])
+
+
+def first_page(db):
+    posts, next_cursor = get_posts_page(db, limit=PAGE_SIZE)
+    return render_json({"items": posts, "next_cursor": next_cursor}, BlogPostPage)
+
+
+def deep_page_cursor(db, posts_count):
+    post = (
+        db.query(BlogPost).filter(BlogPost.published == True)
+        .order_by(BlogPost.published_at.desc(), BlogPost.id.desc())
+        .offset(int(posts_count * DEEP_PAGE_POSITION)).first()
+    )
+    return encode_posts_cursor(post)
+
+
+def deep_page(cursor):
+    def render(db):
+        posts, next_cursor = get_posts_page(db, limit=PAGE_SIZE, cursor=cursor)
+        return render_json({"items": posts, "next_cursor": next_cursor}, BlogPostPage)
+    return render
+
+
+def measure(render):
+    timings = []
+    body = b""
+    for _ in range(ROUNDS):
+        db = SessionLocal()
+        started = time.perf_counter()
+        body = render(db)
+        timings.append((time.perf_counter() - started) * 1000)
+        db.close()
+    return median(timings), len(body)
+
+
+if __name__ == "__main__":
+    failed = False
+    print(f"{'Постов':>8} | {'Режим':>16} | {'p50, мс':>10} | {'Размер, КБ':>11}")
+    for count in POST_COUNTS:
+        seed(count)
+        db = SessionLocal()
+        cursor = deep_page_cursor(db, count)
+        db.close()
+        modes = (
+            ("полный список", full_list),
+            (f"страница {PAGE_SIZE}", first_page),
+            (f"глубокая {PAGE_SIZE}", deep_page(cursor)),
+        )
+        p50s = {}
+        for name, render in modes:
+            if render is full_list and count > FULL_LIST_MAX_POSTS:
+                continue
+            p50s[name], size = measure(render)
+            print(f"{count:>8} | {name:>16} | {p50s[name]:>10.2f} | {size / 1024:>11.1f}")
+        first, deep = p50s[f"страница {PAGE_SIZE}"], p50s[f"глубокая {PAGE_SIZE}"]
+        if deep > first * DEEP_PAGE_MAX_RATIO:
+            failed = True
+            print(f"❌ {count} постов: глубокая страница {deep:.2f} мс, первая {first:.2f} мс")
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк полнотекстового поиска (FTS5) на 100 000 постов.
+
+Создает временную базу, строит поисковый индекс и замеряет задержку
+search_posts для редких, частых и префиксных запросов, а также для
+глубокой страницы. Для сравнения один раз выполняется наивный поиск
+LIKE '%слово%' по content, которым пришлось бы искать без индекса.
+
+Запуск: cd new_site/backend && python benchmarks/bench_search.py
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from statistics import median
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+TMP_DIR = tempfile.mkdtemp(prefix="bench_search_")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(TMP_DIR, 'bench.db')}"
+
+from app.database import SessionLocal, engine, create_tables
+from app.models import BlogPost
+from app.search import ensure_search_index, search_posts
+
+POSTS = 100_000
+BATCH = 5_000
+ROUNDS = 20
+WORDS = (
+    "сайт пост цель код данные запрос ответ кэш индекс база сервер клиент "
+    "страница список время работа проект задача идея пример текст заметка "
+    "python sqlite fastapi react поиск шаблон модуль функция класс тест"
+).split()
+# Редкое слово: встречается в каждом тысячном посте
+RARE_WORD = "криптография"
+
+QUERIES = {
+    "редкое слово": (RARE_WORD, 0),
+    "частое слово": ("данные ", 0),
+    "частый префикс": ("данн", 0),
+    "два слова": ("python sqlite ", 0),
+    "префикс": ("крип", 0),
+    "страница 50": ("данные ", 500),
+}
+
+
+def make_content(rng, i):
+    words = [rng.choice(WORDS) for _ in range(200)]
+    if i % 1000 == 0:
+        words[rng.randrange(len(words))] = RARE_WORD
+    return "<p>" + " ".join(words[:100]) + "</p>\n<p><strong>" + " ".join(words[100:]) + "</strong></p>"
+
+
+def seed():
+    create_tables()
+    rng = random.Random(7)
+    started_at = datetime(2015, 1, 1)
+    db = SessionLocal()
+    try:
+        for start in range(0, POSTS, BATCH):
+            db.bulk_insert_mappings(BlogPost, [
+                {
+                    "title": f"Пост {i} про {rng.choice(WORDS)}",
+                    "slug": f"post-{i}",
+                    "excerpt": f"Краткое описание: {rng.choice(WORDS)} и {rng.choice(WORDS)}",
+                    "content": make_content(rng, i),
+                    "published": True,
+                    "published_at": started_at + timedelta(minutes=i),
+                }
+                for i in range(start, min(start + BATCH, POSTS))
+            ])
+            db.commit()
+    finally:
+        db.close()
+
+
+def timed(function):
+    started = time.perf_counter()
+    result = function()
+    return result, (time.perf_counter() - started) * 1000
+
+
+if __name__ == "__main__":
+    _, seed_ms = timed(seed)
+    # bulk_insert_mappings не вызывает событий ORM: индекс строится целиком,
+    # как при первом запуске на существующей базе
+    _, index_ms = timed(lambda: ensure_search_index(engine))
+    print(f"Постов: {POSTS}, заполнение: {seed_ms / 1000:.1f} с, построение индекса: {index_ms / 1000:.1f} с")
+
+    print(f"{'Запрос':>14} | {'p50, мс':>8} | {'max, мс':>8} | {'найдено на странице':>19}")
+    for name, (query, offset) in QUERIES.items():
+        timings = []
+        found = 0
+        for _ in range(ROUNDS):
+            db = SessionLocal()
+            try:
+                (posts, _, _), elapsed = timed(lambda: search_posts(db, query, limit=10, offset=offset))
+            finally:
+                db.close()
+            timings.append(elapsed)
+            found = len(posts)
+        print(f"{name:>14} | {median(timings):>8.2f} | {max(timings):>8.2f} | {found:>19}")
+
+    db = SessionLocal()
+    try:
+        _, like_ms = timed(lambda: (
+            db.query(BlogPost.id)
+            .filter(BlogPost.published == True, BlogPost.content.like(f"%{RARE_WORD}%"))
+            .limit(10)
+            .all()
+        ))
+    finally:
+        db.close()
+    print(f"{'LIKE %слово%':>14} | {like_ms:>8.2f} | {'':>8} | (без индекса, для сравнения)")
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк сериализации: прежний путь (валидация каждой строки через
+pydantic + jsonable_encoder + JSONResponse) против проекций схем и orjson.
+
+Строки загружаются из базы один раз, замеряется только сериализация.
+Перед замером проверяется, что оба пути дают побайтно одинаковый JSON.
+
+Запуск: cd new_site/backend && python benchmarks/bench_serialization.py
+"""
+
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from statistics import median
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+TMP_DIR = tempfile.mkdtemp(prefix="bench_serialization_")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(TMP_DIR, 'bench.db')}"
+
+from app.database import SessionLocal, engine
+from app.models import Base, BlogPost, GoalCategory, Goal, ImageVariant, SiteSettings, SocialNetwork
+from app.queries import (
+    build_goals_tree, get_dashboard_stats, get_posts_page, get_site_settings_row, list_posts, list_social_networks,
+)
+from app.schemas import (
+    BlogPost as BlogPostSchema, BlogPostPage, DashboardStats,
+    SiteSettings as SiteSettingsSchema, SocialNetwork as SocialNetworkSchema,
+)
+from app.serializers import render_json, render_json_validated
+
+POST_COUNTS = [100, 1000, 5000]
+ROUNDS = 10
+CONTENT = "<p>" + "Текст поста. " * 300 + "</p>"
+# Каждый десятый пост с обложкой и ее копиями
+COVER_EVERY = 10
+
+
+def seed(posts_count):
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    started_at = datetime(2020, 1, 1, 12, 0, 0, 123456)
+    db = SessionLocal()
+    try:
+        db.add(SiteSettings(site_title="Сайт", profile_image="/static/assets/images/profile.svg"))
+        db.bulk_insert_mappings(BlogPost, [
+            {
+                "title": f"Пост {i}",
+                "slug": f"post-{i}",
+                "excerpt": f"Краткое описание поста {i}" if i % 3 else None,
+                "content": CONTENT,
+                "cover_image": f"/static/covers/{i}.jpg" if i % COVER_EVERY == 0 else None,
+                "published": i % 5 != 0,
+                "published_at": started_at + timedelta(minutes=i) if i % 5 != 0 else None,
+                "created_at": started_at + timedelta(minutes=i),
+            }
+            for i in range(posts_count)
+        ])
+        db.bulk_insert_mappings(ImageVariant, [
+            {
+                "source": f"/static/covers/{i}.jpg",
+                "url": f"/static/variants/cover-{i}-{width}w.{extension}",
+                "width": width,
+                "height": width // 2,
+                "mime_type": f"image/{extension}",
+            }
+            for i in range(0, posts_count, COVER_EVERY)
+            for width in (1280, 320, 640)
+            for extension in ("webp", "avif")
+        ])
+        # Категория 11 без целей: в статистике процент при нулевом числе целей
+        db.bulk_insert_mappings(GoalCategory, [{"id": i, "name": f"Категория {i}", "order": i} for i in range(1, 12)])
+        db.bulk_insert_mappings(Goal, [
+            {"text": f"Цель {i}.{j}", "category_id": i, "order": j, "is_completed": j % 3 == 0}
+            for i in range(1, 11) for j in range(10)
+        ])
+        db.bulk_insert_mappings(SocialNetwork, [
+            {"name": f"Сеть {i}", "url": "https://example.com", "icon_name": "link", "order": i}
+            for i in range(10)
+        ])
+        db.commit()
+    finally:
+        db.close()
+
+
+def cases(db):
+    """Имя -> (данные, схема); данные загружаются один раз"""
+    posts, next_cursor = get_posts_page(db, limit=20)
+    return {
+        "список постов": (list_posts(db, published_only=False), List[BlogPostSchema]),
+        "страница 20": ({"items": posts, "next_cursor": next_cursor}, BlogPostPage),
+        "настройки": (get_site_settings_row(db), SiteSettingsSchema),
+        "соцсети": (list_social_networks(db), List[SocialNetworkSchema]),
+        "цели": (build_goals_tree(db), None),
+        "цели public": (build_goals_tree(db, public=True), None),
+        "статистика": (get_dashboard_stats(db), DashboardStats),
+    }
+
+
+def measure(render, content, model):
+    timings = []
+    for _ in range(ROUNDS):
+        started = time.perf_counter()
+        render(content, model)
+        timings.append((time.perf_counter() - started) * 1000)
+    return median(timings)
+
+
+if __name__ == "__main__":
+    failed = False
+    print(f"{'Постов':>7} | {'Ответ':>14} | {'pydantic, мс':>12} | {'orjson, мс':>10} | {'ускорение':>9} | {'КБ':>8}")
+    for count in POST_COUNTS:
+        seed(count)
+        db = SessionLocal()
+        try:
+            for name, (content, model) in cases(db).items():
+                expected = render_json_validated(content, model)
+                actual = render_json(content, model)
+                if actual != expected:
+                    failed = True
+                    print(f"❌ {name}: вывод отличается от pydantic")
+                    continue
+                old = measure(render_json_validated, content, model)
+                new = measure(render_json, content, model)
+                print(
+                    f"{count:>7} | {name:>14} | {old:>12.2f} | {new:>10.2f} | "
+                    f"{old / new:>8.1f}x | {len(actual) / 1024:>8.1f}"
+                )
+        finally:
+            db.close()
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Нагрузочный тест профилей SQLite (DATABASE_PROFILE=development/production).
+
+Несколько потоков-читателей выполняют запрос страницы постов, пока
+поток-писатель непрерывно обновляет посты и коммитит, как админка.
+Сравнивается пропускная способность чтения в обоих профилях.
+
+Запуск: cd new_site/backend && python benchmarks/bench_sqlite_profile.py
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+TMP_DIR = tempfile.mkdtemp(prefix="bench_sqlite_")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(TMP_DIR, 'default.db')}")
+
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base, create_db_engine
+from app.models import BlogPost
+from app.queries import get_posts_page
+
+READERS = 8
+DURATION = 5.0
+POSTS = 2000
+
+
+def seed(Session):
+    db = Session()
+    started_at = datetime(2024, 1, 1)
+    db.bulk_insert_mappings(BlogPost, [
+        {
+            "title": f"Пост {i}",
+            "slug": f"post-{i}",
+            "content": "<p>" + "Текст. " * 200 + "</p>",
+            "published": True,
+            "published_at": started_at + timedelta(minutes=i),
+        }
+        for i in range(POSTS)
+    ])
+    db.commit()
+    db.close()
+
+
+def run(profile):
+    url = f"sqlite:///{os.path.join(TMP_DIR, profile + '.db')}"
+    engine = create_db_engine(url, profile)
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    seed(Session)
+
+    stop = threading.Event()
+    reads = [0] * READERS
+    errors = [0]
+    writes = [0]
+
+    def reader(index):
+        while not stop.is_set():
+            db = Session()
+            try:
+                get_posts_page(db, limit=20)
+                reads[index] += 1
+            except OperationalError:
+                errors[0] += 1
+            finally:
+                db.close()
+
+    def writer():
+        post_id = 1
+        while not stop.is_set():
+            db = Session()
+            try:
+                db.query(BlogPost).filter(BlogPost.id == post_id).update({"title": f"Правка {writes[0]}"})
+                db.commit()
+                writes[0] += 1
+            except OperationalError:
+                db.rollback()
+                errors[0] += 1
+            finally:
+                db.close()
+            post_id = post_id % POSTS + 1
+
+    threads = [threading.Thread(target=reader, args=(i,)) for i in range(READERS)]
+    threads.append(threading.Thread(target=writer))
+    for thread in threads:
+        thread.start()
+    time.sleep(DURATION)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    engine.dispose()
+
+    print(
+        f"{profile:>12} | {sum(reads) / DURATION:>10.0f} | "
+        f"{writes[0] / DURATION:>10.0f} | {errors[0]:>7}"
+    )
+
+
+if __name__ == "__main__":
+    print(f"Читателей: {READERS}, писатель: 1, длительность: {DURATION} с")
+    print(f"{'Профиль':>12} | {'чтений/с':>10} | {'записей/с':>10} | {'ошибок':>7}")
+    for profile in ("development", "production"):
+        run(profile)
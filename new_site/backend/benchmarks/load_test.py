@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+Нагрузочный тест API: RPS и p50/p95/p99 по эндпоинтам на базах разного размера.
+
+Для каждого размера базы (SIZES) заполняет временную базу через
+seed_data.py, поднимает uvicorn (benchmarks/server.py) и в течение
+--duration секунд нагружает каждый сценарий из --concurrency потоков
+с keep-alive соединениями. Публичные запросы идут с Accept-Encoding,
+как из браузера; админские - с токеном.
+
+Результаты пишутся в JSON (--output). С --baseline результаты сравниваются
+с сохраненным файлом: падение RPS или рост p95 больше допуска (--tolerance)
+считается регрессией, и скрипт завершается с кодом 1.
+
+Запуск: cd new_site/backend && python benchmarks/load_test.py
+        python benchmarks/load_test.py --sizes small --output base.json
+        python benchmarks/load_test.py --sizes small --baseline base.json
+
+Генератор нагрузки работает на той же машине, что и сервер: сравнивать
+имеет смысл только результаты, снятые на одном окружении.
+"""
+
+import argparse
+import http.client
+import itertools
+import json
+import os
+import platform
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+from urllib.parse import urlencode, quote
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from server import BACKEND_DIR, run_server, request, percentile
+
+# Размеры базы: аргументы seed_data.py
+SIZES = {
+    "small": {"posts": 100, "categories": 10, "goals": 100},
+    "medium": {"posts": 1000, "categories": 50, "goals": 1000},
+    "large": {"posts": 10000, "categories": 200, "goals": 5000},
+}
+# Полные списки постов (без пагинации) на больших базах занимают мегабайты
+# и измеряют сеть, а не backend; для них сценарии пропускаются
+FULL_LIST_MAX_POSTS = 1000
+SEARCH_QUERIES = ["python", "данные", "кэш индекс", "sql", "проект "]
+BROWSER_HEADERS = {"Accept-Encoding": "br, gzip"}
+LOGIN_FORM = urlencode({"username": "admin", "password": "admin"})
+LOGIN_HEADERS = {"Content-Type": "application/x-www-form-urlencoded"}
+
+
+def scenarios(size, slugs, post_ids, auth):
+    """(имя, функция, возвращающая (метод, путь, тело, заголовки), включен ли сценарий)"""
+    slug_cycle = itertools.cycle(slugs)
+    search_cycle = itertools.cycle(SEARCH_QUERIES)
+    id_cycle = itertools.cycle(post_ids)
+    counter = itertools.count()
+    small = SIZES[size]["posts"] <= FULL_LIST_MAX_POSTS
+    json_auth = {**auth, "Content-Type": "application/json"}
+    return [
+        ("site", lambda: ("GET", "/api/site", None, BROWSER_HEADERS), True),
+        ("posts_full", lambda: ("GET", "/api/posts", None, BROWSER_HEADERS), small),
+        ("posts_page", lambda: ("GET", "/api/posts?limit=20", None, BROWSER_HEADERS), True),
+        ("post_detail", lambda: ("GET", f"/api/posts/{next(slug_cycle)}", None, BROWSER_HEADERS), True),
+        ("search", lambda: ("GET", f"/api/posts/search?q={quote(next(search_cycle))}", None, BROWSER_HEADERS), True),
+        ("goals", lambda: ("GET", "/api/goals", None, BROWSER_HEADERS), True),
+        ("social_networks", lambda: ("GET", "/api/social-networks", None, BROWSER_HEADERS), True),
+        ("admin_posts", lambda: ("GET", "/api/admin/posts", None, auth), small),
+        ("admin_goals", lambda: ("GET", "/api/admin/goals", None, auth), True),
+        ("admin_stats", lambda: ("GET", "/api/admin/stats", None, auth), True),
+        (
+            "admin_update_post",
+            lambda: (
+                "PUT", f"/api/admin/posts/{next(id_cycle)}",
+                json.dumps({"excerpt": f"Описание {next(counter)}"}), json_auth,
+            ),
+            True,
+        ),
+    ]
+
+
+def run_load(port, make_request, duration, concurrency):
+    """Нагружает сервер из concurrency потоков; каждый держит свое соединение"""
+    stop = threading.Event()
+    lock = threading.Lock()
+    latencies, errors = [], [0]
+
+    def worker():
+        connection = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+        local, local_errors = [], 0
+        while not stop.is_set():
+            with lock:
+                method, path, body, headers = make_request()
+            started = time.perf_counter()
+            try:
+                connection.request(method, path, body=body, headers=headers)
+                response = connection.getresponse()
+                response.read()
+                if response.status >= 400:
+                    local_errors += 1
+                local.append((time.perf_counter() - started) * 1000)
+            except (OSError, http.client.HTTPException):
+                local_errors += 1
+                connection.close()
+                connection = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+        connection.close()
+        with lock:
+            latencies.extend(local)
+            errors[0] += local_errors
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    time.sleep(duration)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    return {
+        "requests": len(latencies),
+        "errors": errors[0],
+        "rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 50), 2),
+        "p95_ms": round(percentile(latencies, 95), 2),
+        "p99_ms": round(percentile(latencies, 99), 2),
+    }
+
+
+def seed(database_url, size):
+    """Заполняет базу через seed_data.py (те же модели и код, что у /api/admin/seed-data)"""
+    args = [f"--{name.replace('_', '-')}={count}" for name, count in SIZES[size].items()]
+    subprocess.run(
+        [sys.executable, "seed_data.py", *args],
+        cwd=BACKEND_DIR, env=dict(os.environ, DATABASE_URL=database_url),
+        check=True, stdout=subprocess.DEVNULL,
+    )
+
+
+def run_size(size, args):
+    tmp_dir = tempfile.mkdtemp(prefix=f"load_test_{size}_")
+    database_url = f"sqlite:///{os.path.join(tmp_dir, 'load.db')}"
+    seed(database_url, size)
+    server_args = ["--workers", str(args.workers)] if args.workers > 1 else []
+    extra_env = {"DATABASE_PROFILE": args.profile}
+    results = {}
+    with run_server(database_url, extra_env=extra_env, args=server_args) as port:
+        _, body, _ = request("127.0.0.1", port, "POST", "/api/auth/login", LOGIN_FORM, LOGIN_HEADERS)
+        auth = {"Authorization": f"Bearer {json.loads(body)['access_token']}"}
+        _, body, _ = request("127.0.0.1", port, "GET", "/api/admin/posts", headers=auth)
+        posts = json.loads(body)
+        slugs = [post["slug"] for post in posts if post["published"]][:200]
+        post_ids = [post["id"] for post in posts][:200]
+
+        for name, make_request, enabled in scenarios(size, slugs, post_ids, auth):
+            if not enabled or (args.scenarios and name not in args.scenarios):
+                continue
+            # Прогрев: кэш ответов и соединения SQLite
+            run_load(port, make_request, min(1.0, args.duration), args.concurrency)
+            results[name] = run_load(port, make_request, args.duration, args.concurrency)
+            result = results[name]
+            print(
+                f"{size:>6} | {name:>17} | {result['rps']:>8.1f} | {result['p50_ms']:>7.2f} | "
+                f"{result['p95_ms']:>7.2f} | {result['p99_ms']:>7.2f} | {result['errors']:>6}",
+                flush=True,
+            )
+    return results
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline, tolerance):
+    """Список регрессий относительно baseline: падение RPS или рост p95 больше допуска"""
+    regressions = []
+    for size, scenarios_results in results["results"].items():
+        for name, current in scenarios_results.items():
+            previous = baseline.get("results", {}).get(size, {}).get(name)
+            if previous is None:
+                continue
+            if current["errors"] > previous["errors"]:
+                regressions.append(f"{size}/{name}: ошибок {previous['errors']} -> {current['errors']}")
+            if current["rps"] < previous["rps"] * (1 - tolerance):
+                regressions.append(f"{size}/{name}: RPS {previous['rps']} -> {current['rps']}")
+            # Рост меньше миллисекунды - шум измерения, а не регрессия
+            if current["p95_ms"] > previous["p95_ms"] * (1 + tolerance) and current["p95_ms"] - previous["p95_ms"] > 1:
+                regressions.append(f"{size}/{name}: p95 {previous['p95_ms']} -> {current['p95_ms']} мс")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Нагрузочный тест API")
+    parser.add_argument("--sizes", default="small,medium", help=f"размеры базы через запятую: {', '.join(SIZES)}")
+    parser.add_argument("--scenarios", default="", help="только эти сценарии, через запятую")
+    parser.add_argument("--duration", type=float, default=5.0, help="секунд нагрузки на сценарий")
+    parser.add_argument("--concurrency", type=int, default=8, help="одновременных соединений")
+    parser.add_argument("--workers", type=int, default=1, help="воркеров uvicorn")
+    parser.add_argument("--profile", default="production", help="DATABASE_PROFILE сервера")
+    parser.add_argument("--output", default="load-test-results.json", help="куда записать результаты")
+    parser.add_argument("--baseline", help="файл результатов для сравнения")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="допустимое ухудшение, доля (0.2 = 20%%)")
+    args = parser.parse_args()
+    args.scenarios = [name for name in args.scenarios.split(",") if name]
+    sizes = [size for size in args.sizes.split(",") if size]
+    unknown = set(sizes) - SIZES.keys()
+    if unknown:
+        parser.error(f"неизвестные размеры: {', '.join(sorted(unknown))}")
+
+    print(f"{'Размер':>6} | {'Сценарий':>17} | {'RPS':>8} | {'p50, мс':>7} | {'p95, мс':>7} | {'p99, мс':>7} | {'ошибки':>6}")
+    results = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "duration": args.duration,
+            "concurrency": args.concurrency,
+            "workers": args.workers,
+            "profile": args.profile,
+            "sizes": {size: SIZES[size] for size in sizes},
+        },
+        "results": {size: run_size(size, args) for size in sizes},
+    }
+    with open(args.output, "w", encoding="utf-8") as output:
+        json.dump(results, output, ensure_ascii=False, indent=2)
+    print(f"Результаты: {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as baseline_file:
+            baseline = json.load(baseline_file)
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"❌ Регрессии относительно {args.baseline} (допуск {args.tolerance:.0%}):")
+            for regression in regressions:
+                print(f"   {regression}")
+            sys.exit(1)
+        print(f"✅ Регрессий относительно {args.baseline} нет (допуск {args.tolerance:.0%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Общие помощники бенчмарков: запуск uvicorn на временной базе
+и замер задержек HTTP запросов.
+"""
+
+import http.client
+import os
+import socket
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@contextmanager
+def run_server(database_url, port=None, extra_env=None, args=()):
+    """Запускает uvicorn app.main:app в отдельном процессе и ждет готовности"""
+    port = port or free_port()
+    env = dict(os.environ, DATABASE_URL=database_url, **(extra_env or {}))
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app",
+         "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning", *args],
+        cwd=BACKEND_DIR,
+        env=env,
+        stdout=subprocess.DEVNULL,
+    )
+    try:
+        deadline = time.time() + 30
+        while True:
+            try:
+                request("127.0.0.1", port, "GET", "/api/site")
+                break
+            except OSError:
+                if time.time() > deadline or process.poll() is not None:
+                    raise RuntimeError("Сервер не запустился")
+                time.sleep(0.02)
+        yield port
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+
+
+def request(host, port, method, path, body=None, headers=None):
+    """Выполняет запрос и возвращает (статус, тело, задержка в мс)"""
+    connection = http.client.HTTPConnection(host, port, timeout=30)
+    started = time.perf_counter()
+    try:
+        connection.request(method, path, body=body, headers=headers or {})
+        response = connection.getresponse()
+        data = response.read()
+        return response.status, data, (time.perf_counter() - started) * 1000
+    finally:
+        connection.close()
+
+
+def percentile(values, q):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(q / 100 * (len(ordered) - 1))))
+    return ordered[index]
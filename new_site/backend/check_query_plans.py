@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Проверка планов запросов (EXPLAIN QUERY PLAN) для запросов API.
+
+Выполняет те же функции из app/queries.py, что и эндпоинты app/main.py,
+на временной базе с индексами, перехватывает каждый SQL запрос и
+завершается с кодом 1, если какой-либо из них откатился к полному
+сканированию таблицы или сортировке во временном B-дереве, а продолжение
+keyset-пагинации постов - к обходу индекса с начала вместо диапазона.
+
+Запуск: cd new_site/backend && python check_query_plans.py
+"""
+
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+TMP_DIR = tempfile.mkdtemp(prefix="query_plans_")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(TMP_DIR, 'plans.db')}"
+
+from sqlalchemy import event
+
+from app.database import SessionLocal, engine, create_tables
+from app.models import SiteSettings, BlogPost, GoalCategory, Goal, SocialNetwork, User
+from app.queries import (
+    get_site_settings_row, list_posts, get_published_post,
+    list_social_networks, list_goal_categories,
+    build_goals_tree, get_posts_page, get_dashboard_stats,
+)
+from app.search import rebuild_search_index, search_posts
+
+# Таблицы из одной строки, для которых полное сканирование допустимо
+SINGLE_ROW_TABLES = {"site_settings"}
+
+# Эндпоинты, запросы к blog_posts которых должны начинаться диапазоном
+# по индексу (published_at<?, id<?): без него каждая следующая страница
+# обходит индекс с первой записи
+KEYSET_ENDPOINTS = {
+    "GET /api/posts?cursor", "GET /api/posts?cursor (глубокая страница)",
+    "GET /api/posts?cursor (посты без даты)", "GET /api/public/posts?cursor",
+}
+
+captured = []
+
+
+@event.listens_for(engine, "before_cursor_execute")
+def _capture(conn, cursor, statement, parameters, context, executemany):
+    if statement.lstrip().upper().startswith("SELECT"):
+        captured.append((statement, parameters))
+
+
+def seed(db):
+    db.add(SiteSettings())
+    db.add(User(username="admin", hashed_password="-"))
+    started_at = datetime(2024, 1, 1)
+    db.bulk_insert_mappings(BlogPost, [
+        {
+            "title": f"Пост {i}",
+            "slug": f"post-{i}",
+            "content": "<p>Текст</p>",
+            "published": i % 4 != 0,
+            # Каждый десятый пост без даты публикации: они идут в конце ленты
+            "published_at": started_at + timedelta(hours=i) if i % 10 else None,
+        }
+        for i in range(200)
+    ])
+    db.bulk_insert_mappings(GoalCategory, [{"id": i, "name": f"Категория {i}", "order": i} for i in range(1, 21)])
+    db.bulk_insert_mappings(Goal, [
+        {"text": f"Цель {i}.{j}", "category_id": i, "order": j, "is_completed": j % 2 == 0}
+        for i in range(1, 21) for j in range(10)
+    ])
+    db.bulk_insert_mappings(SocialNetwork, [
+        {"name": f"Сеть {i}", "url": "https://example.com", "icon_name": "link", "order": i}
+        for i in range(10)
+    ])
+    db.commit()
+    # bulk_insert_mappings не вызывает событий ORM: индекс поиска строится целиком
+    rebuild_search_index(db)
+
+
+def endpoint_queries(db):
+    """Имя эндпоинта -> функция, повторяющая его запросы"""
+    _, cursor = get_posts_page(db, limit=5)
+    _, deep_cursor = get_posts_page(db, limit=100)
+    # 150 опубликованных постов, из них последние 10 - без даты
+    _, undated_cursor = get_posts_page(db, limit=145)
+    _, public_cursor = get_posts_page(db, published_only=False, limit=5)
+    return {
+        "GET /api/site": lambda: get_site_settings_row(db),
+        "GET /api/posts": lambda: list_posts(db),
+        "GET /api/posts?limit": lambda: get_posts_page(db, limit=20),
+        "GET /api/posts?cursor": lambda: get_posts_page(db, limit=20, cursor=cursor),
+        "GET /api/posts?cursor (глубокая страница)": lambda: get_posts_page(db, limit=20, cursor=deep_cursor),
+        "GET /api/posts?cursor (посты без даты)": lambda: get_posts_page(db, limit=20, cursor=undated_cursor),
+        "GET /api/posts/{slug}": lambda: get_published_post(db, "post-1"),
+        "GET /api/public/posts": lambda: list_posts(db, published_only=False),
+        "GET /api/public/posts?cursor": lambda: get_posts_page(db, published_only=False, cursor=public_cursor),
+        "GET /api/goals": lambda: build_goals_tree(db),
+        "GET /api/social-networks": lambda: list_social_networks(db),
+        "GET /api/posts/search": lambda: search_posts(db, "текст пост"),
+        "GET /api/posts/search?offset": lambda: search_posts(db, "текст", offset=20),
+        "GET /api/admin/categories": lambda: list_goal_categories(db),
+        "GET /api/admin/stats": lambda: get_dashboard_stats(db),
+    }
+
+
+def plan_problems(conn, statement, parameters, keyset: bool = False):
+    rows = conn.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters).fetchall()
+    details = [row[-1] for row in rows]
+    problems = []
+    for detail in details:
+        if keyset and " blog_posts " in detail and "<" not in detail:
+            problems.append(detail)
+        elif "USE TEMP B-TREE" in detail:
+            problems.append(detail)
+        elif " VIRTUAL TABLE INDEX " in detail:
+            # FTS5: idxStr с M - поиск по полнотекстовому индексу (MATCH)
+            if "M" not in detail.rsplit(":", 1)[-1]:
+                problems.append(detail)
+        elif detail == "SCAN CONSTANT ROW":
+            # SELECT без FROM, например набор скалярных подзапросов
+            continue
+        elif detail.startswith("SCAN ") and "USING" not in detail:
+            table = detail.split()[1]
+            if table not in SINGLE_ROW_TABLES:
+                problems.append(detail)
+    return details, problems
+
+
+def main():
+    create_tables()
+    db = SessionLocal()
+    failed = False
+    try:
+        seed(db)
+        with engine.connect() as conn:
+            for name, run in endpoint_queries(db).items():
+                captured.clear()
+                db.expire_all()
+                run()
+                for statement, parameters in list(captured):
+                    details, problems = plan_problems(conn, statement, parameters, name in KEYSET_ENDPOINTS)
+                    status = "❌" if problems else "✅"
+                    print(f"{status} {name}: {' | '.join(details)}")
+                    if problems:
+                        failed = True
+                        print(f"   SQL: {' '.join(statement.split())}")
+    finally:
+        db.close()
+
+    if failed:
+        print("\n❌ Обнаружены полные сканирования, временные сортировки или keyset без диапазона")
+        return 1
+    print("\n🎉 Все запросы используют индексы")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
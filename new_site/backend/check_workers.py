@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Проверка нескольких воркеров на одном файле SQLite.
+
+Запускает start_server.py --prod с --workers воркерами на временной базе
+и из нескольких потоков создает посты через админку, открывая новое
+соединение на каждый запрос (соединения распределяются между воркерами).
+После каждой записи публичный список постов, который может отдать
+другой воркер из своего кэша, должен уже содержать новый пост.
+
+Проверяется:
+- ответы пришли от всех воркеров (worker_pid в /api/admin/cache-stats);
+- нет ошибок записи (database is locked и прочих 5xx);
+- нет устаревших ответов кэша после записи в другом воркере;
+- база в режиме WAL, число постов совпадает с числом успешных записей,
+  PRAGMA integrity_check возвращает ok.
+
+Запуск: cd new_site/backend && python check_workers.py
+        python check_workers.py --workers 4 --writes 200
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from urllib.parse import urlencode
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmarks"))
+
+from server import BACKEND_DIR, free_port, request
+
+LOGIN_FORM = urlencode({"username": "admin", "password": "admin"})
+LOGIN_HEADERS = {"Content-Type": "application/x-www-form-urlencoded"}
+
+
+def start(database_url, port, workers):
+    process = subprocess.Popen(
+        [sys.executable, "start_server.py", "--prod", "--host", "127.0.0.1",
+         "--port", str(port), "--workers", str(workers)],
+        cwd=BACKEND_DIR,
+        env=dict(os.environ, DATABASE_URL=database_url),
+        stdout=subprocess.DEVNULL,
+    )
+    deadline = time.time() + 60
+    while True:
+        try:
+            request("127.0.0.1", port, "GET", "/api/site")
+            return process
+        except OSError:
+            if time.time() > deadline or process.poll() is not None:
+                process.terminate()
+                raise RuntimeError("Сервер не запустился")
+            time.sleep(0.1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Проверка воркеров на одном файле SQLite")
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--writes", type=int, default=100, help="записей на поток")
+    args = parser.parse_args()
+
+    database_path = os.path.join(tempfile.mkdtemp(prefix="check_workers_"), "workers.db")
+    port = free_port()
+    process = start(f"sqlite:///{database_path}", port, args.workers)
+    lock = threading.Lock()
+    pids, errors, stale = set(), [], []
+    created = [0]
+    try:
+        _, body, _ = request("127.0.0.1", port, "POST", "/api/auth/login", LOGIN_FORM, LOGIN_HEADERS)
+        auth = {"Authorization": f"Bearer {json.loads(body)['access_token']}"}
+        json_auth = {**auth, "Content-Type": "application/json"}
+
+        def worker(number):
+            for i in range(args.writes):
+                slug = f"worker-check-{number}-{i}"
+                post = {"title": slug, "slug": slug, "excerpt": "", "content": "<p>Текст</p>", "published": True}
+                status_code, body, _ = request("127.0.0.1", port, "POST", "/api/admin/posts", json.dumps(post), json_auth)
+                if status_code != 200:
+                    with lock:
+                        errors.append(f"POST {slug}: {status_code} {body[:200]!r}")
+                    continue
+                _, body, _ = request("127.0.0.1", port, "GET", "/api/posts?limit=50")
+                _, stats, _ = request("127.0.0.1", port, "GET", "/api/admin/cache-stats", headers=auth)
+                with lock:
+                    created[0] += 1
+                    pids.add(json.loads(stats)["worker_pid"])
+                    if slug not in {post["slug"] for post in json.loads(body)["items"]}:
+                        stale.append(slug)
+
+        threads = [threading.Thread(target=worker, args=(number,)) for number in range(args.threads)]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+
+    connection = sqlite3.connect(database_path)
+    journal_mode = connection.execute("PRAGMA journal_mode").fetchone()[0]
+    integrity = connection.execute("PRAGMA integrity_check").fetchone()[0]
+    posts = connection.execute("SELECT count(*) FROM blog_posts WHERE slug LIKE 'worker-check-%'").fetchone()[0]
+    connection.close()
+
+    checks = [
+        (len(pids) == args.workers, f"ответили воркеров: {len(pids)} из {args.workers}"),
+        (not errors, f"ошибок записи: {len(errors)}"),
+        (not stale, f"устаревших ответов после записи: {len(stale)}"),
+        (journal_mode == "wal", f"journal_mode: {journal_mode}"),
+        (posts == created[0], f"постов в базе: {posts}, успешных записей: {created[0]}"),
+        (integrity == "ok", f"integrity_check: {integrity}"),
+    ]
+    print(f"Записей: {created[0]} за {elapsed:.1f} с из {args.threads} потоков, воркеров: {args.workers}")
+    for passed, description in checks:
+        print(f"{'✅' if passed else '❌'} {description}")
+    for error in errors[:5]:
+        print(f"   {error}")
+    if not all(passed for passed, _ in checks):
+        return 1
+    print("\n🎉 Воркеры безопасно работают с одним файлом базы")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Экспорт публичного сайта в статические JSON файлы.
+
+Записывает ответы публичного API (те же запросы и схемы, что в app/main.py)
+в каталог, который можно отдавать со статического хостинга:
+
+    <каталог>/api/site.json
+    <каталог>/api/posts.json
+    <каталог>/api/posts/<slug>.json
+    <каталог>/api/goals.json
+    <каталог>/api/social-networks.json
+    <каталог>/static/...           (с флагом --assets)
+
+Повторный запуск перезаписывает только файлы, исходные строки которых
+изменились (версии хранятся в manifest.json). Backend при этом нужен
+только для админки.
+
+Запуск: cd new_site/backend && python export_static.py [--output DIR] [--full] [--assets]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.database import SessionLocal, create_tables
+from app.snapshot import export_snapshot, copy_static_assets
+
+DEFAULT_OUTPUT = os.getenv("STATIC_EXPORT_DIR", "static-export")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Экспорт публичного API в статические файлы")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help=f"каталог экспорта (по умолчанию {DEFAULT_OUTPUT})")
+    parser.add_argument("--full", action="store_true", help="перезаписать все файлы, игнорируя manifest.json")
+    parser.add_argument("--assets", action="store_true", help="скопировать также static/ (изображения)")
+    args = parser.parse_args()
+
+    create_tables()
+    started = time.perf_counter()
+    db = SessionLocal()
+    try:
+        result = export_snapshot(db, args.output, full=args.full)
+    finally:
+        db.close()
+
+    for path in result.written:
+        print(f"✏️  {path}")
+    for path in result.deleted:
+        print(f"🗑️  {path}")
+    print(
+        f"✅ Экспорт в {args.output}: записано {len(result.written)}, "
+        f"без изменений {result.unchanged}, удалено {len(result.deleted)} "
+        f"за {time.perf_counter() - started:.2f} с"
+    )
+    if args.assets:
+        copied = copy_static_assets("static", args.output)
+        print(f"🖼️  Скопировано файлов static/: {copied}")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,13 +6,12 @@ import os
 # Добавляем текущую директорию в путь
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from app.database import engine
-from app.models import Base
+from app.database import create_tables
 
 def init_database():
     """Создает все таблицы в базе данных"""
     try:
-        Base.metadata.create_all(bind=engine)
+        create_tables()
         print("✅ База данных успешно создана!")
         return True
     except Exception as e:
@@ -13,11 +13,14 @@ sys.path.insert(0, ".")
 def reset_database():
     """Сбрасывает базу данных и создает нового админа"""
     
-    # Удаляем старую базу данных
+    # Удаляем старую базу данных вместе с файлами WAL (-wal, -shm):
+    # оставшийся журнал применился бы к новой базе
     db_path = Path("site.db")
-    if db_path.exists():
+    existing = [path for path in (db_path, Path("site.db-wal"), Path("site.db-shm")) if path.exists()]
+    if existing:
         try:
-            db_path.unlink()
+            for path in existing:
+                path.unlink()
             print("✅ Старая база данных удалена")
         except Exception as e:
             print(f"⚠️ Не удалось удалить базу данных: {e}")
@@ -26,15 +29,14 @@ def reset_database():
     
     # Импортируем и создаем новую базу данных
     try:
-        from app.database import engine
-        from app.models import Base
+        from app.database import create_tables
         
-        # Создаем таблицы
-        Base.metadata.create_all(bind=engine)
+        # Создаем таблицы и индексы
+        create_tables()
         print("✅ Новая база данных создана")
         
         # Инициализируем данные
-        from app.main import init_data
+        from app.startup import init_data
         init_data()
         print("✅ Данные инициализированы")
         
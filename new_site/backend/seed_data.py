@@ -1,20 +1,29 @@
 #!/usr/bin/env python3
+"""
+Заполнение базы демо данными.
 
+С параметрами масштаба работает как генератор данных для нагрузочных
+тестов, например: python seed_data.py --posts 10000 --categories 1000 --goals 20000
+Повторный запуск досоздает только недостающие строки.
+"""
+
+import argparse
 import sys
 import os
-import requests
-import json
+import time
 
 # Добавляем текущую директорию в путь
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from app.database import SessionLocal
-from app.models import SiteSettings, BlogPost, GoalCategory, Goal, User, SocialNetwork
+from app.database import SessionLocal, create_tables
+from app.models import User
 from app.auth import get_password_hash
+from app.seeding import seed_demo, SeedScale
 
-def seed_database():
+def seed_database(scale: SeedScale = None):
     """Заполняет базу данных начальными демо-данными"""
     db = SessionLocal()
+    started = time.perf_counter()
     
     try:
         print("🌱 Заполнение базы данных...")
@@ -30,28 +39,24 @@ def seed_database():
             print("✅ Создан админ пользователь (admin/admin)")
         
         # 2. Создание настроек сайта
-        site_settings = db.query(SiteSettings).first()
-        if not site_settings:
-            site_settings = SiteSettings(
-                site_title="Ваше Имя | Персональный сайт",
-                meta_description="Персональный сайт-визитка. Портфолио, блог и достижения.",
-                hero_title="Ваше Имя",
-                hero_subtitle="Ваша Профессия, Ваши Навыки",
-                about_text="""<p><strong>Привет! Это демо-текст.</strong></p>
+        site_settings = dict(
+            site_title="Ваше Имя | Персональный сайт",
+            meta_description="Персональный сайт-визитка. Портфолио, блог и достижения.",
+            hero_title="Ваше Имя",
+            hero_subtitle="Ваша Профессия, Ваши Навыки",
+            about_text="""<p><strong>Привет! Это демо-текст.</strong></p>
 <p>Здесь вы можете рассказать о себе, своих навыках и опыте. Это текст можно легко изменить через админ панель.</p>
 <p>Расскажите о своём образовании, проектах и интересах. Сделайте текст уникальным и интересным!</p>""",
-                github_url="https://github.com/yourusername",
-                telegram_url="https://t.me/yourusername",
-                email="your.email@example.com",
-                profile_image="/static/assets/images/profile.svg",
-                primary_color="#3b82f6",
-                secondary_color="#1e40af", 
-                accent_color="#06b6d4",
-                text_color="#ffffff",
-                background_color="#0f172a"
-            )
-            db.add(site_settings)
-            print("✅ Созданы настройки сайта")
+            github_url="https://github.com/yourusername",
+            telegram_url="https://t.me/yourusername",
+            email="your.email@example.com",
+            profile_image="/static/assets/images/profile.svg",
+            primary_color="#3b82f6",
+            secondary_color="#1e40af", 
+            accent_color="#06b6d4",
+            text_color="#ffffff",
+            background_color="#0f172a"
+        )
         
         # 3. Создание социальных сетей
         social_networks = [
@@ -73,13 +78,6 @@ def seed_database():
             }
         ]
         
-        for social_data in social_networks:
-            existing = db.query(SocialNetwork).filter(SocialNetwork.name == social_data["name"]).first()
-            if not existing:
-                social = SocialNetwork(**social_data)
-                db.add(social)
-                print(f"✅ Создана соцсеть: {social_data['name']}")
-        
         # 4. Создание категорий целей
         categories_data = [
             {"name": "Образование", "order": 1},
@@ -87,68 +85,48 @@ def seed_database():
             {"name": "Личное развитие", "order": 3}
         ]
         
-        for cat_data in categories_data:
-            existing = db.query(GoalCategory).filter(GoalCategory.name == cat_data["name"]).first()
-            if not existing:
-                category = GoalCategory(**cat_data)
-                db.add(category)
-                print(f"✅ Создана категория целей: {cat_data['name']}")
-        
-        db.commit()
-        
-        # 5. Создание демо целей
-        education_cat = db.query(GoalCategory).filter(GoalCategory.name == "Образование").first()
-        career_cat = db.query(GoalCategory).filter(GoalCategory.name == "Карьера").first()
-        personal_cat = db.query(GoalCategory).filter(GoalCategory.name == "Личное развитие").first()
-        
+        # 5. Создание демо целей (категория указывается по имени)
         goals_data = [
             {
                 "text": "Изучить современный фреймворк для веб-разработки",
-                "category_id": education_cat.id if education_cat else 1,
+                "category": "Образование",
                 "is_completed": True,
                 "completed_date": "2024-10-15",
                 "order": 1
             },
             {
                 "text": "Создать персональный сайт-портфолио",
-                "category_id": education_cat.id if education_cat else 1,
+                "category": "Образование",
                 "is_completed": True,
                 "completed_date": "2024-10-20",
                 "order": 2
             },
             {
                 "text": "Завершить обучение по специальности",
-                "category_id": education_cat.id if education_cat else 1,
+                "category": "Образование",
                 "is_completed": False,
                 "order": 3
             },
             {
                 "text": "Найти работу по специальности",
-                "category_id": career_cat.id if career_cat else 2,
+                "category": "Карьера",
                 "is_completed": False,
                 "order": 1
             },
             {
                 "text": "Создать портфолио из 5+ проектов",
-                "category_id": career_cat.id if career_cat else 2,
+                "category": "Карьера",
                 "is_completed": False,
                 "order": 2
             },
             {
                 "text": "Улучшить навыки английского языка",
-                "category_id": personal_cat.id if personal_cat else 3,
+                "category": "Личное развитие",
                 "is_completed": False,
                 "order": 1
             }
         ]
         
-        for goal_data in goals_data:
-            existing = db.query(Goal).filter(Goal.text == goal_data["text"]).first()
-            if not existing:
-                goal = Goal(**goal_data)
-                db.add(goal)
-                print(f"✅ Создана цель: {goal_data['text'][:50]}...")
-        
         # 6. Создание демо постов блога
         posts_data = [
             {
@@ -181,15 +159,20 @@ def seed_database():
             }
         ]
         
-        for post_data in posts_data:
-            existing = db.query(BlogPost).filter(BlogPost.slug == post_data["slug"]).first()
-            if not existing:
-                post = BlogPost(**post_data)
-                db.add(post)
-                print(f"✅ Создан пост: {post_data['title']}")
-        
-        db.commit()
-        print("\n🎉 База данных успешно заполнена демо-данными!")
+        # Существующие строки проверяются одним запросом на таблицу,
+        # недостающие вставляются пачками
+        created = seed_demo(
+            db,
+            site_settings=site_settings,
+            social_networks=social_networks,
+            categories=categories_data,
+            goals=goals_data,
+            posts=posts_data,
+            scale=scale,
+        )
+        for item in created:
+            print(f"✅ {item}")
+        print(f"\n🎉 База данных успешно заполнена демо-данными за {time.perf_counter() - started:.1f} с!")
         print("⚠️  Не забудьте изменить данные через админ панель!")
         
     except Exception as e:
@@ -199,4 +182,14 @@ def seed_database():
         db.close()
 
 if __name__ == "__main__":
-    seed_database()
+    parser = argparse.ArgumentParser(description="Заполнение базы демо данными")
+    parser.add_argument("--posts", type=int, default=0, help="сгенерировать дополнительно N постов")
+    parser.add_argument("--categories", type=int, default=0, help="сгенерировать дополнительно N категорий целей")
+    parser.add_argument("--goals", type=int, default=0, help="сгенерировать дополнительно N целей")
+    parser.add_argument("--social-networks", type=int, default=0, help="сгенерировать дополнительно N соцсетей")
+    args = parser.parse_args()
+    create_tables()
+    seed_database(SeedScale(
+        posts=args.posts, categories=args.categories,
+        goals=args.goals, social_networks=args.social_networks,
+    ))
@@ -1,5 +1,106 @@
 #!/usr/bin/env python3
+"""
+Запуск backend.
+
+    python start_server.py                 # разработка: один процесс, --reload
+    python start_server.py --prod          # продакшен: воркер на каждое ядро
+    python start_server.py --prod --workers 4 --port 8080
+
+В продакшене:
+- число воркеров - по доступным ядрам (WEB_CONCURRENCY или --workers);
+- uvloop и httptools, если установлены (uvicorn[standard]), иначе asyncio и h11;
+- keep-alive дольше простоя балансировщика, чтобы он не отправлял запрос
+  в соединение, которое сервер в этот момент закрывает;
+- воркер перезапускается после SERVER_MAX_REQUESTS запросов (с разбросом,
+  чтобы воркеры не уходили на перезапуск одновременно) - рост памяти
+  ограничен, менеджер процессов uvicorn поднимает замену;
+- DATABASE_PROFILE=production (WAL): воркеры читают базу параллельно
+  с записью из админки.
+
+Проверка, что воркеры безопасно работают с одним файлом SQLite:
+python check_workers.py
+"""
+
+import argparse
+import importlib.util
+import logging
+import os
+
 import uvicorn
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger("start_server")
+
+
+def available_cores() -> int:
+    # Учитывает ограничение по CPU affinity (taskset, cgroup cpuset)
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def default_workers() -> int:
+    return int(os.getenv("WEB_CONCURRENCY", available_cores()))
+
+
+def fastest(*modules: str) -> str:
+    """Первый установленный модуль из списка (последний - запасной вариант)"""
+    for module in modules[:-1]:
+        if importlib.util.find_spec(module) is not None:
+            return module
+    return modules[-1]
+
+
+def production_options(workers: int) -> dict:
+    max_requests = int(os.getenv("SERVER_MAX_REQUESTS", 10000))
+    return {
+        "workers": workers,
+        "loop": fastest("uvloop", "asyncio"),
+        "http": fastest("httptools", "h11"),
+        # Больше idle timeout балансировщика/nginx (обычно 60 с)
+        "timeout_keep_alive": int(os.getenv("SERVER_KEEP_ALIVE", 65)),
+        # Очередь соединений на accept; ядро ограничивает ее net.core.somaxconn
+        "backlog": int(os.getenv("SERVER_BACKLOG", 4096)),
+        "limit_max_requests": max_requests or None,
+        "limit_max_requests_jitter": int(os.getenv("SERVER_MAX_REQUESTS_JITTER", max_requests // 10)),
+        # Время на завершение начатых запросов при остановке и перезапуске воркера
+        "timeout_graceful_shutdown": int(os.getenv("SERVER_GRACEFUL_TIMEOUT", 30)),
+        # Журнал доступа заметно снижает пропускную способность; метрики - в /metrics
+        "access_log": os.getenv("SERVER_ACCESS_LOG", "").lower() in ("1", "true", "yes"),
+        "proxy_headers": True,
+        "forwarded_allow_ips": os.getenv("FORWARDED_ALLOW_IPS", "127.0.0.1"),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Запуск backend")
+    parser.add_argument("--prod", action="store_true", help="продакшен: несколько воркеров без --reload")
+    parser.add_argument("--host", default=os.getenv("SERVER_HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("SERVER_PORT", 8000)))
+    parser.add_argument("--workers", type=int, help="число воркеров (по умолчанию - по числу ядер)")
+    args = parser.parse_args()
+
+    if not args.prod:
+        uvicorn.run("app.main:app", host=args.host, port=args.port, reload=True)
+        return
+
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s:     %(message)s")
+    # Воркеры наследуют окружение процесса-менеджера
+    os.environ.setdefault("DATABASE_PROFILE", "production")
+    options = production_options(max(1, args.workers or default_workers()))
+    # По нему воркеры включают сброс кэша ответов по коммитам других воркеров
+    os.environ["WEB_CONCURRENCY"] = str(options["workers"])
+    if options["workers"] > 1 and os.getenv("STATIC_EXPORT_ON_CHANGE", "").lower() in ("1", "true", "yes"):
+        logger.warning("STATIC_EXPORT_ON_CHANGE включен: экспорт будет пересобирать каждый из %d воркеров", options["workers"])
+    logger.info(
+        "Продакшен: %d воркеров, loop=%s, http=%s, keep-alive %d с, перезапуск после %s запросов, профиль БД %s",
+        options["workers"], options["loop"], options["http"], options["timeout_keep_alive"],
+        options["limit_max_requests"] or "-", os.environ["DATABASE_PROFILE"],
+    )
+    uvicorn.run("app.main:app", host=args.host, port=args.port, **options)
+
 
 if __name__ == "__main__":
-    uvicorn.run("app.main:app", host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
+    main()